@@ -0,0 +1,61 @@
+import time
+
+import numpy as np
+
+from benchmarks.cases import _scenario
+from feedback_opt.optimizers import OptimizerDualHProximal, OptimizerDualYProximal
+from feedback_opt.simulation import Simulation
+
+# scaling of the decentralized PRIME optimizers (params.actors = True) on synthetic feeders
+# with one sgen per 20 busses: per round latency, messages and payload of the actor runtime
+# against the time per step of the in-process execution
+
+N_BUSSES = [200, 1_000, 4_000]
+DELAYS = [0.0, 1e-3]
+OPTIMIZERS = {
+    "dual_y_proximal": OptimizerDualYProximal,
+    "dual_h_proximal": OptimizerDualHProximal,
+}
+
+
+def run(system, optimizer, n_steps: int) -> float:
+    """
+    :return float: time of a closed loop step in s
+    """
+    params_sim = type("sim", (), {"n_steps": n_steps})
+    system.reset()
+    simulation = Simulation(params_sim, system, optimizer)
+    start = time.perf_counter()
+    simulation.run()
+    return (time.perf_counter() - start) / n_steps
+
+
+def bench_actors(n_steps: int = 10):
+    print(
+        f"{'optimizer':<18}{'busses':>8}{'sgens':>7}{'delay [ms]':>12}{'step [ms]':>11}"
+        f"{'actors [ms]':>13}{'latency [ms]':>14}{'messages':>10}{'bytes':>9}"
+    )
+    for n_bus in N_BUSSES:
+        system, _, params_opt = _scenario("feeder", n_bus)
+        for name, optimizer_class in OPTIMIZERS.items():
+            t_step = run(system, optimizer_class(params_opt[name], system), n_steps)
+
+            for delay in DELAYS:
+                params = type("opt", (params_opt[name],), {"actors": True, "actor_delay": delay})
+                optimizer = optimizer_class(params, system)
+                t_actors = run(system, optimizer, n_steps)
+                rounds = optimizer.runtime.frame()
+                optimizer.runtime.close()
+
+                print(
+                    f"{name:<18}{n_bus:>8}{system.m // 2:>7}{1e3 * delay:>12.1f}"
+                    f"{1e3 * t_step:>11.2f}{1e3 * t_actors:>13.2f}"
+                    f"{1e3 * rounds['latency'].median():>14.2f}"
+                    f"{rounds['messages'].iloc[-1]:>10}{rounds['bytes'].iloc[-1]:>9}",
+                    flush=True,
+                )
+
+
+if __name__ == "__main__":
+    np.seterr(all="ignore")
+    bench_actors()
@@ -0,0 +1,94 @@
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+# import time of the package entry points, every entry point is imported in a fresh
+# interpreter with python -X importtime. The heavy optional dependencies are only imported on
+# first use (PEP 562 __getattr__ of utils and systems, deferred imports in the backends), an
+# entry point which loads one of its forbidden modules is reported as a regression.
+
+HEAVY = ["cvxpy", "pandapower", "matplotlib", "numba", "igraph"]
+SYSTEM_NON_LINEAR = "from feedback_opt.systems import SystemNonLinear"
+OPTIMIZERS = "from feedback_opt.optimizers import OptimizerDualY"
+SIMULATION = "from feedback_opt.simulation import Simulation"
+ENTRY_POINTS = {
+    "feedback_opt.utils": ("import feedback_opt.utils", HEAVY),
+    "validation": ("from feedback_opt.utils import validate", HEAVY),
+    "polytope": ("from feedback_opt.utils import Polytope", HEAVY),
+    "system_non_linear": (SYSTEM_NON_LINEAR, HEAVY),
+    "optimizers": (OPTIMIZERS, HEAVY),
+    "simulation": (SIMULATION, HEAVY),
+    "toy": (
+        f"import scenarios.scenario_convex_toy; {SYSTEM_NON_LINEAR}; {OPTIMIZERS}; {SIMULATION}",
+        HEAVY,
+    ),
+    "system_electrical": ("from feedback_opt.systems import SystemElectrical", []),
+}
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_time(statement: str) -> dict:
+    """
+    :param str statement: python statement run in a fresh interpreter
+    :return dict: total import time in s, self time in s of every imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    total = 0.0
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        modules[module] = 1e-6 * int(self_us)
+        # the outermost imports add up to the total
+        if len(indent) == 1:
+            total += 1e-6 * int(cumulative_us)
+    return {"total": total, "modules": modules}
+
+
+def heaviest(modules: dict, n: int = 3) -> list:
+    """
+    :param dict modules: self time in s per module
+    :param int n: number of packages
+    :return list: (package, time in s) of the n top level packages with the largest import time
+    """
+    packages = defaultdict(float)
+    for module, duration in modules.items():
+        packages[module.split(".")[0]] += duration
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def bench_import(repeat: int = 3) -> list:
+    """
+    :param int repeat: number of fresh interpreters per entry point, the fastest is reported
+    :return list: (entry point, forbidden modules) of every regression
+    """
+    regressions = []
+    print(f"{'entry point':<20}{'import [ms]':>12}  heaviest packages [ms]")
+    for name, (statement, forbidden) in ENTRY_POINTS.items():
+        runs = [import_time(statement) for _ in range(repeat)]
+        best = min(runs, key=lambda run: run["total"])
+
+        loaded = [module for module in forbidden if module in best["modules"]]
+        if loaded:
+            regressions.append((name, loaded))
+
+        packages = ", ".join(f"{p} {1e3 * t:.0f}" for p, t in heaviest(best["modules"]))
+        flag = f"  loads {', '.join(loaded)}" if loaded else ""
+        print(f"{name:<20}{1e3 * best['total']:>12.0f}  {packages}{flag}", flush=True)
+
+    return regressions
+
+
+if __name__ == "__main__":
+    regressions = bench_import()
+    if regressions:
+        raise SystemExit(f"{len(regressions)} entry points import heavy dependencies")
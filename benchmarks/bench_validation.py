@@ -0,0 +1,78 @@
+import time
+
+import numpy as np
+
+from feedback_opt.optimizers import (
+    OptimizerDualH,
+    OptimizerDualHProximal,
+    OptimizerDualY,
+    OptimizerDualYProximal,
+    OptimizerPrimal,
+)
+from feedback_opt.simulation import Simulation
+from feedback_opt.systems import SystemElectrical
+from feedback_opt.utils import validation_level
+from scenarios.scenario_unicorn import Unicorn
+
+# per step cost of the validation levels on the Unicorn scenario
+# data_step is timed on a fixed operating point, such that every system evaluation is served
+# from the evaluation cache and the timing isolates the optimizer and validation overhead
+
+OPTIMIZERS = [
+    (OptimizerPrimal, Unicorn.opt_prim),
+    (OptimizerDualY, Unicorn.opt_dualy),
+    (OptimizerDualH, Unicorn.opt_dualh),
+    (OptimizerDualYProximal, Unicorn.opt_dualyprox_dist),
+    (OptimizerDualHProximal, Unicorn.opt_dualhprox_dist),
+]
+LEVELS = ["full", "boundary", "off"]
+
+
+def time_data_step(optimizer, data: dict, repeat: int = 5, number: int = 200) -> float:
+    """
+    :return float: best time of a single data_step in s
+    """
+    optimizer.data_step(data)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            optimizer.data_step(data)
+        times.append((time.perf_counter() - start) / number)
+    return min(times)
+
+
+def time_run(system, optimizer_class, params_opt, n_steps: int = 100) -> float:
+    """
+    :return float: time of a closed loop step in s
+    """
+    params_sim = type("sim", (Unicorn.sim,), {"n_steps": n_steps})
+    system.reset()
+    simulation = Simulation(params_sim, system, optimizer_class(params_opt, system))
+    start = time.perf_counter()
+    simulation.run()
+    return (time.perf_counter() - start) / n_steps
+
+
+def bench_validation():
+    system = SystemElectrical(Unicorn.sys)
+
+    print(f"{'optimizer':<28}{'level':<10}{'data_step [us]':>16}{'run step [us]':>16}")
+    for optimizer_class, params_opt in OPTIMIZERS:
+        optimizer = optimizer_class(params_opt, system)
+        system.reset()
+        data = optimizer.data_initial(Unicorn.sim.u_opt)
+
+        for level in LEVELS:
+            with validation_level(level):
+                t_step = time_data_step(optimizer, data)
+                t_run = time_run(system, optimizer_class, params_opt)
+            print(
+                f"{optimizer.name:<28}{level:<10}{1e6 * t_step:>16.1f}{1e6 * t_run:>16.1f}",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    np.seterr(all="ignore")
+    bench_validation()
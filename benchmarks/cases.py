@@ -0,0 +1,264 @@
+import numpy as np
+
+from feedback_opt.optimizers import (
+    OptimizerDualH,
+    OptimizerDualHProximal,
+    OptimizerDualY,
+    OptimizerDualYProximal,
+    OptimizerPrimal,
+)
+from feedback_opt.simulation import Simulation
+from feedback_opt.systems import SystemElectrical, SystemNonLinear
+from feedback_opt.utils import Argmin, Polytope, synthetic_feeder
+from scenarios.scenario_feeder import Feeder
+from scenarios.scenario_nonconvex_toy import NonConvexToy
+from scenarios.scenario_unicorn import Unicorn
+
+# benchmark cases: every case maps a parameter to a zero argument callable, all setup work
+# (system construction, initial data, solver compilation) happens before the callable is timed
+
+# sizes of the synthetic problems
+SIZES = [4, 16, 64]
+
+# number of busses of the synthetic feeders, the largest only for the system cases
+FEEDER_SIZES = [100, 1_000, 10_000]
+
+OPTIMIZERS = {
+    "primal": OptimizerPrimal,
+    "dual_y": OptimizerDualY,
+    "dual_h": OptimizerDualH,
+    "dual_y_proximal": OptimizerDualYProximal,
+    "dual_h_proximal": OptimizerDualHProximal,
+}
+
+
+### synthetic problems
+def synthetic_polytope(n: int, structure: str, seed: int = 0) -> Polytope:
+    """
+    :param int n: dimension
+    :param str structure: "box" for -1 <= x <= 1, "general" for 2n random halfspaces
+        containing the unit ball
+    :return Polytope: polytope
+    """
+    if structure == "box":
+        A = np.vstack((np.eye(n), -np.eye(n)))
+        return Polytope(A, np.ones((2 * n, 1)), n)
+
+    rng = np.random.default_rng(seed)
+    A = rng.normal(size=(2 * n, n))
+    A /= np.linalg.norm(A, axis=1, keepdims=True)
+    return Polytope(A, np.ones((2 * n, 1)), n)
+
+
+def synthetic_system(m: int, seed: int = 0) -> SystemNonLinear:
+    """
+    nonlinear system with p = m outputs y = G u + 0.1 (G u)^3 and box constraints
+
+    :param int m: input dimension
+    :return SystemNonLinear: system
+    """
+    rng = np.random.default_rng(seed)
+    G = rng.normal(size=(m, m)) / np.sqrt(m)
+
+    class sys:
+        A_u = np.vstack((np.eye(m), -np.eye(m)))
+        b_u = np.ones((2 * m, 1))
+        A_y = np.vstack((np.eye(m), -np.eye(m)))
+        b_y = 0.5 * np.ones((2 * m, 1))
+
+        def h(u):
+            v = G @ u
+            return v + 0.1 * v**3
+
+        def du_h(u):
+            v = G @ u
+            return (1 + 0.3 * v**2) * G
+
+    sys.m = m
+    sys.p = m
+    return SystemNonLinear(sys)
+
+
+class SyntheticOpt:
+    # tracking of the origin (quad_u = I), shared by all optimizers
+    alpha = 0.1
+    beta = 0.1
+    rho = 10
+    gamma_u = 1
+    gamma_z = 1
+
+
+def _scenario(name: str, m: int | None = None):
+    """
+    :return tuple: system, simulation params and optimizer params per optimizer name
+    """
+    if name == "toy":
+        toy_opt = type("opt", (NonConvexToy.opt,), {"alpha": 0.3})
+        params_opt = {
+            "primal": NonConvexToy.opt_prim,
+            "dual_y": toy_opt,
+            "dual_h": toy_opt,
+            "dual_y_proximal": NonConvexToy.opt_dualyprox_dist,
+            "dual_h_proximal": NonConvexToy.opt_dualhprox_dist,
+        }
+        return SystemNonLinear(NonConvexToy.sys), NonConvexToy.sim, params_opt
+
+    if name == "unicorn":
+        params_opt = {
+            "primal": Unicorn.opt_prim,
+            "dual_y": Unicorn.opt_dualy,
+            "dual_h": Unicorn.opt_dualh,
+            "dual_y_proximal": Unicorn.opt_dualyprox_dist,
+            "dual_h_proximal": Unicorn.opt_dualhprox_dist,
+        }
+        return SystemElectrical(Unicorn.sys), Unicorn.sim, params_opt
+
+    if name == "feeder":
+        # synthetic feeder with m busses, one sgen per 20 busses
+        n_sgen = max(m // 20, 1)
+        params_sys = type("sys", (), {"net": synthetic_feeder(m, n_sgen, sgen_mw=40 / n_sgen)})
+        lin_u = np.vstack((-np.ones((n_sgen, 1)), np.zeros((n_sgen, 1))))
+        params_opt = {
+            optimizer_name: type(
+                "opt", (params,), {"quad_u": 0.1 * np.eye(2 * n_sgen), "lin_u": lin_u}
+            )
+            for optimizer_name, params in [
+                ("primal", Feeder.opt_prim),
+                ("dual_y", Feeder.opt_dualy),
+                ("dual_h", Feeder.opt_dualh),
+                ("dual_y_proximal", Feeder.opt_dualyprox_dist),
+                ("dual_h_proximal", Feeder.opt_dualhprox_dist),
+            ]
+        }
+        return SystemElectrical(params_sys), Feeder.sim, params_opt
+
+    # synthetic system of size m
+    system = synthetic_system(m)
+    params_opt = type("opt", (SyntheticOpt,), {"quad_u": np.eye(m)})
+    params_sim = type("sim", (), {"u_0": 0.5 * np.ones((m, 1)), "u_opt": np.zeros((m, 1))})
+    return system, params_sim, dict.fromkeys(OPTIMIZERS, params_opt)
+
+
+def _scenarios(max_busses: int = 1_000) -> list:
+    """
+    :param int max_busses: largest synthetic feeder
+    """
+    return [
+        ("toy", None),
+        ("unicorn", None),
+        *[("synthetic", m) for m in SIZES],
+        *[("feeder", n) for n in FEEDER_SIZES if n <= max_busses],
+    ]
+
+
+### cases
+def case_proj_2(param: tuple):
+    structure, n = param
+    polytope = synthetic_polytope(n, structure)
+    z = 2 * np.random.default_rng(1).normal(size=(n, 1))
+    return lambda: polytope.proj_2(z)
+
+
+def case_argmin_solve(param: tuple):
+    solver, n = param
+    argmin = Argmin(synthetic_polytope(n, "general"), solver=solver)
+    rng = np.random.default_rng(1)
+    L = rng.normal(size=(n, n))
+    quad = L @ L.T / n + np.eye(n)
+    lin = 2 * rng.normal(size=(n, 1))
+    return lambda: argmin.solve(quad, lin)
+
+
+def case_system_h(param: tuple):
+    name, m = param
+    system, params_sim, _ = _scenario(name, m)
+    u = _initial_u(system, params_sim)
+
+    # distinct inputs defeat the evaluation cache of SystemElectrical
+    du = 1e-6 * np.eye(system.m, 1)
+    state = {"u": u}
+
+    def h():
+        state["u"] = state["u"] + du
+        return system.h(state["u"])
+
+    return h
+
+
+def case_system_du_h(param: tuple):
+    name, m = param
+    system, params_sim, _ = _scenario(name, m)
+    u = _initial_u(system, params_sim)
+    du = 1e-6 * np.eye(system.m, 1)
+    state = {"u": u}
+
+    def du_h():
+        state["u"] = state["u"] + du
+        return system.du_h(state["u"])
+
+    return du_h
+
+
+def case_optimizer_init(param: tuple):
+    optimizer_name, name, m = param
+    system, _, params_opt = _scenario(name, m)
+    return lambda: OPTIMIZERS[optimizer_name](params_opt[optimizer_name], system)
+
+
+def case_data_step(param: tuple):
+    optimizer_name, name, m = param
+    system, params_sim, params_opt = _scenario(name, m)
+    optimizer = OPTIMIZERS[optimizer_name](params_opt[optimizer_name], system)
+    data = optimizer.data_initial(_initial_u(system, params_sim))
+    optimizer.data_step(data)
+    return lambda: optimizer.data_step(data)
+
+
+def case_simulation_run(param: tuple):
+    optimizer_name, name, m, n_steps = param
+    system, params_sim, params_opt = _scenario(name, m)
+    params_sim = type("sim", (params_sim,), {"n_steps": n_steps})
+    optimizer = OPTIMIZERS[optimizer_name](params_opt[optimizer_name], system)
+
+    def run():
+        system.reset()
+        return Simulation(params_sim, system, optimizer).run()
+
+    return run
+
+
+def _initial_u(system, params_sim) -> np.ndarray:
+    for key in ["u_0", "u_opt"]:
+        if hasattr(params_sim, key):
+            return getattr(params_sim, key)
+    return np.zeros((system.m, 1))
+
+
+def cases() -> dict:
+    """
+    :return dict: case name -> (case, list of parameters)
+    """
+    return {
+        "polytope.proj_2": (
+            case_proj_2,
+            [(structure, n) for structure in ["box", "general"] for n in SIZES],
+        ),
+        "argmin.solve": (
+            case_argmin_solve,
+            [(solver, n) for solver in ["dense", "OSQP"] for n in SIZES],
+        ),
+        "system.h": (case_system_h, _scenarios(max(FEEDER_SIZES))),
+        "system.du_h": (case_system_du_h, _scenarios(max(FEEDER_SIZES))),
+        "optimizer.init": (
+            case_optimizer_init,
+            [(o, *s) for o in OPTIMIZERS for s in _scenarios(min(FEEDER_SIZES))],
+        ),
+        "optimizer.data_step": (
+            case_data_step,
+            [(o, *s) for o in OPTIMIZERS for s in _scenarios()],
+        ),
+        "simulation.run": (
+            case_simulation_run,
+            [(o, *s, 50) for o in OPTIMIZERS for s in _scenarios(min(FEEDER_SIZES))],
+        ),
+    }
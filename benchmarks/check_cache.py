@@ -0,0 +1,56 @@
+import tempfile
+import warnings
+
+from feedback_opt.experiment import run_experiment
+from feedback_opt.optimizers import OptimizerDualY
+from feedback_opt.systems import SystemElectrical
+from feedback_opt.utils import ResultCache
+from scenarios.scenario_unicorn_pv import UnicornPV
+
+# the ResultCache key of a run must not depend on runtime state: the PVProfile disturbance
+# reads its time series on first use, a run in the calling process loads it into the scenario.
+# The key computed after the run has to address the entry written by the run, a rerun of the
+# experiment is a cache hit.
+
+
+class scenario:
+    sys = UnicornPV.sys
+
+    class sim(UnicornPV.sim):
+        n_steps = 5
+        track_optimum = False
+
+
+def check_cache() -> list:
+    """
+    :return list: description of every failed check
+    """
+    optimizers = [(OptimizerDualY, UnicornPV.opt_dualy)]
+    failures = []
+    with tempfile.TemporaryDirectory() as path:
+        cache = ResultCache(path)
+        args = (SystemElectrical, scenario.sys, scenario.sim, OptimizerDualY, UnicornPV.opt_dualy)
+
+        before = cache.key(*args)
+        run_experiment(
+            [scenario], SystemElectrical, optimizers, max_workers=1, progress=False, cache=cache
+        )
+        after = cache.key(*args)
+        print(f"key before the run {before[:16]}, after the run {after[:16]}")
+        if before != after:
+            failures.append("the key changed during the run")
+
+        run_experiment(
+            [scenario], SystemElectrical, optimizers, max_workers=1, progress=False, cache=cache
+        )
+        print(f"cache hits {cache.n_hits}, misses {cache.n_misses}")
+        if cache.n_hits != 1:
+            failures.append("the rerun was not read from the cache")
+    return failures
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    failures = check_cache()
+    if failures:
+        raise SystemExit(f"{len(failures)} checks of the result cache failed: {failures}")
@@ -0,0 +1,104 @@
+import warnings
+
+import numpy as np
+
+from feedback_opt.optimizers import OptimizerDualH, OptimizerDualY, OptimizerPrimal
+from feedback_opt.systems import SystemElectrical, SystemNonLinear
+from scenarios.scenario_nonconvex_toy import NonConvexToy
+from scenarios.scenario_unicorn import Unicorn
+
+# numerical equivalence of the numba step kernels (params.compiled = True) and the python
+# optimizers: both data_steps are evaluated on every state of the python closed loop and their
+# outputs must agree up to TOL relative to max(1, |value|). The states are shared, since the
+# closed loop amplifies rounding differences (e.g. OptimizerDualH on Unicorn grows them from
+# 1e-16 to 1e-1 over 1000 steps). The primal kernel only compiles the gradient step, the
+# projection stays on the SCS solver of LinearizedProjection, hence the larger tolerance.
+
+TOL = {
+    OptimizerDualY: 1e-13,
+    OptimizerDualH: 1e-13,
+    OptimizerPrimal: 4e-11,
+}
+
+
+class ToyDualY(NonConvexToy.opt):
+    alpha = 0.3
+    beta = 0.3
+
+
+class ToyDualH(NonConvexToy.opt):
+    alpha = 0.3
+    beta = 0.3
+
+
+CASES = {
+    "nonconvex_toy": (
+        NonConvexToy,
+        SystemNonLinear,
+        [
+            (OptimizerPrimal, NonConvexToy.opt_prim),
+            (OptimizerDualY, ToyDualY),
+            (OptimizerDualH, ToyDualH),
+        ],
+    ),
+    "unicorn": (
+        Unicorn,
+        SystemElectrical,
+        [
+            (OptimizerPrimal, Unicorn.opt_prim),
+            (OptimizerDualY, Unicorn.opt_dualy),
+            (OptimizerDualH, Unicorn.opt_dualh),
+        ],
+    ),
+}
+
+
+def max_deviation(system, optimizer_class, params_opt, params_sim) -> float:
+    """
+    :return float: largest relative difference of the data_step outputs with and without
+        kernels along the closed loop of the python optimizer
+    """
+    system.reset()
+    python = optimizer_class(type("opt", (params_opt,), {"compiled": False}), system)
+    kernels = optimizer_class(type("opt", (params_opt,), {"compiled": True}), system)
+
+    deviation = 0.0
+    data = python.data_initial(getattr(params_sim, "u_0", None))
+    for _ in range(params_sim.n_steps):
+        data_python = python.data_step(data)
+        data_kernels = kernels.data_step(data)
+        for key, value in data_python.items():
+            difference = np.abs(value - data_kernels[key]) / np.maximum(1, np.abs(value))
+            deviation = max(deviation, float(np.max(difference)))
+
+        data = data_python
+        data["y"] = system.h(data["u"])
+    return deviation
+
+
+def check_kernels() -> list:
+    """
+    :return list: (case, optimizer, deviation) of every optimizer outside its tolerance
+    """
+    failures = []
+    print(f"{'case':<16}{'optimizer':<28}{'deviation':>12}{'tolerance':>12}")
+    for case, (scenario, system_factory, optimizers) in CASES.items():
+        system = system_factory(scenario.sys)
+        for optimizer_class, params_opt in optimizers:
+            deviation = max_deviation(system, optimizer_class, params_opt, scenario.sim)
+            tol = TOL[optimizer_class]
+            if not deviation <= tol:
+                failures.append((case, optimizer_class.__name__, deviation))
+            print(
+                f"{case:<16}{optimizer_class.__name__:<28}{deviation:>12.1e}{tol:>12.0e}",
+                flush=True,
+            )
+    return failures
+
+
+if __name__ == "__main__":
+    np.seterr(all="ignore")
+    warnings.simplefilter("ignore")
+    failures = check_kernels()
+    if failures:
+        raise SystemExit(f"{len(failures)} compiled kernels deviate from the python optimizers")
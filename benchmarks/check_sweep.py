@@ -0,0 +1,52 @@
+import warnings
+
+from feedback_opt.optimizers import OptimizerDualY
+from feedback_opt.sweep import sweep
+from feedback_opt.systems import SystemElectrical
+from scenarios.scenario_feeder import Feeder
+
+# a sweep records candidates whose simulation fails as status "failed" instead of aborting:
+# on the feeder with 50 MW sgens, alpha = 100 drives the setpoints to full power within a few
+# steps, where the power flow does not converge. Both candidates run in worker processes.
+
+CANDIDATES = {"alpha": [1e-3, 100.0]}
+EXPECTED = {1e-3: "completed", 100.0: "failed"}
+
+
+class scenario:
+    class sys(Feeder.sys):
+        def net():
+            from feedback_opt.utils import synthetic_feeder
+
+            return synthetic_feeder(n_bus=200, n_sgen=10, sgen_mw=50.0)
+
+    class sim(Feeder.sim):
+        n_steps = 20
+
+
+def check_sweep() -> list:
+    """
+    :return list: (alpha, status, error) of every candidate with an unexpected status
+    """
+    result = sweep(
+        scenario,
+        SystemElectrical,
+        OptimizerDualY,
+        Feeder.opt_dualy,
+        CANDIDATES,
+        max_workers=2,
+        progress=False,
+    )
+    print(result[["alpha", "status", "n_steps", "score", "error"]].to_string(index=False))
+    return [
+        (row.alpha, row.status, row.error)
+        for row in result.itertuples()
+        if row.status != EXPECTED[row.alpha]
+    ]
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    failures = check_sweep()
+    if failures:
+        raise SystemExit(f"{len(failures)} candidates of the sweep have an unexpected status")
@@ -0,0 +1,137 @@
+import argparse
+import fnmatch
+import gc
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.cases import cases
+
+# benchmark runner: best and median time per call (timeit style, calls are batched until a
+# batch takes at least min_time) and the peak traced memory of a single call (tracemalloc)
+# results are stored as csv, compare flags cases slower than a stored baseline
+
+
+def measure(func, repeat: int = 5, min_time: float = 0.05) -> dict:
+    """
+    :param Callable func: zero argument callable
+    :param int repeat: number of timed batches
+    :param float min_time: minimum duration of a batch in s
+    :return dict: time_best, time_median in s per call, number of calls per batch and
+        peak_memory in bytes
+    """
+    # warm up, e.g. numba compilation and solver setup
+    func()
+
+    # calls per batch
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        duration = time.perf_counter() - start
+        if duration >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if duration < min_time / 10 else 2
+
+    times = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            times.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    # peak memory of a single call
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "time_best": min(times),
+        "time_median": float(np.median(times)),
+        "number": number,
+        "peak_memory": peak_memory,
+    }
+
+
+def run_benchmarks(
+    pattern: str = "*", repeat: int = 5, min_time: float = 0.05, progress: bool = True
+) -> pd.DataFrame:
+    """
+    :param str pattern: glob pattern on the case name, e.g. "optimizer.*"
+    :param int repeat: number of timed batches per case
+    :param float min_time: minimum duration of a batch in s
+    :param bool progress: print every result
+    :return pd.DataFrame: one row per case and parameter
+    """
+    rows = []
+    for name, (case, params) in cases().items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        for param in params:
+            label = ",".join(str(p) for p in param if p is not None)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                row = {"case": name, "param": label, **measure(case(param), repeat, min_time)}
+            rows.append(row)
+            if progress:
+                print(
+                    f"{name:<22}{label:<36}{1e6 * row['time_best']:>14.1f} us"
+                    f"{row['peak_memory'] / 1024:>12.1f} KiB",
+                    flush=True,
+                )
+
+    return pd.DataFrame(rows)
+
+
+def compare(results: pd.DataFrame, baseline: pd.DataFrame, tol: float = 1.2) -> pd.DataFrame:
+    """
+    :param pd.DataFrame results: current results
+    :param pd.DataFrame baseline: stored results of a previous version
+    :param float tol: admissible slowdown factor of the best time
+    :return pd.DataFrame: cases of both runs with the time and memory ratio, sorted by the
+        time ratio, regression is True for cases slower than tol
+    """
+    merged = results.merge(baseline, on=["case", "param"], suffixes=("", "_baseline"))
+    merged["time_ratio"] = merged["time_best"] / merged["time_best_baseline"]
+    merged["memory_ratio"] = merged["peak_memory"] / merged["peak_memory_baseline"]
+    merged["regression"] = merged["time_ratio"] > tol
+    columns = ["case", "param", "time_best", "time_best_baseline", "time_ratio", "memory_ratio"]
+    return merged[[*columns, "regression"]].sort_values("time_ratio", ascending=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="feedback_opt benchmarks")
+    parser.add_argument("pattern", nargs="?", default="*", help="glob pattern on case names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05)
+    parser.add_argument("--save", help="store the results as csv")
+    parser.add_argument("--compare", help="csv of a baseline run")
+    parser.add_argument("--tol", type=float, default=1.2, help="admissible slowdown factor")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.pattern, repeat=args.repeat, min_time=args.min_time)
+    if args.save:
+        results.to_csv(args.save, index=False)
+
+    if args.compare:
+        comparison = compare(results, pd.read_csv(args.compare), tol=args.tol)
+        print(comparison.to_string(index=False))
+        if comparison["regression"].any():
+            raise SystemExit(f"{comparison['regression'].sum()} regressions (tol {args.tol})")
+
+
+if __name__ == "__main__":
+    main()
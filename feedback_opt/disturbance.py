@@ -0,0 +1,227 @@
+import os
+import warnings
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from feedback_opt.optimizers.optimizer_base import OptimizerBase
+from feedback_opt.systems.system_base import SystemBase
+
+
+class DisturbanceBase(ABC):
+    """
+    time-varying operating point of a system, applied by the simulation before every timestep
+    """
+
+    @abstractmethod
+    def apply(self, system: SystemBase, k: int):
+        """
+        :param SystemBase system: system to update
+        :param int k: timestep
+        """
+        raise NotImplementedError
+
+
+class PVProfile(DisturbanceBase):
+    """
+    PVProfile: available sgen active power (and optionally load scaling) from csv time series
+    one row per sample, the files are read on use in chunks of samples from start on
+
+    :param str path: csv of the available active power in MW, one column per profile
+    :param list columns: profile column of every sgen, defaults to 0, 1, ...
+    :param float scale: scaling of the available power
+    :param int start: first sample
+    :param int steps_per_sample: number of timesteps every sample is held
+    :param str load_path: csv of the load scaling, a single column or one column per load
+    :param str time_path: csv of the sample times in s
+    """
+
+    # minimum number of samples read at once, the chunks double with the window
+    CHUNK_SAMPLES = 1024
+
+    def __init__(
+        self,
+        path: str,
+        columns: list[int] | None = None,
+        scale: float = 1.0,
+        start: int = 0,
+        steps_per_sample: int = 1,
+        load_path: str | None = None,
+        time_path: str | None = None,
+    ):
+        assert isinstance(path, str)
+        assert isinstance(start, int) and start >= 0
+        assert isinstance(steps_per_sample, int) and steps_per_sample > 0
+        self.path = path
+        self.columns = columns
+        self.scale = scale
+        self.start = start
+        self.steps_per_sample = steps_per_sample
+        self.load_path = load_path
+        self.time_path = time_path
+
+        # samples start, start + 1, ... read so far
+        self._pv = None
+        self._load = None
+        self._time = None
+
+    @staticmethod
+    def _read(path: str, skiprows: int, max_rows: int) -> np.ndarray:
+        """
+        :param str path: csv file
+        :param int skiprows: first row
+        :param int max_rows: number of rows, fewer at the end of the file
+        :return np.ndarray: rows skiprows, ..., skiprows + max_rows - 1 of the file
+        """
+        # relative paths are resolved like the network files of SystemElectrical
+        if not os.path.isabs(path):
+            cwd = os.path.abspath(os.getcwd())
+            cwd = cwd[: cwd.rfind("prime") + len("prime")]
+            path = f"{cwd}/{path}"
+        with warnings.catch_warnings():
+            # a window beyond the end of the file is empty
+            warnings.filterwarnings("ignore", "loadtxt: input contained no data")
+            return np.loadtxt(path, delimiter=",", ndmin=2, skiprows=skiprows, max_rows=max_rows)
+
+    @staticmethod
+    def _append(window: np.ndarray | None, chunk: np.ndarray) -> np.ndarray:
+        if window is None:
+            return chunk
+        return np.concatenate([window, chunk]) if len(chunk) else window
+
+    def _read_window(self, n_samples: int):
+        """
+        reads the next chunk of the files if less than n_samples samples are read
+
+        :param int n_samples: number of samples from start on
+        """
+        first = 0 if self._pv is None else len(self._pv)
+        if first >= n_samples:
+            return
+        skiprows = self.start + first
+        max_rows = max(n_samples - first, first, self.CHUNK_SAMPLES)
+
+        pv = self._read(self.path, skiprows, max_rows)
+        self._pv = self._append(self._pv, pv)
+        if self.load_path is not None:
+            load = self._read(self.load_path, skiprows, max_rows)
+            assert len(load) == len(pv)
+            self._load = self._append(self._load, load)
+        if self.time_path is not None:
+            time = self._read(self.time_path, skiprows, max_rows)[:, 0]
+            assert len(time) == len(pv)
+            self._time = self._append(self._time, time)
+
+    def sample(self, k: int) -> int:
+        """
+        :param int k: timestep
+        :return int: row of the time series applied at timestep k
+        """
+        sample = self.start + k // self.steps_per_sample
+        self._read_window(sample - self.start + 1)
+        assert sample - self.start < len(self._pv), "timestep beyond the end of the time series"
+        return sample
+
+    def time(self, k: int) -> float:
+        """
+        :param int k: timestep
+        :return float: sample time in s
+        """
+        assert self.time_path is not None
+        return self._time[self.sample(k) - self.start]
+
+    def apply(self, system: SystemBase, k: int):
+        sample = self.sample(k)
+
+        columns = self.columns
+        if columns is None:
+            columns = list(range(system.index.n_sgen))
+        sgen_max_p_mw = self.scale * self._pv[sample - self.start, columns]
+
+        load_scaling = None
+        if self._load is not None:
+            load_scaling = self._load[sample - self.start]
+            if len(load_scaling) == 1:
+                load_scaling = load_scaling[0]
+
+        system.set_disturbance(sgen_max_p_mw=sgen_max_p_mw, load_scaling=load_scaling)
+
+
+class OptimumTracker:
+    """
+    OptimumTracker: moving optimum of the steady-state problem of an optimizer
+
+    min     phi(u, h(u))
+    s.t.    u in U, h(u) in Y
+
+    solved by sequential quadratic programming (scipy SLSQP) on the current operating point,
+    warm started from the last optimum. If no feasible optimum exists, e.g. at times of low PV
+    production, the last iterate projected onto U is returned and status is set accordingly.
+    """
+
+    def __init__(self, optimizer: OptimizerBase, tol: float = 1e-12, max_iter: int = 200):
+        assert isinstance(optimizer, OptimizerBase)
+        self.optimizer = optimizer
+        self.system = optimizer._system
+        self.tol = tol
+        self.max_iter = max_iter
+
+        # scipy convention: fun(x) >= 0
+        self.constraints = [
+            {"type": "ineq", "fun": self._c_u, "jac": self._jac_u},
+            {"type": "ineq", "fun": self._c_y, "jac": self._jac_y},
+        ]
+
+        # status and number of iterations of last call
+        self.status = None
+        self.iterations = 0
+
+    def _c_u(self, x: np.ndarray) -> np.ndarray:
+        return -self.system.U.c_x(x.reshape(-1, 1)).ravel()
+
+    def _c_y(self, x: np.ndarray) -> np.ndarray:
+        return -self.system.Y.c_x(self.system.h(x.reshape(-1, 1))).ravel()
+
+    def _jac_u(self, x: np.ndarray) -> np.ndarray:
+        return -self.system.U.A
+
+    def _jac_y(self, x: np.ndarray) -> np.ndarray:
+        return -self.system.Y.A @ self.system.du_h(x.reshape(-1, 1))
+
+    def _phi(self, x: np.ndarray) -> float:
+        u = x.reshape(-1, 1)
+        return self.optimizer.phi(u, self.system.h(u)).item()
+
+    def _du_phi(self, x: np.ndarray) -> np.ndarray:
+        u = x.reshape(-1, 1)
+        du_h = self.system.du_h(u)
+        grad = self.optimizer.du_phi_u(u) + du_h.T @ self.optimizer.dy_phi_y(self.system.h(u))
+        return grad.ravel()
+
+    def solve(self, u_0: np.ndarray) -> np.ndarray:
+        """
+        :param np.array u_0: initial guess (m,1), e.g. the last optimum
+        :return np.array: optimum u (m,1)
+        """
+        # deferred, scipy.optimize is only needed with an optimum tracker
+        from scipy.optimize import minimize
+
+        assert np.shape(u_0) == (self.system.m, 1)
+
+        result = minimize(
+            self._phi,
+            u_0.ravel(),
+            jac=self._du_phi,
+            constraints=self.constraints,
+            method="SLSQP",
+            options={"ftol": self.tol, "maxiter": self.max_iter},
+        )
+        self.iterations = result.nit
+
+        if not result.success:
+            self.status = "infeasible" if result.status in (4, 8) else "failed"
+            warnings.warn(f"optimum tracking failed: {result.message}")
+            return self.system.U.proj_2(result.x.reshape(-1, 1))
+
+        self.status = "optimal"
+        return result.x.reshape(-1, 1)
@@ -0,0 +1,154 @@
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from feedback_opt.optimizers.optimizer_base import OptimizerBase
+from feedback_opt.simulation import Simulation
+from feedback_opt.systems.system_base import SystemBase
+from feedback_opt.utils.utils_cache import ResultCache
+
+# systems held by the current (worker) process, keyed by (system factory, system params)
+_SYSTEMS = {}
+
+
+def get_system(system_factory: Callable, params_sys) -> SystemBase:
+    """
+    system of the current (worker) process, built once per system factory and parameters
+
+    :param system_factory: e.g. SystemElectrical
+    :param params_sys: system parameters
+    :return SystemBase: system reset to its initial state
+    """
+    key = (system_factory, params_sys)
+    if key not in _SYSTEMS:
+        _SYSTEMS[key] = system_factory(params_sys)
+    system = _SYSTEMS[key]
+    assert isinstance(system, SystemBase)
+    system.reset()
+    return system
+
+
+def _run_job(job: dict) -> pd.DataFrame:
+    system = get_system(job["system_factory"], job["params_sys"])
+
+    optimizer = job["optimizer_class"](job["params_opt"], system)
+    assert isinstance(optimizer, OptimizerBase)
+
+    # override measurement noise seed
+    params_sim = job["params_sim"]
+    if job["noise_seed"] is not None:
+        params_sim = type("sim", (params_sim,), {"noise_seed": job["noise_seed"]})
+
+    history = Simulation(params_sim, system, optimizer).run().reset_index()
+
+    history.insert(0, "optimizer", optimizer.name)
+    return history
+
+
+def run_experiment(
+    scenarios: list,
+    system_factory: Callable,
+    optimizers: list[tuple[type, object]],
+    seed: int | None = None,
+    max_workers: int | None = None,
+    progress: bool = True,
+    cache: ResultCache | None = None,
+) -> pd.DataFrame:
+    """
+    runs every optimizer on every scenario, fanned out over a process pool
+    every worker process holds its own system instance per scenario
+
+    :param list scenarios: scenario parameters, each providing .sys and .sim
+    :param Callable system_factory: builds a system from scenario.sys, e.g. SystemElectrical
+    :param list optimizers: (optimizer class, optimizer params) tuples
+    :param int seed: if given, overrides the measurement noise seed of every scenario with
+        a seed derived from it
+    :param int max_workers: number of worker processes, 1 runs in the calling process
+    :param bool progress: show progress bar
+    :param ResultCache cache: if given, histories of runs with unchanged inputs are read from
+        the cache and only the remaining runs are simulated
+    :return pd.DataFrame: tidy history with one row per scenario, optimizer and timestep t
+    """
+    assert isinstance(optimizers, list) and len(optimizers) > 0
+
+    # reproducible noise seeds per scenario, shared by all optimizers
+    noise_seeds = [None] * len(scenarios)
+    if seed is not None:
+        seed_sequences = np.random.SeedSequence(seed).spawn(len(scenarios))
+        noise_seeds = [int(ss.generate_state(1)[0]) for ss in seed_sequences]
+
+    jobs = []
+    for i, scenario in enumerate(scenarios):
+        assert hasattr(scenario, "sys") and hasattr(scenario, "sim")
+        for optimizer_class, params_opt in optimizers:
+            jobs.append(
+                {
+                    "scenario": getattr(scenario, "name", f"{type(scenario).__name__}_{i}"),
+                    "system_factory": system_factory,
+                    "params_sys": scenario.sys,
+                    "params_sim": scenario.sim,
+                    "optimizer_class": optimizer_class,
+                    "params_opt": params_opt,
+                    "noise_seed": noise_seeds[i],
+                }
+            )
+
+    # cached runs
+    histories = [None] * len(jobs)
+    if cache is not None:
+        for i, job in enumerate(jobs):
+            job["key"] = cache.key(
+                job["system_factory"],
+                job["params_sys"],
+                job["params_sim"],
+                job["optimizer_class"],
+                job["params_opt"],
+                job["noise_seed"],
+            )
+            histories[i] = cache.get(job["key"])
+    pending = [i for i, history in enumerate(histories) if history is None]
+
+    if max_workers == 1:
+        computed = [_run_job(jobs[i]) for i in tqdm(pending, disable=not progress)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            computed = list(
+                tqdm(
+                    executor.map(_run_job, [jobs[i] for i in pending]),
+                    total=len(pending),
+                    disable=not progress,
+                )
+            )
+
+    for i, history in zip(pending, computed, strict=True):
+        if cache is not None:
+            cache.put(jobs[i]["key"], history)
+        histories[i] = history
+
+    for job, history in zip(jobs, histories, strict=True):
+        history.insert(0, "scenario", job["scenario"])
+    return pd.concat(histories, ignore_index=True)
+
+
+def split_results(results: pd.DataFrame, scenario: str | None = None) -> list:
+    """
+    converts a tidy experiment frame into the (label, history) list used for plotting
+
+    :param pd.DataFrame results: output of run_experiment
+    :param str scenario: scenario to select, defaults to the only scenario
+    :return list: (optimizer name, history) tuples in order of appearance
+    """
+    if scenario is None:
+        assert results["scenario"].nunique() == 1, "select a scenario"
+        scenario = results["scenario"].iloc[0]
+
+    results = results[results["scenario"] == scenario]
+    split = []
+    for name in results["optimizer"].unique():
+        history = results[results["optimizer"] == name]
+        history = history.drop(columns=["scenario", "optimizer"]).set_index("t")
+        split.append((name, history.dropna(axis=1, how="all")))
+    return split
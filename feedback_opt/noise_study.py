@@ -0,0 +1,144 @@
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from feedback_opt.experiment import get_system
+from feedback_opt.optimizers.optimizer_base import OptimizerBase
+from feedback_opt.simulation import BatchSimulation, Simulation
+from feedback_opt.utils.utils_statistics import StreamingStats
+
+
+def _run_seeds(job: dict) -> tuple[int, np.ndarray, np.ndarray]:
+    system = get_system(job["system_factory"], job["params_sys"])
+
+    optimizer = job["optimizer_class"](job["params_opt"], system)
+    assert isinstance(optimizer, OptimizerBase)
+
+    overrides = {"log_mode": "metrics"}
+    if job["noise_y_std"] is not None:
+        overrides["noise_y_std"] = job["noise_y_std"]
+    params_sim = type("sim", (job["params_sim"],), overrides)
+
+    # metrics (seed, timestep, metric)
+    if len(job["seeds"]) > 1:
+        simulation = BatchSimulation(params_sim, system, optimizer, noise_seeds=job["seeds"])
+        history = simulation.run()
+        n_rows = len(history) // len(job["seeds"])
+        metrics = (
+            history[list(Simulation.METRICS)].to_numpy().reshape(len(job["seeds"]), n_rows, -1)
+        )
+    else:
+        params_sim = type("sim", (params_sim,), {"noise_seed": job["seeds"][0]})
+        history = Simulation(params_sim, system, optimizer).run()
+        metrics = history[list(Simulation.METRICS)].to_numpy()[np.newaxis]
+
+    return job["optimizer"], metrics, history.index.get_level_values("t").unique().to_numpy()
+
+
+def noise_study(
+    scenario,
+    system_factory: Callable,
+    optimizers: list[tuple[type, object]],
+    n_seeds: int,
+    seed: int = 0,
+    noise_y_std: float | None = None,
+    quantiles: tuple[float, ...] = (0.05, 0.5, 0.95),
+    batch_size: int = 1,
+    max_workers: int | None = None,
+    progress: bool = True,
+) -> pd.DataFrame:
+    """
+    Monte Carlo study of the measurement noise: every optimizer is simulated for n_seeds noise
+    realizations, fanned out over a process pool. phi, y_violation and d are aggregated per
+    timestep by streaming accumulators, individual histories are never kept.
+
+    :param scenario: scenario parameters, providing .sys and .sim
+    :param Callable system_factory: builds a system from scenario.sys, e.g. SystemElectrical
+    :param list optimizers: (optimizer class, optimizer params) tuples
+    :param int n_seeds: number of noise realizations per optimizer
+    :param int seed: seed the noise seeds are derived from
+    :param float noise_y_std: overrides scenario.sim.noise_y_std
+    :param tuple quantiles: quantiles to estimate (P^2 algorithm)
+    :param int batch_size: number of seeds simulated at once with BatchSimulation per job,
+        requires data_step_batch of the optimizers
+    :param int max_workers: number of worker processes, 1 runs in the calling process
+    :param bool progress: show progress bar
+    :return pd.DataFrame: summary indexed by optimizer and timestep t,
+        columns (metric, statistic) with statistics mean, std, min, max and e.g. q05
+    """
+    assert isinstance(optimizers, list) and len(optimizers) > 0
+    assert isinstance(n_seeds, int) and n_seeds > 0
+    assert isinstance(batch_size, int) and batch_size > 0
+    assert hasattr(scenario, "sys") and hasattr(scenario, "sim")
+
+    # reproducible noise seeds, shared by all optimizers
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_seeds)
+    noise_seeds = [int(ss.generate_state(1)[0]) for ss in seed_sequences]
+
+    jobs = []
+    for i, (optimizer_class, params_opt) in enumerate(optimizers):
+        for start in range(0, n_seeds, batch_size):
+            jobs.append(
+                {
+                    "optimizer": i,
+                    "system_factory": system_factory,
+                    "params_sys": scenario.sys,
+                    "params_sim": scenario.sim,
+                    "optimizer_class": optimizer_class,
+                    "params_opt": params_opt,
+                    "noise_y_std": noise_y_std,
+                    "seeds": noise_seeds[start : start + batch_size],
+                }
+            )
+
+    # consume results in job order, such that the quantile estimates are reproducible
+    stats = [None] * len(optimizers)
+    timesteps = None
+
+    def accumulate(results):
+        nonlocal timesteps
+        for i, metrics, t in tqdm(results, total=len(jobs), disable=not progress):
+            if stats[i] is None:
+                stats[i] = StreamingStats(metrics.shape[1:], quantiles)
+                timesteps = t
+            for metrics_seed in metrics:
+                stats[i].update(metrics_seed)
+
+    if max_workers == 1:
+        accumulate(map(_run_seeds, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            accumulate(executor.map(_run_seeds, jobs))
+
+    # summary frame
+    frames = []
+    names = []
+    for (optimizer_class, params_opt), stats_i in zip(optimizers, stats):
+        summary = stats_i.summary()
+        columns = pd.MultiIndex.from_product(
+            [Simulation.METRICS, list(summary)], names=["metric", "statistic"]
+        )
+        data = np.stack([summary[name] for name in summary], axis=2).reshape(len(timesteps), -1)
+        frames.append(pd.DataFrame(data, columns=columns, index=pd.Index(timesteps, name="t")))
+        names.append(getattr(params_opt, "name", optimizer_class.__name__))
+
+    return pd.concat(frames, keys=names, names=["optimizer"])
+
+
+def summary_results(summary: pd.DataFrame, statistic: str = "mean") -> list:
+    """
+    converts a noise study summary into the (label, history) list used for plotting
+
+    :param pd.DataFrame summary: output of noise_study
+    :param str statistic: statistic to plot, e.g. "mean", "max" or "q95"
+    :return list: (optimizer name, history) tuples with columns phi, y_violation and d
+    """
+    results = []
+    for name in summary.index.get_level_values("optimizer").unique():
+        history = summary.loc[name].xs(statistic, axis=1, level="statistic")
+        history.columns.name = None
+        results.append((name, history))
+    return results
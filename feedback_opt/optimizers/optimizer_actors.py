@@ -0,0 +1,306 @@
+import asyncio
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from feedback_opt.utils import ArgminSeparable, Polytope, SolverError
+
+# actor runtime of the decentralized proximal optimizers (params.actors = True)
+# every input block (e.g. the [p, q] setpoint of an sgen) is an input actor solving its own
+# QP, the grid operator is the output actor updating the prices. The actors are asyncio tasks
+# on an event loop in a background thread and only exchange messages over a local bus:
+#   plant -> operator:          measurement u, y
+#   operator -> input actor i:  price of block i
+#   input actor i -> plant:     setpoint u_i and cost p_i
+# an exception raised by an actor terminates its task, it is sent to the plant and re-raised
+# by ActorRuntime.step
+
+
+@dataclass
+class Message:
+    sender: str
+    kind: str
+    payload: dict
+
+    @property
+    def nbytes(self) -> int:
+        return sum(np.asarray(value).nbytes for value in self.payload.values())
+
+
+class MessageBus:
+    """
+    MessageBus: one inbox per actor, counts the messages and payload bytes,
+    every delivery is optionally delayed by a fixed latency in s
+    """
+
+    def __init__(self, delay: float = 0.0):
+        assert delay >= 0
+        self.delay = delay
+        self.inboxes = {}
+        self.n_messages = 0
+        self.n_bytes = 0
+
+    def register(self, name: str):
+        # called on the event loop
+        self.inboxes[name] = asyncio.Queue()
+
+    def send(self, sender: str, recipient: str, kind: str, **payload):
+        message = Message(sender, kind, payload)
+        self.n_messages += 1
+        self.n_bytes += message.nbytes
+
+        inbox = self.inboxes[recipient]
+        if self.delay > 0:
+            asyncio.get_running_loop().call_later(self.delay, inbox.put_nowait, message)
+        else:
+            inbox.put_nowait(message)
+
+    async def receive(self, name: str) -> Message:
+        return await self.inboxes[name].get()
+
+
+class InputActor:
+    """
+    InputActor: owner of the input block u_i = u[block], solves the local proximal QP
+
+    min     u_i^T (quad_u_ii + gamma_u / 2 I) u_i + (lin_u_i + price_i - gamma_u u_i_k)^T u_i
+    s.t.    u_i in U_i
+    """
+
+    def __init__(self, name: str, block: np.ndarray, optimizer, bus: MessageBus):
+        self.name = name
+        self.block = block
+        self.bus = bus
+
+        # local constraints: the rows of U acting on the block
+        self._U = optimizer._system.U
+        self.rows = np.flatnonzero(np.any(self._U.A[:, block] != 0, axis=1))
+        self.U = Polytope(
+            self._U.A[np.ix_(self.rows, block)], self._U.b[self.rows].copy(), len(block)
+        )
+        self.prob_u = ArgminSeparable(self.U, [np.arange(len(block))], solver=optimizer.solver)
+
+        # local cost function
+        self.gamma_u = optimizer.gamma_u
+        self.quad = optimizer.quad_u[np.ix_(block, block)] + self.gamma_u / 2 * np.eye(len(block))
+        self.lin_u = optimizer.lin_u[block]
+
+        # last setpoint
+        self.u = None
+
+    async def run(self):
+        while True:
+            message = await self.bus.receive(self.name)
+            if message.kind == "stop":
+                return
+            self.bus.send(self.name, "plant", "setpoint", **self.setpoint(message))
+
+    def setpoint(self, message: Message) -> dict:
+        # local measurement of the time-varying bounds, e.g. the available PV power
+        self.U.set_b(self._U.b[self.rows])
+
+        price = message.payload["price"]
+        lin = self.lin_u + price - self.gamma_u * self.u
+        u = self.prob_u.solve(self.quad, lin, verify_psd=False)
+        if u is None:
+            raise SolverError(f"local QP of {self.name} failed")
+
+        p = np.multiply(u, price) + self.gamma_u / 2 * np.power(u - self.u, 2)
+        self.u = u
+        return {"u": u, "p": p}
+
+
+class OutputActor:
+    """
+    OutputActor: grid operator, updates the prices from the measurement (data_step_prices of
+    the optimizer) and sends every input actor the price of its block
+    """
+
+    def __init__(self, optimizer, actors: list, bus: MessageBus):
+        self.name = "operator"
+        # weak, the running tasks must not keep the optimizer and its runtime alive
+        self.optimizer = weakref.proxy(optimizer)
+        self.actors = actors
+        self.bus = bus
+
+        # price state, e.g. lamb_y or nu_h and z
+        self.state = {}
+
+    async def run(self):
+        while True:
+            message = await self.bus.receive(self.name)
+            if message.kind == "stop":
+                return
+            price = self.prices(message)
+            for actor in self.actors:
+                self.bus.send(self.name, actor.name, "price", price=price[actor.block])
+
+    def prices(self, message: Message) -> np.ndarray:
+        data = {**self.state, "u": message.payload["u"], "y": message.payload["y"]}
+        data = self.optimizer.data_step_prices(data)
+        self.state = {key: data[key] for key in self.optimizer.PRICES}
+        return self.optimizer.price_u(data)
+
+
+class ActorRuntime:
+    """
+    ActorRuntime: decentralized data_step of a proximal optimizer, one input actor per input
+    block of the system (system.input_blocks) and the grid operator as output actor
+
+    :param optimizer: OptimizerDualYProximal or OptimizerDualHProximal
+    :param float delay: simulated latency of every message in s
+    """
+
+    def __init__(self, optimizer, delay: float = 0.0):
+        system = optimizer._system
+        blocks = [np.asarray(block) for block in system.input_blocks()]
+        assert np.array_equal(np.sort(np.concatenate(blocks)), np.arange(system.m)), (
+            "input blocks must partition u"
+        )
+
+        # decentralized: the input QP separates into the blocks
+        owner = np.empty(system.m, dtype=int)
+        for i, block in enumerate(blocks):
+            owner[block] = i
+        for row in system.U.A:
+            assert len(np.unique(owner[row != 0])) <= 1, "U couples input blocks"
+        coupled = owner[:, None] != owner[None, :]
+        assert np.all(optimizer.quad_u[coupled] == 0), "quad_u couples input blocks"
+
+        self.bus = MessageBus(delay)
+        self.actors = [
+            InputActor(f"input_{i}", block, optimizer, self.bus) for i, block in enumerate(blocks)
+        ]
+        self.operator = OutputActor(optimizer, self.actors, self.bus)
+        self._blocks = {actor.name: actor.block for actor in self.actors}
+
+        # records of all rounds
+        self.rounds = []
+
+        # exception raised by an actor, the messages of the failed round are not consumed
+        self.error = None
+
+        # event loop in a background thread, also usable from within a running loop (jupyter)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        tasks = self._call(self._start())
+        self._finalizer = weakref.finalize(
+            self, _shutdown, self._loop, self._thread, self.bus, tasks
+        )
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def _start(self) -> list:
+        for name in ["plant", self.operator.name, *[actor.name for actor in self.actors]]:
+            self.bus.register(name)
+        tasks = []
+        for actor in [self.operator, *self.actors]:
+            task = asyncio.create_task(actor.run())
+            # the bus only, a callback of the runtime would keep it alive
+            task.add_done_callback(partial(_forward_error, self.bus, actor.name))
+            tasks.append(task)
+        return tasks
+
+    def reset(self, data: dict):
+        """
+        initial setpoints and prices of all actors
+
+        :param dict data: data at timestep k=0
+        """
+        for actor in self.actors:
+            actor.u = data["u"][actor.block]
+        self.operator.state = {key: data[key] for key in self.operator.optimizer.PRICES}
+        self.rounds = []
+
+    async def _round(self, u: np.ndarray, y: np.ndarray) -> dict:
+        self.bus.send("plant", self.operator.name, "measurement", u=u, y=y)
+
+        data_out = {"u": np.empty_like(u), "p": np.empty_like(u)}
+        for _ in self.actors:
+            message = await self.bus.receive("plant")
+            if message.kind == "error":
+                raise message.payload["error"]
+            block = self._blocks[message.sender]
+            data_out["u"][block] = message.payload["u"]
+            data_out["p"][block] = message.payload["p"]
+        return data_out
+
+    def step(self, data_in: dict) -> dict:
+        """
+        one round: measurement, price update, local QPs and setpoints
+
+        :param dict data_in: data at timestep k
+        :return dict: data_out data at timestep k+1
+        """
+        if self.error is not None:
+            raise RuntimeError("actor runtime failed in an earlier round") from self.error
+
+        n_messages, n_bytes = self.bus.n_messages, self.bus.n_bytes
+        start = time.perf_counter()
+        try:
+            setpoints = self._call(self._round(data_in["u"], data_in["y"]))
+        except Exception as error:
+            self.error = error
+            raise
+        latency = time.perf_counter() - start
+
+        self.rounds.append(
+            {
+                "latency": latency,
+                "messages": self.bus.n_messages - n_messages,
+                "bytes": self.bus.n_bytes - n_bytes,
+            }
+        )
+
+        data_out = data_in.copy()
+        data_out.update(self.operator.state)
+        data_out.update(setpoints)
+        data_out.update(self.state())
+        return data_out
+
+    def state(self) -> dict:
+        """
+        :return dict: latency in s, messages and bytes of the last round, logged by the
+            simulation
+        """
+        last = self.rounds[-1] if self.rounds else {"latency": 0, "messages": 0, "bytes": 0}
+        return {f"actor_{key}": np.array([[float(value)]]) for key, value in last.items()}
+
+    def frame(self) -> pd.DataFrame:
+        """
+        :return pd.DataFrame: latency in s, messages and payload bytes of every round
+        """
+        return pd.DataFrame(self.rounds, columns=["latency", "messages", "bytes"])
+
+    def close(self):
+        """
+        stops all actors and the event loop, called when the runtime (i.e. its optimizer) is
+        garbage collected at the latest
+        """
+        self._finalizer()
+
+
+def _forward_error(bus: MessageBus, name: str, task: asyncio.Task):
+    # the exception terminating an actor, re-raised on the thread of ActorRuntime.step
+    if not task.cancelled() and task.exception() is not None:
+        bus.inboxes["plant"].put_nowait(Message(name, "error", {"error": task.exception()}))
+
+
+def _shutdown(loop, thread, bus: MessageBus, tasks: list):
+    # the collection may run on the loop thread itself
+    if threading.current_thread() is thread:
+        loop.stop()
+        return
+    for inbox in bus.inboxes.values():
+        loop.call_soon_threadsafe(inbox.put_nowait, Message("", "stop", {}))
+    asyncio.run_coroutine_threadsafe(asyncio.wait(tasks), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
+from types import MappingProxyType
 
 import numpy as np
 
 from feedback_opt.systems.system_base import SystemBase
+from feedback_opt.utils import Argmin, SolverError, validate
 
 
 class OptimizerBase(ABC):
@@ -10,6 +12,15 @@ class OptimizerBase(ABC):
     The class is intended to be immutable after initialization!
     """
 
+    # methods timed by the Profiler
+    PROFILE_METHODS = MappingProxyType(
+        {
+            "data_step": "data_step",
+            "data_cost": "evaluation",
+            "data_y_violation": "evaluation",
+        }
+    )
+
     def __init__(
         self,
         params,
@@ -61,7 +72,8 @@ class OptimizerBase(ABC):
         :param np.array u: input vector (m,1)
         :return np.array: cost (1,1)
         """
-        assert np.shape(u) == (self._system.m, 1)
+        if validate():
+            assert np.shape(u) == (self._system.m, 1)
         return u.T @ self.quad_u @ u + self.lin_u.T @ u
 
     def phi_y(self, y: np.ndarray) -> float:
@@ -71,7 +83,8 @@ class OptimizerBase(ABC):
         :param np.array y: output vector (p,1)
         :return np.array: cost (1,1)
         """
-        assert np.shape(y) == (self._system.p, 1)
+        if validate():
+            assert np.shape(y) == (self._system.p, 1)
         return y.T @ self.quad_y @ y + self.lin_y.T @ y
 
     def phi(self, u: np.ndarray, y: np.ndarray) -> float:
@@ -82,28 +95,31 @@ class OptimizerBase(ABC):
         :param np.array y: output vector (p,1)
         :return np.array: cost (1,1)
         """
-        assert np.shape(u) == (self._system.m, 1)
-        assert np.shape(y) == (self._system.p, 1)
+        if validate():
+            assert np.shape(u) == (self._system.m, 1)
+            assert np.shape(y) == (self._system.p, 1)
         return self.phi_u(u) + self.phi_y(y)
 
     def du_phi_u(self, u: np.ndarray) -> np.ndarray:
         """
         input cost sensitivity function du_phi_u(u)
 
-        :param np.array u: input vector (m,1)
-        :return np.array: gradient (m,1)
+        :param np.array u: input vector (m,1) or input vectors (B,m,1)
+        :return np.array: gradient (m,1) or gradients (B,m,1)
         """
-        assert np.shape(u) == (self._system.m, 1)
+        if validate():
+            assert np.shape(u)[-2:] == (self._system.m, 1)
         return 2 * self.quad_u @ u + self.lin_u
 
     def dy_phi_y(self, y: np.ndarray) -> np.ndarray:
         """
         output cost sensitivity function dy_phi_y(y)
 
-        :param np.array y: output vector (p,1)
-        :return np.array: gradient (p,1)
+        :param np.array y: output vector (p,1) or output vectors (B,p,1)
+        :return np.array: gradient (p,1) or gradients (B,p,1)
         """
-        assert np.shape(y) == (self._system.p, 1)
+        if validate():
+            assert np.shape(y)[-2:] == (self._system.p, 1)
         return 2 * self.quad_y @ y + self.lin_y
 
     def data_initial(self, u_0: np.ndarray = None) -> dict:
@@ -114,7 +130,8 @@ class OptimizerBase(ABC):
         """
         if u_0 is None:
             u_0 = np.zeros((self._system.m, 1))
-        assert np.shape(u_0) == (self._system.m, 1)
+        if validate("boundary"):
+            assert np.shape(u_0) == (self._system.m, 1)
 
         data_out = {}
         data_out["u"] = u_0
@@ -126,8 +143,9 @@ class OptimizerBase(ABC):
 
     def data_cost(self, data_in: dict) -> dict:
         # assert minimum input requirements
-        assert "u" in data_in
-        assert "y" in data_in
+        if validate():
+            assert "u" in data_in
+            assert "y" in data_in
 
         data_out = data_in
         data_out["phi"] = self.phi(data_in["u"], data_in["y"])
@@ -135,7 +153,8 @@ class OptimizerBase(ABC):
 
     def data_y_violation(self, data_in: dict) -> dict:
         # assert minimum input requirements
-        assert "y" in data_in
+        if validate():
+            assert "y" in data_in
 
         data_out = data_in
         z = self._system.Y.proj_2(data_in["y"])
@@ -152,6 +171,76 @@ class OptimizerBase(ABC):
         """
         raise NotImplementedError
 
+    ### batched evaluation, every entry of the data dict is stacked along a leading batch axis
+    def phi_batch(self, u: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        :param np.array u: input vectors (B,m,1)
+        :param np.array y: output vectors (B,p,1)
+        :return np.array: costs (B,1,1)
+        """
+        return u.mT @ self.quad_u @ u + self.lin_u.T @ u + y.mT @ self.quad_y @ y + self.lin_y.T @ y
+
+    def data_initial_batch(self, u_0: np.ndarray) -> dict:
+        """
+        data_initial for a batch of initial inputs
+
+        :param np.array u_0: initial inputs (B,m,1)
+        :return dict: data_k0 data at timestep k=0
+        """
+        if validate("boundary"):
+            assert np.shape(u_0)[1:] == (self._system.m, 1)
+
+        data_out = {}
+        data_out["u"] = u_0
+        data_out["y"] = self._system.h_batch(u_0)
+        data_out = self.data_cost_batch(data_out)
+        data_out = self.data_y_violation_batch(data_out)
+
+        return data_out
+
+    def data_cost_batch(self, data_in: dict) -> dict:
+        data_out = data_in
+        data_out["phi"] = self.phi_batch(data_in["u"], data_in["y"])
+        return data_out
+
+    def data_y_violation_batch(self, data_in: dict) -> dict:
+        data_out = data_in
+        z = self._system.Y.proj_2_batch(data_in["y"])
+        data_out["y_violation"] = np.linalg.norm(z - data_in["y"], axis=(1, 2), keepdims=True)
+        return data_out
+
+    def data_step_batch(self, data_in: dict) -> dict:
+        """
+        performs a single update step for a batch of independent runs
+
+        :param dict data_in: data at timestep k
+        :return dict: data_out data at timestep k+1
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support batches")
+
+    # the update math is shared by data_step and data_step_batch, the steps are written for a
+    # single run (m,1) and broadcast over a leading batch axis (B,m,1), these helpers dispatch
+    # the operations which differ between both
+    def _du_h(self, u: np.ndarray) -> np.ndarray:
+        """
+        :param np.array u: input vector (m,1) or input vectors (B,m,1)
+        :return np.array: sensitivity (p,m) or sensitivities (B,p,m)
+        """
+        if np.ndim(u) == 3:
+            return self._system.du_h_batch(u)
+        return self._system.du_h_managed(u)
+
+    @staticmethod
+    def _proj_2(polytope, x: np.ndarray) -> np.ndarray:
+        """
+        :param Polytope polytope: set to project on
+        :param np.array x: vector (n,1) or vectors (B,n,1)
+        :return np.array: projection (n,1) or projections (B,n,1)
+        """
+        if np.ndim(x) == 3:
+            return polytope.proj_2_batch(x)
+        return polytope.proj_2(x)
+
 
 class OptimizerGradientStep(OptimizerBase):
     def __init__(
@@ -175,6 +264,29 @@ class OptimizerGradientStep(OptimizerBase):
         else:
             self.beta = self.alpha
 
+        # numba compiled data_step, see optimizer_kernels
+        if hasattr(params, "compiled"):
+            assert isinstance(params.compiled, bool)
+            self.compiled = params.compiled
+        else:
+            self.compiled = False
+        if self.compiled:
+            from feedback_opt.optimizers import optimizer_kernels
+
+            self._kernels = optimizer_kernels
+
+            # flat cost function, the kernels expect contiguous float arrays
+            self._cost_flat = (
+                np.ascontiguousarray(self.quad_u, dtype=float),
+                np.ravel(self.lin_u).astype(float),
+                np.ascontiguousarray(self.quad_y, dtype=float),
+                np.ravel(self.lin_y).astype(float),
+            )
+
+    @staticmethod
+    def _flat(x: np.ndarray) -> np.ndarray:
+        return np.ravel(x).astype(float)
+
 
 class OptimizerProximal(OptimizerBase):
     def __init__(
@@ -197,3 +309,77 @@ class OptimizerProximal(OptimizerBase):
             self.gamma_u = float(params.gamma_u)
         else:
             self.gamma_u = 0.0
+
+        # QP solver backend
+        if hasattr(params, "solver"):
+            assert params.solver in Argmin.SOLVERS
+            self.solver = params.solver
+        else:
+            self.solver = "dense"
+
+        # decentralized execution as actors exchanging prices and setpoints, see
+        # optimizer_actors, with a simulated latency of every message in s
+        if hasattr(params, "actors"):
+            assert isinstance(params.actors, bool)
+            self.actors = params.actors
+        else:
+            self.actors = False
+        if hasattr(params, "actor_delay"):
+            assert isinstance(params.actor_delay, (int, float)) and params.actor_delay >= 0
+            self.actor_delay = float(params.actor_delay)
+        else:
+            self.actor_delay = 0.0
+        self.runtime = None
+
+    # keys of the data dict owned by the output actor
+    PRICES = ()
+
+    @abstractmethod
+    def data_step_prices(self, data_in: dict) -> dict:
+        """
+        output actor: price update from the measurement
+
+        :param dict data_in: data at timestep k
+        :return dict: data_out with the prices (PRICES) of timestep k+1
+        """
+        raise NotImplementedError
+
+    def _solve(self, problem, quad: np.ndarray, lin: np.ndarray) -> np.ndarray:
+        """
+        :param ArgminSeparable problem: cached QP
+        :param np.array quad: matrix (n,n) or matrices (B,n,n)
+        :param np.array lin: vector (n,1) or vectors (B,n,1)
+        :return np.array: minimizer (n,1) or minimizers (B,n,1)
+        """
+        if np.ndim(lin) == 3:
+            x = problem.solve_batch(quad, lin)
+        else:
+            x = problem.solve(quad, lin, verify_psd=False)
+        if x is None or np.any(np.isnan(x)):
+            raise SolverError("no qp solution found")
+        return x
+
+    @abstractmethod
+    def price_u(self, data_in: dict) -> np.ndarray:
+        """
+        price of every input seen by the input actors
+
+        :param dict data_in: data with the prices of timestep k+1
+        :return np.array: price (m,1)
+        """
+        raise NotImplementedError
+
+    def data_initial_actors(self, data_k0: dict) -> dict:
+        """
+        starts the actor runtime once and resets it to the initial data
+
+        :param dict data_k0: data at timestep k=0
+        :return dict: data_k0 including the actor telemetry
+        """
+        if self.runtime is None:
+            from feedback_opt.optimizers.optimizer_actors import ActorRuntime
+
+            self.runtime = ActorRuntime(self, delay=self.actor_delay)
+        self.runtime.reset(data_k0)
+        data_k0.update(self.runtime.state())
+        return data_k0
@@ -1,6 +1,7 @@
 import numpy as np
 
 from feedback_opt.optimizers.optimizer_base import OptimizerGradientStep
+from feedback_opt.utils import validate
 
 
 class OptimizerDualH(OptimizerGradientStep):
@@ -16,36 +17,46 @@ class OptimizerDualH(OptimizerGradientStep):
         data_k0["p"] = np.zeros((self._system.m, 1))
         return data_k0
 
-    def next_u(self, data_in: dict) -> np.ndarray:
-        assert np.shape(data_in["u"]) == (self._system.m, 1)
-        assert np.shape(data_in["nu_h"]) == (self._system.p, 1)
+    def next_u(self, data_in: dict, price: np.ndarray) -> np.ndarray:
+        if validate():
+            assert np.shape(data_in["u"])[-2:] == (self._system.m, 1)
+            assert np.shape(price)[-2:] == (self._system.m, 1)
 
-        step_u = self.du_phi_u(data_in["u"]) + self._system.du_h(data_in["u"]).T @ data_in["nu_h"]
+        step_u = self.du_phi_u(data_in["u"]) + price
         u_hat = data_in["u"] - self.alpha * step_u
-        return self._system.U.proj_2(u_hat)
+        return self._proj_2(self._system.U, u_hat)
 
     def next_z(self, data_in: dict) -> np.ndarray:
-        assert np.shape(data_in["z"]) == (self._system.p, 1)
-        assert np.shape(data_in["nu_h"]) == (self._system.p, 1)
+        if validate():
+            assert np.shape(data_in["z"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["nu_h"])[-2:] == (self._system.p, 1)
 
         step_z = self.dy_phi_y(data_in["z"]) - data_in["nu_h"]
         z_hat = data_in["z"] - self.alpha * step_z
-        return self._system.Y.proj_2(z_hat)
+        return self._proj_2(self._system.Y, z_hat)
 
     def next_nu_h(self, data_in: dict) -> np.ndarray:
-        assert np.shape(data_in["y"]) == (self._system.p, 1)
-        assert np.shape(data_in["z"]) == (self._system.p, 1)
-        assert np.shape(data_in["nu_h"]) == (self._system.p, 1)
+        if validate():
+            assert np.shape(data_in["y"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["z"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["nu_h"])[-2:] == (self._system.p, 1)
 
         # gradient ascent nu_h
         return data_in["nu_h"] + self.beta * (data_in["y"] - data_in["z"])
 
     def data_step(self, data_in: dict) -> dict:
         # assert minimum input requirements
-        assert "u" in data_in
-        assert "y" in data_in
-        assert "z" in data_in
+        if validate():
+            assert "u" in data_in
+            assert "y" in data_in
+            assert "z" in data_in
 
+        if self.compiled:
+            return self.data_step_compiled(data_in)
+
+        return self._data_step(data_in)
+
+    def _data_step(self, data_in: dict) -> dict:
         data_out = data_in.copy()
 
         ## output actor
@@ -54,10 +65,48 @@ class OptimizerDualH(OptimizerGradientStep):
 
         ## input actor
         # update
-        data_out["u"] = self.next_u(data_out)
+        price = self._du_h(data_in["u"]).mT @ data_out["nu_h"]
+        data_out["u"] = self.next_u(data_out, price)
 
         # cost calculation
-        p = self._system.du_h(data_in["u"]).T @ data_out["nu_h"]
-        data_out["p"] = np.multiply(data_out["u"], p)
+        data_out["p"] = np.multiply(data_out["u"], price)
+
+        return data_out
+
+    def data_step_compiled(self, data_in: dict) -> dict:
+        U, Y = self._system.U, self._system.Y
+        assert U.structure == "box", "compiled data_step requires box input constraints"
+        assert Y.structure == "box", "compiled data_step requires box output constraints"
+
+        u, z, nu_h, p = self._kernels.step_dual_h(
+            self._flat(data_in["u"]),
+            self._flat(data_in["y"]),
+            self._flat(data_in["z"]),
+            self._flat(data_in["nu_h"]),
+            np.ascontiguousarray(self._system.du_h_managed(data_in["u"]), dtype=float),
+            *self._cost_flat,
+            self._flat(U.lower),
+            self._flat(U.upper),
+            self._flat(Y.lower),
+            self._flat(Y.upper),
+            self.alpha,
+            self.beta,
+        )
 
+        data_out = data_in.copy()
+        data_out["nu_h"] = nu_h.reshape(-1, 1)
+        data_out["z"] = z.reshape(-1, 1)
+        data_out["u"] = u.reshape(-1, 1)
+        data_out["p"] = p.reshape(-1, 1)
         return data_out
+
+    def data_initial_batch(self, u_0: np.ndarray) -> dict:
+        data_k0 = super().data_initial_batch(u_0)
+        data_k0["z"] = self._system.Y.proj_2_batch(data_k0["y"])
+        data_k0["nu_h"] = np.zeros((len(u_0), self._system.p, 1))
+
+        data_k0["p"] = np.zeros((len(u_0), self._system.m, 1))
+        return data_k0
+
+    def data_step_batch(self, data_in: dict) -> dict:
+        return self._data_step(data_in)
@@ -2,7 +2,7 @@ import numpy as np
 
 from feedback_opt.optimizers.optimizer_base import OptimizerProximal
 from feedback_opt.systems.system_base import SystemBase
-from feedback_opt.utils import Argmin
+from feedback_opt.utils import ArgminSeparable, validate
 
 
 class OptimizerDualHProximal(OptimizerProximal):
@@ -10,6 +10,8 @@ class OptimizerDualHProximal(OptimizerProximal):
     this algorithm dualizes the ss-map y = h(u)
     """
 
+    PRICES = ("nu_h", "z")
+
     def __init__(
         self,
         params,
@@ -31,9 +33,16 @@ class OptimizerDualHProximal(OptimizerProximal):
         else:
             self.centralized = True
 
-        # cache argmin problems
-        self.prob_prim_u = Argmin(system.U)
-        self.prob_prim_z = Argmin(system.Y)
+        # cache argmin problems, separate into the input blocks (decentralized) and the
+        # outputs (diagonal quad_y) unless the costs couple them
+        self.prob_prim_u = ArgminSeparable(system.U, system.input_blocks(), solver=self.solver)
+        self.prob_prim_z = ArgminSeparable(
+            system.Y, [[i] for i in range(system.p)], solver=self.solver
+        )
+
+        # the centralized input QP couples the input actors
+        if self.actors:
+            assert not self.centralized, "actors require centralized = False"
 
     def data_initial(self, u_0: np.ndarray = None) -> dict:
         data_k0 = super().data_initial(u_0)
@@ -41,86 +50,108 @@ class OptimizerDualHProximal(OptimizerProximal):
         data_k0["nu_h"] = np.zeros((self._system.p, 1))
 
         data_k0["p"] = np.zeros((self._system.m, 1))
+        if self.actors:
+            data_k0 = self.data_initial_actors(data_k0)
         return data_k0
 
-    def next_u(self, data_in: dict) -> np.ndarray:
-        assert np.shape(data_in["u"]) == (self._system.m, 1)
-        assert np.shape(data_in["y"]) == (self._system.p, 1)
-        assert np.shape(data_in["z"]) == (self._system.p, 1)
-        assert np.shape(data_in["nu_h"]) == (self._system.p, 1)
+    def next_u(self, data_in: dict, du_h: np.ndarray) -> np.ndarray:
+        if validate():
+            assert np.shape(data_in["u"])[-2:] == (self._system.m, 1)
+            assert np.shape(data_in["y"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["z"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["nu_h"])[-2:] == (self._system.p, 1)
 
-        # build QP
-        H = self._system.du_h(data_in["u"])
+        u = data_in["u"]
 
+        # build QP
         quad = self.quad_u + self.gamma_u / 2 * np.eye(self._system.m)
         if self.centralized:
-            quad += self.rho / 2 * H.T @ H
+            quad = quad + self.rho / 2 * du_h.mT @ du_h
 
-        lin = self.lin_u + H.T @ data_in["nu_h"] - self.gamma_u * data_in["u"]
+        lin = self.lin_u + du_h.mT @ data_in["nu_h"] - self.gamma_u * u
         if self.centralized:
-            lin += self.rho * H.T @ (data_in["y"] - H @ data_in["u"] - data_in["z"])
+            lin = lin + self.rho * du_h.mT @ (data_in["y"] - du_h @ u - data_in["z"])
 
         # solve QP
-        u = self.prob_prim_u.solve(quad, lin, verify_psd=False)
-        assert u is not None
-
-        return u
+        return self._solve(self.prob_prim_u, quad, lin)
 
     def next_z(self, data_in: dict) -> np.ndarray:
-        assert np.shape(data_in["y"]) == (self._system.p, 1)
-        assert np.shape(data_in["z"]) == (self._system.p, 1)
-        assert np.shape(data_in["nu_h"]) == (self._system.p, 1)
+        if validate():
+            assert np.shape(data_in["y"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["z"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["nu_h"])[-2:] == (self._system.p, 1)
 
         # build QP
         quad = self.quad_y + (self.rho + self.gamma_z) / 2 * np.eye(self._system.p)
         lin = self.lin_y - data_in["nu_h"] - self.rho * data_in["y"] - self.gamma_z * data_in["z"]
 
         # solve QP
-        z = self.prob_prim_z.solve(quad, lin, verify_psd=False)
-        assert z is not None
-
-        return z
+        return self._solve(self.prob_prim_z, quad, lin)
 
     def next_nu_h(self, data_in: dict) -> np.ndarray:
-        assert np.shape(data_in["y"]) == (self._system.p, 1)
-        assert np.shape(data_in["z"]) == (self._system.p, 1)
-        assert np.shape(data_in["nu_h"]) == (self._system.p, 1)
+        if validate():
+            assert np.shape(data_in["y"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["z"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["nu_h"])[-2:] == (self._system.p, 1)
 
         # gradient ascent nu_h
         return data_in["nu_h"] + self.rho * (data_in["y"] - data_in["z"])
 
+    def data_step_prices(self, data_in: dict) -> dict:
+        data_out = data_in.copy()
+        data_out["nu_h"] = self.next_nu_h(data_out)
+        data_out["z"] = self.next_z(data_out)
+        return data_out
+
+    def price_u(self, data_in: dict) -> np.ndarray:
+        H = self._system.du_h_managed(data_in["u"])
+        return H.T @ data_in["nu_h"]
+
     def data_step(self, data_in: dict) -> dict:
         # assert minimum input requirements
-        assert "u" in data_in
-        assert "y" in data_in
-        assert "z" in data_in
-        assert "nu_h" in data_in
+        if validate():
+            assert "u" in data_in
+            assert "y" in data_in
+            assert "z" in data_in
+            assert "nu_h" in data_in
 
-        data_out = data_in.copy()
+        # decentralized execution
+        if self.actors:
+            return self.runtime.step(data_in)
+
+        return self._data_step(data_in)
+
+    def _data_step(self, data_in: dict) -> dict:
+        u, y = data_in["u"], data_in["y"]
 
         ## output actor
-        data_out["nu_h"] = self.next_nu_h(data_out)
-        data_out["z"] = self.next_z(data_out)
+        data_out = self.data_step_prices(data_in)
 
         ## input actor
         # update
-        data_out["u"] = self.next_u(data_out)
+        du_h = self._du_h(u)
+        data_out["u"] = self.next_u(data_out, du_h)
 
         # cost calculation
-        H = self._system.du_h(data_in["u"])
-        p = np.multiply(data_out["u"], H.T @ data_out["nu_h"])
-        p += self.gamma_u / 2 * np.power(data_out["u"] - data_in["u"], 2)
+        du = data_out["u"] - u
+        p = np.multiply(data_out["u"], du_h.mT @ data_out["nu_h"])
+        p += self.gamma_u / 2 * np.power(du, 2)
 
         if self.centralized:
-            p += (
-                self.rho
-                / 2
-                * np.multiply(
-                    data_out["u"] - data_in["u"], H.T @ H @ (data_out["u"] - data_in["u"])
-                )
-            )
-            p += self.rho * np.multiply(data_out["u"], H.T @ (data_in["y"] - data_out["z"]))
+            p += self.rho / 2 * np.multiply(du, du_h.mT @ du_h @ du)
+            p += self.rho * np.multiply(data_out["u"], du_h.mT @ (y - data_out["z"]))
 
         data_out["p"] = p
 
         return data_out
+
+    def data_initial_batch(self, u_0: np.ndarray) -> dict:
+        data_k0 = super().data_initial_batch(u_0)
+        data_k0["z"] = self._system.Y.proj_2_batch(data_k0["y"])
+        data_k0["nu_h"] = np.zeros((len(u_0), self._system.p, 1))
+
+        data_k0["p"] = np.zeros((len(u_0), self._system.m, 1))
+        return data_k0
+
+    def data_step_batch(self, data_in: dict) -> dict:
+        return self._data_step(data_in)
@@ -1,6 +1,7 @@
 import numpy as np
 
 from feedback_opt.optimizers.optimizer_base import OptimizerGradientStep
+from feedback_opt.utils import validate
 
 
 class OptimizerDualY(OptimizerGradientStep):
@@ -15,33 +16,38 @@ class OptimizerDualY(OptimizerGradientStep):
         data_k0["p"] = np.zeros((self._system.m, 1))
         return data_k0
 
-    def next_u(self, data_in: dict) -> np.ndarray:
-        assert np.shape(data_in["u"]) == (self._system.m, 1)
-        assert np.shape(data_in["y"]) == (self._system.p, 1)
-        assert np.shape(data_in["lamb_y"]) == (self._system.Y.num_constr, 1)
+    def next_u(self, data_in: dict, du_h: np.ndarray, price: np.ndarray) -> np.ndarray:
+        if validate():
+            assert np.shape(data_in["u"])[-2:] == (self._system.m, 1)
+            assert np.shape(data_in["y"])[-2:] == (self._system.p, 1)
+            assert np.shape(price)[-2:] == (self._system.m, 1)
 
-        du_h = self._system.du_h(data_in["u"])
-        step_u = (
-            self.du_phi_u(data_in["u"])
-            + du_h.T @ self.dy_phi_y(data_in["y"])
-            + du_h.T @ self._system.Y.A.T @ data_in["lamb_y"]
-        )
+        step_u = self.du_phi_u(data_in["u"]) + du_h.mT @ self.dy_phi_y(data_in["y"]) + price
         u_hat = data_in["u"] - self.alpha * step_u
-        return self._system.U.proj_2(u_hat)
+        return self._proj_2(self._system.U, u_hat)
 
     def next_lamb_y(self, data_in: dict) -> np.ndarray:
-        assert np.shape(data_in["y"]) == (self._system.p, 1)
-        assert np.shape(data_in["lamb_y"]) == (self._system.Y.num_constr, 1)
+        if validate():
+            assert np.shape(data_in["y"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["lamb_y"])[-2:] == (self._system.Y.num_constr, 1)
 
-        lamb_y_hat = data_in["lamb_y"] + self.beta * self._system.Y.c_x(data_in["y"])
+        Y = self._system.Y
+        lamb_y_hat = data_in["lamb_y"] + self.beta * (Y.A @ data_in["y"] - Y.b)
         return np.clip(lamb_y_hat, a_min=0, a_max=None)
 
     def data_step(self, data_in: dict) -> dict:
         # assert minimum input requirements
-        assert "u" in data_in
-        assert "y" in data_in
-        assert "lamb_y" in data_in
+        if validate():
+            assert "u" in data_in
+            assert "y" in data_in
+            assert "lamb_y" in data_in
+
+        if self.compiled:
+            return self.data_step_compiled(data_in)
+
+        return self._data_step(data_in)
 
+    def _data_step(self, data_in: dict) -> dict:
         data_out = data_in.copy()
 
         ## output actor
@@ -49,12 +55,45 @@ class OptimizerDualY(OptimizerGradientStep):
 
         ## input actor
         # update
-        data_out["u"] = self.next_u(data_out)
+        du_h = self._du_h(data_in["u"])
+        price = du_h.mT @ self._system.Y.A.T @ data_out["lamb_y"]
+        data_out["u"] = self.next_u(data_out, du_h, price)
 
         # cost calculation
-        data_out["p"] = np.multiply(
-            data_out["u"],
-            self._system.du_h(data_in["u"]).T @ self._system.Y.A.T @ data_out["lamb_y"],
+        data_out["p"] = np.multiply(data_out["u"], price)
+
+        return data_out
+
+    def data_step_compiled(self, data_in: dict) -> dict:
+        U, Y = self._system.U, self._system.Y
+        assert U.structure == "box", "compiled data_step requires box input constraints"
+
+        u, lamb_y, p = self._kernels.step_dual_y(
+            self._flat(data_in["u"]),
+            self._flat(data_in["y"]),
+            self._flat(data_in["lamb_y"]),
+            np.ascontiguousarray(self._system.du_h_managed(data_in["u"]), dtype=float),
+            *self._cost_flat,
+            np.ascontiguousarray(Y.A, dtype=float),
+            self._flat(Y.b),
+            self._flat(U.lower),
+            self._flat(U.upper),
+            self.alpha,
+            self.beta,
         )
 
+        data_out = data_in.copy()
+        data_out["lamb_y"] = lamb_y.reshape(-1, 1)
+        data_out["u"] = u.reshape(-1, 1)
+        data_out["p"] = p.reshape(-1, 1)
         return data_out
+
+    def data_initial_batch(self, u_0: np.ndarray) -> dict:
+        data_k0 = super().data_initial_batch(u_0)
+        data_k0["lamb_y"] = np.zeros((len(u_0), self._system.Y.num_constr, 1))
+
+        data_k0["p"] = np.zeros((len(u_0), self._system.m, 1))
+        return data_k0
+
+    def data_step_batch(self, data_in: dict) -> dict:
+        return self._data_step(data_in)
@@ -2,7 +2,7 @@ import numpy as np
 
 from feedback_opt.optimizers.optimizer_base import OptimizerProximal
 from feedback_opt.systems.system_base import SystemBase
-from feedback_opt.utils import Argmin
+from feedback_opt.utils import ArgminSeparable, validate
 
 
 class OptimizerDualYProximal(OptimizerProximal):
@@ -10,6 +10,8 @@ class OptimizerDualYProximal(OptimizerProximal):
     this algorithm dualizes the ss-map y = h(u)
     """
 
+    PRICES = ("lamb_y",)
+
     def __init__(
         self,
         params,
@@ -17,74 +19,105 @@ class OptimizerDualYProximal(OptimizerProximal):
     ):
         super().__init__(params=params, system=system)
 
-        # cache argmin problem
-        self.prob_prim_u = Argmin(system.U)
+        # cache argmin problem, separates into the input blocks unless quad_u or quad_y couple
+        self.prob_prim_u = ArgminSeparable(system.U, system.input_blocks(), solver=self.solver)
+
+        # quad_y couples the input actors
+        if self.actors:
+            assert np.all(self.quad_y == 0), "actors require quad_y = 0"
+
+        # quad_y = 0 skips the dense (m,p) x (p,p) output cost terms
+        self.has_quad_y = bool(np.any(self.quad_y))
 
     def data_initial(self, u_0: np.ndarray = None) -> dict:
         data_k0 = super().data_initial(u_0)
         data_k0["lamb_y"] = np.zeros((self._system.Y.num_constr, 1))
 
         data_k0["p"] = np.zeros((self._system.m, 1))
+        if self.actors:
+            data_k0 = self.data_initial_actors(data_k0)
         return data_k0
 
-    def next_u(self, data_in: dict) -> np.ndarray:
-        assert np.shape(data_in["u"]) == (self._system.m, 1)
-        assert np.shape(data_in["y"]) == (self._system.p, 1)
-        assert np.shape(data_in["lamb_y"]) == (self._system.Y.num_constr, 1)
+    def next_u(self, data_in: dict, du_h: np.ndarray) -> np.ndarray:
+        if validate():
+            assert np.shape(data_in["u"])[-2:] == (self._system.m, 1)
+            assert np.shape(data_in["y"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["lamb_y"])[-2:] == (self._system.Y.num_constr, 1)
 
-        # build QP
-        H = self._system.du_h(data_in["u"])
+        u, y = data_in["u"], data_in["y"]
 
-        quad = self.quad_u + H.T @ self.quad_y @ H + self.gamma_u / 2 * np.eye(self._system.m)
-        lin = (
-            self.lin_u
-            + H.T @ self.lin_y
-            - self.gamma_u * data_in["u"]
-            + 2 * H.T @ self.quad_y @ (data_in["y"] - H @ data_in["u"])
-            + H.T @ self._system.Y.A.T @ data_in["lamb_y"]
-        )
+        # build QP
+        quad = self.quad_u
+        lin = self.lin_u + du_h.mT @ self.lin_y - self.gamma_u * u
+        if self.has_quad_y:
+            quad = quad + du_h.mT @ self.quad_y @ du_h
+            lin = lin + 2 * du_h.mT @ self.quad_y @ (y - du_h @ u)
+        quad = quad + self.gamma_u / 2 * np.eye(self._system.m)
+        lin = lin + du_h.mT @ self._system.Y.A.T @ data_in["lamb_y"]
 
         # solve QP
-        u = self.prob_prim_u.solve(quad, lin, verify_psd=False)
-        assert u is not None
-
-        return u
+        return self._solve(self.prob_prim_u, quad, lin)
 
     def next_lamb_y(self, data_in: dict) -> np.ndarray:
-        assert np.shape(data_in["y"]) == (self._system.p, 1)
-        assert np.shape(data_in["lamb_y"]) == (self._system.Y.num_constr, 1)
+        if validate():
+            assert np.shape(data_in["y"])[-2:] == (self._system.p, 1)
+            assert np.shape(data_in["lamb_y"])[-2:] == (self._system.Y.num_constr, 1)
 
         # projected gradient ascent lamb_y
-        lamb_y_hat = data_in["lamb_y"] + self.rho * self._system.Y.c_x(data_in["y"])
+        Y = self._system.Y
+        lamb_y_hat = data_in["lamb_y"] + self.rho * (Y.A @ data_in["y"] - Y.b)
         return np.clip(lamb_y_hat, a_min=0, a_max=None)
 
+    def data_step_prices(self, data_in: dict) -> dict:
+        data_out = data_in.copy()
+        data_out["lamb_y"] = self.next_lamb_y(data_out)
+        return data_out
+
+    def price_u(self, data_in: dict) -> np.ndarray:
+        H = self._system.du_h_managed(data_in["u"])
+        return H.T @ (self._system.Y.A.T @ data_in["lamb_y"] + self.lin_y)
+
     def data_step(self, data_in: dict) -> dict:
         # assert minimum input requirements
-        assert "u" in data_in
-        assert "y" in data_in
-        assert "lamb_y" in data_in
+        if validate():
+            assert "u" in data_in
+            assert "y" in data_in
+            assert "lamb_y" in data_in
 
-        data_out = data_in.copy()
+        # decentralized execution
+        if self.actors:
+            return self.runtime.step(data_in)
+
+        return self._data_step(data_in)
+
+    def _data_step(self, data_in: dict) -> dict:
+        u, y = data_in["u"], data_in["y"]
 
         ## output actor
-        data_out["lamb_y"] = self.next_lamb_y(data_out)
+        data_out = self.data_step_prices(data_in)
 
         ## input actor
         # update
-        data_out["u"] = self.next_u(data_out)
+        du_h = self._du_h(u)
+        data_out["u"] = self.next_u(data_out, du_h)
 
         # cost calculation
-        H = self._system.du_h(data_in["u"])
-        p = np.multiply(
-            data_out["u"],
-            H.T @ self._system.Y.A.T @ data_out["lamb_y"]
-            + 2 * H.T @ self.quad_y @ data_in["y"]
-            + H.T @ self.lin_y,
-        )
-        p += self.gamma_u / 2 * np.power(data_out["u"] - data_in["u"], 2)
-        p += np.multiply(
-            data_in["u"] - data_in["u"], H.T @ self.quad_y @ H @ (data_in["u"] - data_in["u"])
-        )
+        price = du_h.mT @ self._system.Y.A.T @ data_out["lamb_y"]
+        if self.has_quad_y:
+            price = price + 2 * du_h.mT @ self.quad_y @ y
+        price = price + du_h.mT @ self.lin_y
+        p = np.multiply(data_out["u"], price)
+        p += self.gamma_u / 2 * np.power(data_out["u"] - u, 2)
         data_out["p"] = p
 
         return data_out
+
+    def data_initial_batch(self, u_0: np.ndarray) -> dict:
+        data_k0 = super().data_initial_batch(u_0)
+        data_k0["lamb_y"] = np.zeros((len(u_0), self._system.Y.num_constr, 1))
+
+        data_k0["p"] = np.zeros((len(u_0), self._system.m, 1))
+        return data_k0
+
+    def data_step_batch(self, data_in: dict) -> dict:
+        return self._data_step(data_in)
@@ -0,0 +1,108 @@
+import numpy as np
+from numba import njit
+
+# numba compiled step kernels of the gradient step optimizers (params.compiled = True)
+# all vectors are flat (n,) arrays, box projections are passed as lower and upper bounds
+# every kernel reproduces the arithmetic of the corresponding python data_step
+
+
+@njit(cache=True)
+def _matvec(A: np.ndarray, x: np.ndarray) -> np.ndarray:
+    out = np.zeros(A.shape[0])
+    for i in range(A.shape[0]):
+        for j in range(A.shape[1]):
+            out[i] += A[i, j] * x[j]
+    return out
+
+
+@njit(cache=True)
+def _rmatvec(A: np.ndarray, x: np.ndarray) -> np.ndarray:
+    # A^T x
+    out = np.zeros(A.shape[1])
+    for i in range(A.shape[0]):
+        for j in range(A.shape[1]):
+            out[j] += A[i, j] * x[i]
+    return out
+
+
+@njit(cache=True)
+def _clip(x: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    return np.minimum(np.maximum(x, lower), upper)
+
+
+@njit(cache=True)
+def _gradient_u(
+    u: np.ndarray, y: np.ndarray, du_h: np.ndarray, quad_u, lin_u, quad_y, lin_y
+) -> np.ndarray:
+    # du_phi_u(u) + du_h^T dy_phi_y(y)
+    return 2 * _matvec(quad_u, u) + lin_u + _rmatvec(du_h, 2 * _matvec(quad_y, y) + lin_y)
+
+
+@njit(cache=True)
+def step_primal(u, y, du_h, quad_u, lin_u, quad_y, lin_y, A_y, b_y, alpha):
+    """
+    unconstrained gradient step and linearized output constraints of OptimizerPrimal
+
+    :return tuple: u_hat (m,), A_y_u (k,m), b_y_u (k,)
+    """
+    u_hat = u - alpha * _gradient_u(u, y, du_h, quad_u, lin_u, quad_y, lin_y)
+
+    A_y_u = A_y @ du_h
+    b_y_u = _matvec(A_y, _matvec(du_h, u) - y) + b_y
+    return u_hat, A_y_u, b_y_u
+
+
+@njit(cache=True)
+def step_dual_y(
+    u, y, lamb_y, du_h, quad_u, lin_u, quad_y, lin_y, A_y, b_y, lower_u, upper_u, alpha, beta
+):
+    """
+    output and input actor of OptimizerDualY
+
+    :return tuple: u (m,), lamb_y (k,), p (m,)
+    """
+    # output actor
+    lamb_y = np.maximum(lamb_y + beta * (_matvec(A_y, y) - b_y), 0.0)
+
+    # input actor
+    price = _rmatvec(du_h, _rmatvec(A_y, lamb_y))
+    step_u = _gradient_u(u, y, du_h, quad_u, lin_u, quad_y, lin_y) + price
+    u = _clip(u - alpha * step_u, lower_u, upper_u)
+
+    return u, lamb_y, u * price
+
+
+@njit(cache=True)
+def step_dual_h(
+    u,
+    y,
+    z,
+    nu_h,
+    du_h,
+    quad_u,
+    lin_u,
+    quad_y,
+    lin_y,
+    lower_u,
+    upper_u,
+    lower_y,
+    upper_y,
+    alpha,
+    beta,
+):
+    """
+    output and input actor of OptimizerDualH
+
+    :return tuple: u (m,), z (p,), nu_h (p,), p (m,)
+    """
+    # output actor
+    nu_h = nu_h + beta * (y - z)
+    step_z = 2 * _matvec(quad_y, z) + lin_y - nu_h
+    z = _clip(z - alpha * step_z, lower_y, upper_y)
+
+    # input actor
+    price = _rmatvec(du_h, nu_h)
+    step_u = 2 * _matvec(quad_u, u) + lin_u + price
+    u = _clip(u - alpha * step_u, lower_u, upper_u)
+
+    return u, z, nu_h, u * price
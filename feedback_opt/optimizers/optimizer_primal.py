@@ -3,7 +3,8 @@ import warnings
 import numpy as np
 
 from feedback_opt.optimizers.optimizer_base import OptimizerGradientStep
-from feedback_opt.utils import Polytope
+from feedback_opt.systems.system_base import SystemBase
+from feedback_opt.utils import LinearizedProjection, validate
 
 
 class OptimizerPrimal(OptimizerGradientStep):
@@ -16,44 +17,71 @@ class OptimizerPrimal(OptimizerGradientStep):
             c_y(h(u)) <= 0
     """
 
+    def __init__(
+        self,
+        params,
+        system: SystemBase,
+    ):
+        super().__init__(params=params, system=system)
+
+        # cache projection problem onto U and the linearized output constraints Y_u
+        self.prob_proj_u = LinearizedProjection(system.U, system.Y.num_constr)
+
     def primal_step(self, data_in: dict) -> dict:
-        assert np.shape(data_in["u"]) == (self._system.m, 1)
-        assert np.shape(data_in["y"]) == (self._system.p, 1)
+        if validate():
+            assert np.shape(data_in["u"])[-2:] == (self._system.m, 1)
+            assert np.shape(data_in["y"])[-2:] == (self._system.p, 1)
+
+        U, Y = self._system.U, self._system.Y
+        u, y = data_in["u"], data_in["y"]
+        batch = np.ndim(u) == 3
 
         data_out = {}
 
-        # unconstrained gradient descent
-        step = self.du_phi_u(data_in["u"]) + self._system.du_h(data_in["u"]).T @ self.dy_phi_y(
-            data_in["y"]
-        )
-        u_hat = data_in["u"] - self.alpha * step
-
-        # linearized output constraints Y_u
-        A_y_u = self._system.Y.A @ self._system.du_h(data_in["u"])
-        b_y_u = (
-            self._system.Y.A @ (self._system.du_h(data_in["u"]) @ data_in["u"] - data_in["y"])
-            + self._system.Y.b
-        )
-        Y_u = Polytope(A_y_u, b_y_u, self._system.m)
-
-        # complete input constraints
-        constraint_u = self._system.U.intersect_with(Y_u)
-
-        # project input to constraints
-        u_proj = constraint_u.proj_2(u_hat)
-        if u_proj is not None:
-            data_out["u"] = u_proj
+        H = self._du_h(u)
+
+        if self.compiled and not batch:
+            u_hat, A_y_u, b_y_u = self._kernels.step_primal(
+                self._flat(u),
+                self._flat(y),
+                np.ascontiguousarray(H, dtype=float),
+                *self._cost_flat,
+                np.ascontiguousarray(Y.A, dtype=float),
+                self._flat(Y.b),
+                self.alpha,
+            )
+            u_hat, b_y_u = u_hat.reshape(-1, 1), b_y_u.reshape(-1, 1)
         else:
-            warnings.warn("ignoring y constraint linearization")
-            data_out["u"] = self._system.U.proj_2(u_hat)
+            # unconstrained gradient descent
+            step = self.du_phi_u(u) + H.mT @ self.dy_phi_y(y)
+            u_hat = u - self.alpha * step
+
+            # linearized output constraints Y_u
+            A_y_u = Y.A @ H
+            b_y_u = Y.A @ (H @ u - y) + Y.b
+
+        # project input to complete input constraints U and Y_u
+        if batch:
+            u_proj = self.prob_proj_u.proj_2_batch(u_hat, A_y_u, b_y_u)
+            failed = np.any(np.isnan(u_proj), axis=(1, 2))
+            if np.any(failed):
+                warnings.warn("ignoring y constraint linearization")
+                u_proj[failed] = U.proj_2_batch(u_hat[failed])
+        else:
+            u_proj = self.prob_proj_u.proj_2(u_hat, A_y_u, b_y_u)
+            if u_proj is None:
+                warnings.warn("ignoring y constraint linearization")
+                u_proj = U.proj_2(u_hat)
+        data_out["u"] = u_proj
 
         assert data_out["u"] is not None
         return data_out
 
     def data_step(self, data_in: dict) -> dict:
         # assert minimum input requirements
-        assert "u" in data_in
-        assert "y" in data_in
+        if validate():
+            assert "u" in data_in
+            assert "y" in data_in
 
         # primal step
         data_out = self.primal_step(data_in)
@@ -61,3 +89,6 @@ class OptimizerPrimal(OptimizerGradientStep):
         # NO ACTOR OR PRICE INTERPRETATION!
 
         return data_out
+
+    def data_step_batch(self, data_in: dict) -> dict:
+        return self.primal_step(data_in)
@@ -1,8 +1,71 @@
+from contextlib import nullcontext
+
 import numpy as np
 import pandas as pd
 
+from feedback_opt.disturbance import DisturbanceBase, OptimumTracker
 from feedback_opt.optimizers.optimizer_base import OptimizerBase
 from feedback_opt.systems.system_base import SystemBase
+from feedback_opt.utils.utils_profiling import Profiler
+from feedback_opt.utils.utils_sinks import SinkBase
+
+
+class EarlyStop:
+    """
+    terminates a simulation once a monitored metric diverges or converges
+
+    a run diverged if any metric is not finite or exceeds its diverge threshold,
+    it converged if all metrics with a converge threshold stay below it for patience steps
+    """
+
+    def __init__(
+        self,
+        metrics: tuple[str, ...] = ("d", "y_violation"),
+        diverge: float | dict | None = 1e6,
+        converge: float | dict | None = None,
+        patience: int = 10,
+    ):
+        assert isinstance(patience, int) and patience > 0
+        self.metrics = list(metrics)
+        self.diverge = self._thresholds(diverge)
+        self.converge = self._thresholds(converge)
+        self.patience = patience
+
+        self._n_converged = 0
+
+    def _thresholds(self, threshold: float | dict | None) -> dict:
+        if threshold is None:
+            return {}
+        if isinstance(threshold, dict):
+            assert set(threshold).issubset(self.metrics)
+            return threshold
+        return {metric: threshold for metric in self.metrics}
+
+    def reset(self):
+        self._n_converged = 0
+
+    def __call__(self, data: dict) -> str | None:
+        """
+        :param dict data: data at the current timestep
+        :return str: "diverged", "converged" or None to continue
+        """
+        for metric in self.metrics:
+            value = np.max(np.abs(data[metric]))
+            if not np.isfinite(value):
+                return "diverged"
+            if metric in self.diverge and value > self.diverge[metric]:
+                return "diverged"
+
+        if self.converge and all(
+            np.max(np.abs(data[metric])) <= threshold for metric, threshold in self.converge.items()
+        ):
+            self._n_converged += 1
+        else:
+            self._n_converged = 0
+
+        if self._n_converged >= self.patience:
+            return "converged"
+        return None
 
 
 class Simulation:
@@ -48,39 +111,159 @@ class Simulation:
         else:
             self.noise_y_std = 0
 
-    def log(self, history: dict, i: int, row_i: dict):
-        assert history.keys() == row_i.keys(), "Dictionaries do not have the same keys"
-        for key, value in history.items():
-            value[i, :] = row_i[key].flatten()
+        # time-varying operating point, applied before every timestep
+        if hasattr(params, "disturbance"):
+            assert isinstance(params.disturbance, DisturbanceBase)
+            self.disturbance = params.disturbance
+        else:
+            self.disturbance = None
+
+        # moving optimum (replaces u_opt, which becomes the initial guess), logged as u_opt
+        if hasattr(params, "track_optimum") and params.track_optimum:
+            self.tracker = OptimumTracker(self.optimizer)
+        else:
+            self.tracker = None
+
+        # history decimation, every log_stride-th timestep (and the last one) is kept
+        if hasattr(params, "log_stride"):
+            assert isinstance(params.log_stride, int) and params.log_stride > 0
+            self.log_stride = params.log_stride
+        else:
+            self.log_stride = 1
+
+        # history content
+        # "full": every entry of the data dict
+        # "metrics": scalar performance metrics only
+        if hasattr(params, "log_mode"):
+            assert params.log_mode in ["full", "metrics"]
+            self.log_mode = params.log_mode
+        else:
+            self.log_mode = "full"
+
+        # per step wall time of the phases (h, du_h, projections, QPs, logging, ...)
+        # available as self.profiler.frame() and self.profiler.report() after a run
+        if hasattr(params, "profile") and params.profile:
+            self.profiler = Profiler()
+        else:
+            self.profiler = None
+
+        # history schema, derived from the initial data dict on every run
+        self.columns = None
+        self._slices = None
+
+        # termination reason of the last run, "completed" or the status of the EarlyStop
+        self.status = None
+
+    METRICS = ("phi", "y_violation", "d")
+
+    def _schema(self, data: dict):
+        """
+        fixed column layout of the history buffer: a slice of columns per logged key
+        """
+        keys = list(data) if self.log_mode == "full" else self.METRICS
+
+        self.columns = []
+        self._slices = {}
+        for key in keys:
+            num_cols = np.size(data[key])
+            start = len(self.columns)
+            if num_cols == 1:
+                self.columns.append(key)
+            else:
+                self.columns.extend([f"{key}_{i}" for i in range(num_cols)])
+            self._slices[key] = slice(start, start + num_cols)
+
+    def log(self, history: np.ndarray, i: int, row_i: dict):
+        for key, columns in self._slices.items():
+            history[i, columns] = np.ravel(row_i[key])
+
+    def _phase(self, name: str):
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.phase(name)
+
+    def iter_steps(self, early_stop: EarlyStop | None = None):
+        """
+        closed loop simulation of n_steps as generator
+        yields the data dict of every logged timestep (see log_stride), the schema of the
+        logged columns is available in self.columns once the first timestep is yielded
+
+        the yielded data dict is owned by the simulation and must not be modified
+
+        :param EarlyStop early_stop: optional termination criterion, the simulation stops at
+            the step it triggers and the reason is stored in self.status
+        :return generator: (t, data) tuples
+        """
+        if self.profiler is None:
+            yield from self._iter_steps(early_stop)
+            return
+
+        # instrument system and optimizer for the duration of the run
+        self.profiler.reset()
+        self.profiler.attach(self.system)
+        self.profiler.attach(self.optimizer)
+        try:
+            yield from self._iter_steps(early_stop)
+        finally:
+            self.profiler.detach()
+
+    def _iter_steps(self, early_stop: EarlyStop | None):
+        self.status = "completed"
+        if early_stop is not None:
+            early_stop.reset()
+
+        # reset system, including its sensitivity policy, to its initial operating point
+        self.system.reset()
+        policy = self.system.sensitivity_policy
+
+        # initial operating point
+        if self.disturbance is not None:
+            with self._phase("disturbance"):
+                self.disturbance.apply(self.system, 0)
 
-    def run(self):
         # reset optimizer
         data_k = self.optimizer.data_initial(self.u_0)
+        if policy is not None:
+            data_k.update(policy.state())
 
         # initialize suboptimality tracker
-        data_k["d"] = np.linalg.norm(data_k["u"] - self.u_opt, keepdims=True)
+        u_opt = self.u_opt
+        if self.tracker is not None:
+            with self._phase("tracker"):
+                u_opt = self.tracker.solve(u_opt)
+            data_k["u_opt"] = u_opt
+        data_k["d"] = np.linalg.norm(data_k["u"] - u_opt, keepdims=True)
 
-        # initialize history dict
-        history = {
-            key: np.zeros((self.n_steps + 1, value.shape[0])) for key, value in data_k.items()
-        }
+        # history schema
+        self._schema(data_k)
 
         # log initial timestep k=0
-        self.log(history, 0, data_k)
+        yield 0, data_k
 
-        # sample measurement noise
-        np.random.seed(self.noise_seed)
-        y_noise = np.random.normal(scale=self.noise_y_std, size=(self.system.p, self.n_steps))
+        # measurement noise, drawn step by step such that memory does not grow with n_steps
+        rng = np.random.default_rng(self.noise_seed)
 
         ## simulation loop
+        t = 0
         for i in range(self.n_steps):
+            # close timing records of the previous timestep
+            if self.profiler is not None:
+                self.profiler.step(t)
+
             # add measurement noise
-            if y_noise is not None:
-                data_k["y"] = data_k["y"] + y_noise[:, i].reshape(-1, 1)
+            if self.noise_y_std > 0:
+                data_k["y"] = data_k["y"] + rng.normal(
+                    scale=self.noise_y_std, size=(self.system.p, 1)
+                )
 
             # feedback optimization
             data_kp1 = self.optimizer.data_step(data_k)
 
+            # update operating point
+            if self.disturbance is not None:
+                with self._phase("disturbance"):
+                    self.disturbance.apply(self.system, i + 1)
+
             # apply new u at system
             data_kp1["y"] = self.system.h(data_kp1["u"])
 
@@ -91,25 +274,198 @@ class Simulation:
             data_kp1 = self.optimizer.data_y_violation(data_kp1)
 
             # evaluate dist to opt
-            data_kp1["d"] = np.linalg.norm(data_k["u"] - self.u_opt)
+            data_kp1["d"] = np.linalg.norm(data_k["u"] - u_opt)
 
-            # log noise free performance
-            self.log(history, i + 1, data_kp1)
+            # update moving optimum
+            if self.tracker is not None:
+                with self._phase("tracker"):
+                    u_opt = self.tracker.solve(u_opt)
+                data_kp1["u_opt"] = u_opt
+
+            # log sensitivity policy
+            if policy is not None:
+                data_kp1.update(policy.state())
 
             data_k = data_kp1
 
-        # convert history dict to dataframe
-        colnames = []
-        data = []
-        for name, matrix in history.items():
-            num_cols = matrix.shape[1]
-            if num_cols == 1:
-                colnames.extend([name])
-            else:
-                colnames.extend([f"{name}_{i}" for i in range(num_cols)])
-            data.append(matrix)
-        data = np.hstack(data)
-        result = pd.DataFrame(data, columns=colnames)
-        result.index.name = "t"
+            # early termination
+            if early_stop is not None:
+                status = early_stop(data_kp1)
+                if status is not None:
+                    self.status = status
+
+            # log noise free performance
+            t = i + 1
+            is_last = t == self.n_steps or self.status != "completed"
+            if t % self.log_stride == 0 or is_last:
+                yield t, data_kp1
+
+            if is_last:
+                break
+
+        if self.profiler is not None:
+            self.profiler.step(t)
+
+    def run(self, early_stop: EarlyStop | None = None, sink: SinkBase | None = None):
+        """
+        closed loop simulation of n_steps
+
+        :param EarlyStop early_stop: optional termination criterion, the history is truncated
+            at the step it triggers and the reason is stored in self.status
+        :param SinkBase sink: if given, the history is streamed to the sink chunk by chunk
+            instead of being kept in memory
+        :return pd.DataFrame: history, None if streamed to a sink
+        """
+        n_rows = self.n_steps // self.log_stride + 2
+        steps = self.iter_steps(early_stop)
+
+        if sink is not None:
+            row = np.empty((1, 0))
+            with sink:
+                for t, data in steps:
+                    if t == 0:
+                        sink.open(self.columns, n_rows)
+                        row = np.empty((1, len(self.columns)))
+                    with self._phase("logging"):
+                        self.log(row, 0, data)
+                        sink.write(t, row[0])
+            return None
+
+        # initialize history buffer
+        history = None
+        timesteps = np.empty(n_rows, dtype=int)
+        n_logged = 0
+        for t, data in steps:
+            if history is None:
+                history = np.empty((n_rows, len(self.columns)))
+            with self._phase("logging"):
+                self.log(history, n_logged, data)
+            timesteps[n_logged] = t
+            n_logged += 1
+
+        # wrap history buffer without copying
+        result = pd.DataFrame(
+            history[:n_logged],
+            columns=self.columns,
+            index=pd.Index(timesteps[:n_logged], name="t"),
+        )
 
         return result
+
+
+class BatchSimulation(Simulation):
+    """
+    many independent closed loop simulations of the same system and optimizer at once
+    every entry of the data dict carries a leading batch axis (B,.,1), each step evaluates
+    the vectorized system maps, projections and QPs for the whole batch
+
+    runs differ by their initial input and measurement noise seed, run i reproduces
+    Simulation with u_0 = u_0[i] and noise_seed = noise_seeds[i]
+    """
+
+    def __init__(
+        self,
+        params,
+        system: SystemBase,
+        optimizer: OptimizerBase,
+        u_0: np.ndarray | None = None,
+        noise_seeds: list[int] | None = None,
+    ):
+        super().__init__(params, system, optimizer)
+        assert self.disturbance is None and self.tracker is None, "batches must be static"
+        assert self.system.sensitivity_policy is None, "batches use the exact sensitivity"
+        assert self.profiler is None, "batches are not profiled"
+
+        # batch size
+        if u_0 is not None:
+            assert np.shape(u_0)[1:] == (self.system.m, 1)
+            self.batch_size = len(u_0)
+        elif noise_seeds is not None:
+            self.batch_size = len(noise_seeds)
+        else:
+            self.batch_size = 1
+
+        # initial u guesses
+        if u_0 is None:
+            u_0 = np.tile(self.u_0, (self.batch_size, 1, 1))
+        self.u_0 = np.asarray(u_0, dtype=float)
+
+        # measurement noise seeds
+        if noise_seeds is None:
+            noise_seeds = [self.noise_seed] * self.batch_size
+        assert len(noise_seeds) == self.batch_size
+        self.noise_seeds = list(noise_seeds)
+
+    def log(self, history: np.ndarray, i: int, row_i: dict):
+        for key, columns in self._slices.items():
+            history[i, :, columns] = row_i[key].reshape(self.batch_size, -1)
+
+    def run(self):
+        """
+        closed loop simulation of n_steps for every run of the batch
+
+        :return pd.DataFrame: history indexed by run and timestep t
+        """
+        self.status = "completed"
+
+        # reset system
+        self.system.reset()
+
+        # reset optimizer
+        data_k = self.optimizer.data_initial_batch(self.u_0)
+
+        # initialize suboptimality tracker
+        data_k["d"] = np.linalg.norm(data_k["u"] - self.u_opt, axis=(1, 2), keepdims=True)
+
+        # initialize history buffer (timestep, run, column)
+        self._schema({key: value[0] for key, value in data_k.items()})
+        n_rows = self.n_steps // self.log_stride + 2
+        history = np.empty((n_rows, self.batch_size, len(self.columns)))
+        timesteps = np.empty(n_rows, dtype=int)
+
+        # log initial timestep k=0
+        self.log(history, 0, data_k)
+        timesteps[0] = 0
+        n_logged = 1
+
+        # measurement noise per run, the same draws as Simulation with noise_seed = seed
+        rngs = [np.random.default_rng(seed) for seed in self.noise_seeds]
+
+        ## simulation loop
+        for i in range(self.n_steps):
+            # add measurement noise
+            if self.noise_y_std > 0:
+                data_k["y"] = data_k["y"] + np.stack(
+                    [rng.normal(scale=self.noise_y_std, size=(self.system.p, 1)) for rng in rngs]
+                )
+
+            # feedback optimization
+            data_kp1 = self.optimizer.data_step_batch(data_k)
+
+            # apply new u at system
+            data_kp1["y"] = self.system.h_batch(data_kp1["u"])
+
+            # evaluate cost function
+            data_kp1 = self.optimizer.data_cost_batch(data_kp1)
+
+            # evaluate y violation
+            data_kp1 = self.optimizer.data_y_violation_batch(data_kp1)
+
+            # evaluate dist to opt
+            data_kp1["d"] = np.linalg.norm(data_k["u"] - self.u_opt, axis=(1, 2), keepdims=True)
+
+            data_k = data_kp1
+
+            # log noise free performance
+            t = i + 1
+            if t % self.log_stride == 0 or t == self.n_steps:
+                self.log(history, n_logged, data_kp1)
+                timesteps[n_logged] = t
+                n_logged += 1
+
+        # runs as outer index
+        history = history[:n_logged].transpose(1, 0, 2).reshape(-1, len(self.columns))
+        index = pd.MultiIndex.from_product(
+            [range(self.batch_size), timesteps[:n_logged]], names=["run", "t"]
+        )
+        return pd.DataFrame(history, columns=self.columns, index=index)
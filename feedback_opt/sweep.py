@@ -0,0 +1,216 @@
+import itertools
+import math
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from feedback_opt.experiment import get_system
+from feedback_opt.optimizers.optimizer_base import OptimizerBase
+from feedback_opt.simulation import EarlyStop, Simulation
+from feedback_opt.utils.utils_errors import SolverError
+
+# hyperparameter search over optimizer params (alpha, beta, rho, gamma_u, gamma_z, ...)
+# every candidate is a dict of overrides applied on top of the base optimizer params
+
+
+def grid_candidates(space: dict) -> list[dict]:
+    """
+    cartesian product of the listed values
+
+    :param dict space: param name -> list of values
+    :return list: candidates
+    """
+    assert all(isinstance(values, list) for values in space.values()), "grid needs value lists"
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+
+def random_candidates(space: dict, n_samples: int, seed: int | None = None) -> list[dict]:
+    """
+    independent random samples
+
+    :param dict space: param name -> list of values (uniform choice),
+        (low, high) (uniform) or (low, high, "log") (log-uniform)
+    :param int n_samples: number of candidates
+    :param int seed: random seed
+    :return list: candidates
+    """
+    assert isinstance(n_samples, int) and n_samples > 0
+    rng = np.random.default_rng(seed)
+
+    candidates = []
+    for _ in range(n_samples):
+        candidate = {}
+        for name, values in space.items():
+            if isinstance(values, list):
+                candidate[name] = values[rng.integers(len(values))]
+            elif len(values) == 3:
+                assert values[2] == "log" and 0 < values[0] <= values[1]
+                candidate[name] = float(np.exp(rng.uniform(np.log(values[0]), np.log(values[1]))))
+            else:
+                assert len(values) == 2 and values[0] <= values[1]
+                candidate[name] = float(rng.uniform(values[0], values[1]))
+        candidates.append(candidate)
+    return candidates
+
+
+def _run_candidate(job: dict) -> dict:
+    system = get_system(job["system_factory"], job["params_sys"])
+
+    params_opt = type("opt", (job["params_opt"],), dict(job["candidate"]))
+    try:
+        optimizer = job["optimizer_class"](params_opt, system)
+    except AssertionError as error:
+        # e.g. step size violates the optimizer's admissible range
+        return {
+            **job["candidate"],
+            "n_steps": 0,
+            "status": "invalid",
+            "score": np.inf,
+            "error": str(error),
+        }
+    assert isinstance(optimizer, OptimizerBase)
+
+    params_sim = type("sim", (job["params_sim"],), {"n_steps": job["n_steps"]})
+    simulation = Simulation(params_sim, system, optimizer)
+
+    early_stop = EarlyStop(**job["early_stop"])
+    try:
+        history = simulation.run(early_stop=early_stop)
+        status = simulation.status
+    except (SolverError, ArithmeticError, ValueError, RuntimeError) as error:
+        # e.g. power flow (PowerFlowNotConverged) or a qp did not converge for diverging
+        # setpoints
+        return {
+            **job["candidate"],
+            "n_steps": 0,
+            "status": "failed",
+            "score": np.inf,
+            "error": str(error),
+        }
+
+    # score: mean of the metric over the tail of the run, diverged runs are discarded
+    tail = history[job["metric"]].iloc[-job["score_window"] :]
+    score = np.inf if status == "diverged" else float(np.mean(tail))
+
+    return {
+        **job["candidate"],
+        "n_steps": int(history.index[-1]),
+        "status": status,
+        "score": score,
+        "error": None,
+    }
+
+
+def _evaluate(jobs: list[dict], max_workers: int | None, progress: bool) -> list[dict]:
+    if max_workers == 1:
+        return [_run_candidate(job) for job in tqdm(jobs, disable=not progress)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(tqdm(executor.map(_run_candidate, jobs), total=len(jobs), disable=not progress))
+
+
+def sweep(
+    scenario,
+    system_factory: Callable,
+    optimizer_class: type,
+    params_opt,
+    space: dict,
+    method: str = "grid",
+    n_samples: int = 20,
+    metric: str = "d",
+    score_window: int = 10,
+    early_stop: dict | None = None,
+    eta: int = 3,
+    min_steps: int | None = None,
+    seed: int | None = None,
+    max_workers: int | None = None,
+    progress: bool = True,
+) -> pd.DataFrame:
+    """
+    hyperparameter search for a single optimizer on a single scenario
+    candidates are simulated in parallel and terminated early once they diverge or converge
+
+    methods
+    - "grid": every combination of the value lists in space
+    - "random": n_samples random candidates drawn from space
+    - "halving": successive halving over random (or grid, if space only holds lists)
+      candidates, every round keeps the best 1/eta candidates and multiplies the
+      simulation length by eta until scenario.sim.n_steps is reached
+
+    :param scenario: scenario parameters, providing .sys and .sim
+    :param Callable system_factory: builds a system from scenario.sys, e.g. SystemElectrical
+    :param type optimizer_class: optimizer to tune, e.g. OptimizerDualY
+    :param params_opt: base optimizer params, candidates override single attributes
+    :param dict space: param name -> search space, see grid_candidates and random_candidates
+    :param str method: "grid", "random" or "halving"
+    :param int n_samples: number of random candidates
+    :param str metric: history column to minimize, e.g. "d", "phi" or "y_violation"
+    :param int score_window: number of trailing timesteps the metric is averaged over
+    :param dict early_stop: keyword arguments of EarlyStop
+    :param int eta: halving rate
+    :param int min_steps: simulation length of the first halving round
+    :param int seed: random seed for sampling candidates
+    :param int max_workers: number of worker processes, 1 runs in the calling process
+    :param bool progress: show progress bar
+    :return pd.DataFrame: one row per evaluated candidate and round, sorted by score
+    """
+    assert method in ["grid", "random", "halving"]
+    assert hasattr(scenario, "sys") and hasattr(scenario, "sim")
+    assert isinstance(eta, int) and eta >= 2
+
+    if early_stop is None:
+        early_stop = {}
+    n_steps = scenario.sim.n_steps
+
+    if method == "grid":
+        candidates = grid_candidates(space)
+    elif method == "random":
+        candidates = random_candidates(space, n_samples, seed)
+    elif all(isinstance(values, list) for values in space.values()):
+        candidates = grid_candidates(space)
+    else:
+        candidates = random_candidates(space, n_samples, seed)
+
+    # simulation length per round
+    if method == "halving":
+        n_rounds = max(1, math.ceil(math.log(len(candidates), eta)))
+        if min_steps is None:
+            min_steps = max(1, n_steps // eta ** (n_rounds - 1))
+        budgets = [min(n_steps, min_steps * eta**r) for r in range(n_rounds)]
+        budgets[-1] = n_steps
+    else:
+        budgets = [n_steps]
+
+    def job(candidate: dict, budget: int) -> dict:
+        return {
+            "system_factory": system_factory,
+            "params_sys": scenario.sys,
+            "params_sim": scenario.sim,
+            "optimizer_class": optimizer_class,
+            "params_opt": params_opt,
+            "candidate": candidate,
+            "n_steps": budget,
+            "metric": metric,
+            "score_window": score_window,
+            "early_stop": early_stop,
+        }
+
+    rows = []
+    for r, budget in enumerate(budgets):
+        results = _evaluate([job(c, budget) for c in candidates], max_workers, progress)
+        for result in results:
+            result["round"] = r
+        rows.extend(results)
+
+        # keep the best 1/eta candidates for the next round
+        ranked = sorted(zip(candidates, results), key=lambda cr: cr[1]["score"])
+        n_keep = max(1, math.ceil(len(candidates) / eta))
+        candidates = [c for c, result in ranked[:n_keep] if np.isfinite(result["score"])]
+        if not candidates:
+            break
+
+    result = pd.DataFrame(rows)
+    return result.sort_values(["round", "score"], ascending=[False, True], ignore_index=True)
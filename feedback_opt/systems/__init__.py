@@ -1,4 +1,27 @@
 """systems"""
 
-from .system_electrical import SystemElectrical
 from .system_non_linear import SystemNonLinear
+from .system_sensitivity import (
+    SensitivityBroyden,
+    SensitivityEveryK,
+    SensitivityPolicy,
+    SensitivityThreshold,
+)
+
+__all__ = [
+    "SensitivityBroyden",
+    "SensitivityEveryK",
+    "SensitivityPolicy",
+    "SensitivityThreshold",
+    "SystemElectrical",
+    "SystemNonLinear",
+]
+
+
+def __getattr__(name: str):
+    # SystemElectrical pulls in pandapower and numba, imported on first access only
+    if name == "SystemElectrical":
+        from .system_electrical import SystemElectrical
+
+        return SystemElectrical
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
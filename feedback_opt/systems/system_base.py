@@ -1,8 +1,12 @@
+import copy
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from types import MappingProxyType
 
 import numpy as np
 
-from feedback_opt.utils import Polytope
+from feedback_opt.systems.system_sensitivity import SensitivityPolicy
+from feedback_opt.utils import Polytope, validate
 
 
 class SystemBase(ABC):
@@ -13,6 +17,9 @@ class SystemBase(ABC):
     The class is intended to be immutable after initialization!
     """
 
+    # methods timed by the Profiler
+    PROFILE_METHODS = MappingProxyType({"h": "h", "du_h": "du_h"})
+
     def __init__(self, params):
         # system dimensions
         assert isinstance(params.m, int)
@@ -31,6 +38,13 @@ class SystemBase(ABC):
         else:
             self.Y = Polytope.full_space(params.p)
 
+        # sensitivity policy of du_h_managed, copied such that every system owns its state
+        if hasattr(params, "sensitivity") and params.sensitivity is not None:
+            assert isinstance(params.sensitivity, SensitivityPolicy)
+            self.sensitivity_policy = copy.deepcopy(params.sensitivity)
+        else:
+            self.sensitivity_policy = None
+
     ### steady state map
     @abstractmethod
     def h(self, u: np.ndarray) -> np.ndarray:
@@ -52,3 +66,114 @@ class SystemBase(ABC):
         :return np.array: steady-state map sensitivity (p,m)
         """
         raise NotImplementedError
+
+    def h_batch(self, u: np.ndarray) -> np.ndarray:
+        """
+        steady state map for a batch of inputs, evaluated one by one unless overridden
+
+        :param np.array u: input vectors (B,m,1)
+        :return np.array: steady-state output vectors (B,p,1)
+        """
+        if validate():
+            assert np.shape(u)[1:] == (self.m, 1)
+        return np.stack([self.h(u_i) for u_i in u])
+
+    def du_h_batch(self, u: np.ndarray) -> np.ndarray:
+        """
+        steady state map Jacobian for a batch of inputs, evaluated one by one unless overridden
+
+        :param np.array u: input vectors (B,m,1)
+        :return np.array: steady-state map sensitivities (B,p,m)
+        """
+        if validate():
+            assert np.shape(u)[1:] == (self.m, 1)
+        return np.stack([self.du_h(u_i) for u_i in u])
+
+    def du_h_managed(self, u: np.ndarray) -> np.ndarray:
+        """
+        steady state map Jacobian as used by the optimizers:
+        du_h, unless a sensitivity policy reuses or approximates it
+
+        :param np.array u: input vector (m,1)
+        :return np.array: steady-state map sensitivity (p,m)
+        """
+        if self.sensitivity_policy is None:
+            return self.du_h(u)
+        return self.sensitivity_policy.du_h(self, u)
+
+    def input_blocks(self) -> list:
+        """
+        independently actuated blocks of u, e.g. the input actors of the decentralized
+        optimizers
+
+        :return list: index arrays partitioning range(m), every coordinate by default
+        """
+        return [np.array([i]) for i in range(self.m)]
+
+    def reset(self):
+        """
+        drop any state accumulated by previous evaluations (caches, warm starts)
+        such that subsequent runs are reproducible
+        """
+        if self.sensitivity_policy is not None:
+            self.sensitivity_policy.reset()
+
+    def evaluate(self, u: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        steady state map and its Jacobian at the same input
+
+        :param np.array u: input vector (m,1)
+        :return tuple: steady-state output vector (p,1) and sensitivity (p,m)
+        """
+        return self.h(u), self.du_h(u)
+
+
+class EvaluationCache:
+    """
+    memoizes system evaluations keyed by the input vector u
+    entries are looked up by the bytes of u, and if tol > 0 by max-norm distance to u
+    """
+
+    def __init__(self, size: int = 4, tol: float = 0.0):
+        assert isinstance(size, int) and size > 0
+        assert isinstance(tol, (int, float)) and tol >= 0
+        self.size = size
+        self.tol = float(tol)
+
+        self._entries = OrderedDict()
+
+        # counters
+        self.n_hits = 0
+        self.n_misses = 0
+
+    @staticmethod
+    def _key(u: np.ndarray) -> bytes:
+        return np.ascontiguousarray(u, dtype=float).tobytes()
+
+    def get(self, u: np.ndarray) -> dict | None:
+        key = self._key(u)
+        entry = self._entries.get(key)
+
+        if entry is None and self.tol > 0:
+            for candidate_key, candidate in self._entries.items():
+                if np.max(np.abs(candidate["u"] - u)) <= self.tol:
+                    key, entry = candidate_key, candidate
+                    break
+
+        if entry is None:
+            self.n_misses += 1
+            return None
+
+        self.n_hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, u: np.ndarray, entry: dict) -> dict:
+        entry["u"] = np.array(u, dtype=float)
+        self._entries[self._key(u)] = entry
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
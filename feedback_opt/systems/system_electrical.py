@@ -1,11 +1,69 @@
+import copy
 import os
+from types import MappingProxyType
 
 import numpy as np
 import pandapower as pp
 import pandas as pd
+from scipy.sparse.linalg import splu
 
-from feedback_opt.systems.system_base import SystemBase
-from feedback_opt.utils import UtilsPd, get_sens_powerInjections_to_voltage
+from feedback_opt.systems.system_base import EvaluationCache, SystemBase
+from feedback_opt.utils import (
+    PowerFlow,
+    SolverError,
+    UtilsPd,
+    get_sens_powerInjections_to_voltage,
+    validate,
+)
+
+
+class PowerFlowNotConverged(SolverError, pp.LoadflowNotConverged):
+    """
+    PowerFlowNotConverged: the power flow of an input did not converge
+    """
+
+
+class NetworkIndex:
+    """
+    static bus index mappings of a pandapower net, compiled once after the initial power flow
+    bus indices refer to the internal (ppc) bus order unless stated otherwise
+    """
+
+    def __init__(self, net: pp.pandapowerNet):
+        internal = net._ppc["internal"]
+        lookup = net._pd2ppc_lookups["bus"]
+
+        # bus types
+        self.n = internal["Ybus"].shape[0]
+        self.slack = internal["ref"]
+        assert len(self.slack) == 1, "multiple slack busses are currently not supported"
+        assert len(internal["pv"]) == 0, "PV busses are currently not supported"
+        self.pq = internal["pq"]
+        self.sgen = lookup[net.sgen["bus"].to_numpy()]
+        self.load = lookup[net.load["bus"].to_numpy()]
+        self.p = len(self.pq)
+        self.n_sgen = len(self.sgen)
+
+        # row of every ppc bus in net.bus / net.res_bus
+        self.bus_row = np.full(self.n, -1)
+        self.bus_row[lookup[net.bus.index.to_numpy()]] = np.arange(len(net.bus))
+        self.pq_row = self.bus_row[self.pq]
+
+        # position of every sgen bus within the pq busses
+        pq_pos = np.full(self.n, -1)
+        pq_pos[self.pq] = np.arange(self.p)
+        self.sgen_in_pq = pq_pos[self.sgen]
+        assert np.all(self.sgen_in_pq >= 0), "sgens must be connected to PQ busses"
+
+        # reduced Jacobian: [vm; va] columns and [p; q] rows of the pq busses
+        self.jac_pq = np.concatenate((self.pq, self.pq + self.n))
+
+        # unit right hand sides selecting the sgen [p; q] injections in the reduced Jacobian
+        self.jac_sgen_rhs = np.zeros((2 * self.p, 2 * self.n_sgen))
+        self.jac_sgen_rhs[
+            np.concatenate((self.sgen_in_pq, self.sgen_in_pq + self.p)),
+            np.arange(2 * self.n_sgen),
+        ] = 1
 
 
 class SystemElectrical(SystemBase):
@@ -13,41 +71,167 @@ class SystemElectrical(SystemBase):
     unconstrained system defined by io map:
     y = h(u)
 
-    The class is intended to be immutable after initialization!
+    The class is intended to be immutable after initialization,
+    apart from the operating point set by set_disturbance!
     """
 
-    def __init__(self, params):
-        # pandapower net
-        assert isinstance(params.net_path, str)
+    # methods timed by the Profiler
+    PROFILE_METHODS = MappingProxyType(
+        {
+            **SystemBase.PROFILE_METHODS,
+            "_apply_u": "power_flow",
+            "_solve_power_flow": "power_flow",
+            "_sensitivity": "sensitivity",
+        }
+    )
+
+    # written into params on initialization, derived from the net
+    DERIVED_PARAMS = ("m", "p", "A_u", "b_u", "A_y", "b_y")
+
+    @staticmethod
+    def net_file(net_path: str) -> str:
+        """
+        :param str net_path: path of the network json relative to the prime directory
+        :return str: absolute path of the network json
+        """
+        assert isinstance(net_path, str)
         cwd = os.path.abspath(os.getcwd())
         cwd = cwd[: cwd.rfind("prime") + len("prime")]
-        self.net = pp.from_json(f"{cwd}/{params.net_path}")
+        return f"{cwd}/{net_path}"
+
+    @classmethod
+    def input_files(cls, params) -> list[str]:
+        """
+        :return list: files read on initialization, their content is part of the ResultCache key
+        """
+        if hasattr(params, "net"):
+            return []
+        return [cls.net_file(params.net_path)]
+
+    def __init__(self, params):
+        # pandapower net, either given (e.g. synthetic_feeder), built by a function without
+        # arguments or loaded from net_path
+        if hasattr(params, "net"):
+            if isinstance(params.net, pp.pandapowerNet):
+                self.net = copy.deepcopy(params.net)
+            else:
+                self.net = params.net()
+                assert isinstance(self.net, pp.pandapowerNet)
+        else:
+            self.net = pp.from_json(self.net_file(params.net_path))
 
         pp.runpp(self.net)
-        self.base_mva = self.net._ppc["internal"]["baseMVA"]
-        self.Y_admittance = self.net._ppc["internal"]["Ybus"].todense()
+        internal = self.net._ppc["internal"]
+        self.base_mva = internal["baseMVA"]
+        self.Y_admittance = internal["Ybus"].tocsr()
 
         # extract bus mapping
-        self.bus_tot = self.net._pd2ppc_lookups["bus"]
-        self.bus_slack = self.net._ppc["internal"]["ref"]
-        assert len(self.bus_slack) == 1, "multiple slack busses are currently not supported"
-        assert len(self.net._ppc["internal"]["pv"]) == 0, "PV busses are currently not supported"
-        self.bus_pq = self.net._ppc["internal"]["pq"]
-        self.bus_sgen = self.net.sgen["bus"].to_numpy()
+        self.index = NetworkIndex(self.net)
+
+        # effective weight of every sgen setpoint in the bus injections
+        self.sgen_weight = (
+            self.net.sgen["scaling"].to_numpy() * self.net.sgen["in_service"].to_numpy()
+        )
+
+        # power flow solver
+        # "newton": dedicated warm started Newton-Raphson on the fixed network (default)
+        # "pandapower": pp.runpp on the pandapower net for every evaluation
+        if hasattr(params, "power_flow"):
+            assert params.power_flow in ["newton", "pandapower"]
+            self.power_flow = params.power_flow
+        else:
+            self.power_flow = "newton"
+
+        # base bus injections without sgens in pu
+        sgen_pu = (self.net.sgen["p_mw"] + 1j * self.net.sgen["q_mvar"]).to_numpy() / self.base_mva
+        self.S_base = internal["Sbus"].copy()
+        np.subtract.at(self.S_base, self.index.sgen, self.sgen_weight * sgen_pu)
+        self.V_initial = internal["V"].copy()
+
+        # constant power load injections in pu, scaled by set_disturbance
+        self.load_scaling_initial = self.net.load["scaling"].to_numpy().copy()
+        self.load_pu = (self.net.load["p_mw"] + 1j * self.net.load["q_mvar"]).to_numpy()
+        self.load_pu = self.load_pu * self.net.load["in_service"].to_numpy() / self.base_mva
+        self.S_base_initial = self.S_base.copy()
+        self.S_no_load = self.S_base.copy()
+        np.add.at(self.S_no_load, self.index.load, self.load_scaling_initial * self.load_pu)
+        self.pf = PowerFlow(self.Y_admittance, self.V_initial, self.index.pq)
 
         # input dimension
         # [p_pu, q_pu ...] in PU stacked for each generator
-        params.m = 2 * len(self.bus_sgen)
+        params.m = 2 * self.index.n_sgen
 
         # output dimension
         # [vm_pu ...] in PU for every PQ bus
-        params.p = len(self.bus_pq)
+        params.p = self.index.p
 
         # system constraints
         self._load_constraint_polytopes(params)
 
         super().__init__(params)
 
+        # evaluation cache, one power flow per distinct u
+        cache_size = params.cache_size if hasattr(params, "cache_size") else 4
+        cache_tol = params.cache_tol if hasattr(params, "cache_tol") else 0.0
+        self._cache = EvaluationCache(size=cache_size, tol=cache_tol)
+        self.n_power_flows = 0
+
+        # static input constraints, restored by reset
+        self.b_u_initial = self.U.b.copy()
+
+    @property
+    def n_cache_hits(self) -> int:
+        return self._cache.n_hits
+
+    def input_blocks(self) -> list:
+        # [p, q] setpoint of every sgen
+        n_sgen = self.index.n_sgen
+        return [np.array([i, n_sgen + i]) for i in range(n_sgen)]
+
+    def reset(self):
+        super().reset()
+        self.U.set_b(self.b_u_initial)
+        self.S_base = self.S_base_initial.copy()
+        self.net.load["scaling"] = self.load_scaling_initial
+        self._cache.clear()
+        self.pf.V = self.V_initial.copy()
+
+    def set_disturbance(
+        self,
+        sgen_max_p_mw: np.ndarray | None = None,
+        load_scaling: np.ndarray | float | None = None,
+    ):
+        """
+        update the time-varying operating point in place
+
+        :param np.array sgen_max_p_mw: available active power of every sgen in MW (n_sgen,),
+            replaces the upper active power bounds of U, capped at the sgen rating
+        :param np.array load_scaling: scaling of every load (n_load,) or of all loads,
+            relative to the network data
+        """
+        if sgen_max_p_mw is not None:
+            n_sgen = self.index.n_sgen
+            if validate():
+                assert np.shape(sgen_max_p_mw) == (n_sgen,)
+            max_p_pu = np.asarray(sgen_max_p_mw, dtype=float) / self.base_mva
+
+            # b_u = [max_p, max_q, -min_p, -min_q], min_p is capped at the available power
+            b_u = self.b_u_initial.copy()
+            max_p_pu = np.minimum(max_p_pu, b_u[:n_sgen, 0])
+            b_u[:n_sgen, 0] = max_p_pu
+            b_u[2 * n_sgen : 3 * n_sgen, 0] = np.maximum(b_u[2 * n_sgen : 3 * n_sgen, 0], -max_p_pu)
+            self.U.set_b(b_u)
+
+        if load_scaling is not None:
+            scaling = np.broadcast_to(load_scaling, self.load_scaling_initial.shape)
+            scaling = scaling * self.load_scaling_initial
+            self.S_base = self.S_no_load.copy()
+            np.subtract.at(self.S_base, self.index.load, scaling * self.load_pu)
+            self.net.load["scaling"] = scaling
+
+            # outputs depend on the loads
+            self._cache.clear()
+
     def _load_constraint_polytopes(self, params):
         # input constraints
         df_sgen = self.net.sgen.copy()
@@ -77,11 +261,15 @@ class SystemElectrical(SystemBase):
         df_bus = self.net.bus.copy()
         params.A_y = np.vstack([np.eye(params.p), -np.eye(params.p)])
         params.b_y = np.hstack(
-            [df_bus["max_vm_pu"][self.bus_pq], -df_bus["min_vm_pu"][self.bus_pq]]
+            [
+                df_bus["max_vm_pu"].to_numpy()[self.index.pq_row],
+                -df_bus["min_vm_pu"].to_numpy()[self.index.pq_row],
+            ]
         ).reshape(-1, 1)
 
     def _apply_u(self, u: np.ndarray) -> pd.DataFrame:
-        assert np.shape(u) == (self.m, 1)
+        if validate():
+            assert np.shape(u) == (self.m, 1)
 
         # pu to physical
         df = pd.DataFrame(data=u.reshape((-1, 2), order="F"), columns=["p_pu", "q_pu"])
@@ -94,66 +282,88 @@ class SystemElectrical(SystemBase):
         self.net.sgen["q_mvar"] = df["q_mvar"]
 
         # update power flow
-        pp.runpp(self.net)
+        try:
+            pp.runpp(self.net)
+        except pp.LoadflowNotConverged as error:
+            raise PowerFlowNotConverged(str(error)) from error
 
-    def h(self, u: np.ndarray) -> np.ndarray:
-        assert np.shape(u) == (self.m, 1)
+    def _evaluate(self, u: np.ndarray) -> dict:
+        if validate():
+            assert np.shape(u) == (self.m, 1)
 
-        # update u
-        self._apply_u(u)
+        entry = self._cache.get(u)
+        if entry is not None:
+            return entry
+
+        # update power flow
+        if self.power_flow == "newton":
+            v_complex = self._solve_power_flow(u)
+        else:
+            self._apply_u(u)
+            vm_pu = self.net.res_bus["vm_pu"].to_numpy()[self.index.bus_row]
+            va_degree = self.net.res_bus["va_degree"].to_numpy()[self.index.bus_row]
+            v_complex = vm_pu * np.exp(1j * va_degree * UtilsPd.DEG2RAD)
+        self.n_power_flows += 1
 
         # build y
-        y = np.array(self.net.res_bus["vm_pu"][self.bus_pq]).reshape((-1, 1))
+        y = np.abs(v_complex[self.index.pq]).reshape((-1, 1))
+        y.setflags(write=False)
 
-        assert np.shape(y) == (self.p, 1)
-        return y
+        return self._cache.put(u, {"y": y, "v_complex": v_complex, "sensitivity": None})
 
-    def du_h(self, u: np.ndarray) -> np.ndarray:
-        assert np.shape(u) == (self.m, 1)
+    def _solve_power_flow(self, u: np.ndarray) -> np.ndarray:
+        if validate():
+            assert np.shape(u) == (self.m, 1)
 
-        # update u
-        self._apply_u(u)
+        # [p_pu ..., q_pu ...] to complex bus injections
+        n_sgen = self.index.n_sgen
+        sgen_pu = u[:n_sgen, 0] + 1j * u[n_sgen:, 0]
+        S = self.S_base.copy()
+        np.add.at(S, self.index.sgen, self.sgen_weight * sgen_pu)
 
-        # extract complex pu bus voltages
-        UtilsPd.pol_to_complex(
-            self.net.res_bus, absolute="vm_pu", degree="va_degree", cmplx="v_complex"
-        )
-        v_complex = self.net.res_bus["v_complex"].to_numpy()
+        v_complex, _ = self.pf.solve(S)
+        if v_complex is None:
+            raise PowerFlowNotConverged("Newton-Raphson power flow did not converge!")
+        return v_complex
 
-        # obtain voltage to power sensitivity (linearization)
-        gamma = get_sens_powerInjections_to_voltage(self.Y_admittance, v_complex)
+    def _sensitivity(self, v_complex: np.ndarray) -> np.ndarray:
+        if self.power_flow == "newton":
+            # reuse the power flow Jacobian d[p; q] / d[va; vm]
+            psi_sgen = self.pf.jacobian_lu(v_complex).solve(self.index.jac_sgen_rhs)
+            psi_sgen = psi_sgen[self.index.p :, :]
+        else:
+            # obtain voltage to power sensitivity (linearization)
+            gamma = get_sens_powerInjections_to_voltage(self.Y_admittance, v_complex)
 
-        # select bus_pq in bus_tot
-        select_pq_in_bus = np.zeros((len(self.bus_tot), len(self.bus_pq)))
-        for col, row in enumerate(self.bus_pq):
-            select_pq_in_bus[row, col] = 1
+            # restrict to the pq busses [vm; va] and [p; q]
+            gamma_c = gamma[self.index.jac_pq][:, self.index.jac_pq]
 
-        C = np.block(
-            [
-                [select_pq_in_bus, np.zeros_like(select_pq_in_bus)],
-                [np.zeros_like(select_pq_in_bus), select_pq_in_bus],
-            ]
-        )
+            # obtain power to voltage sensitivity for the sgen [p; q] injections only
+            psi_sgen = splu(gamma_c.tocsc()).solve(self.index.jac_sgen_rhs)
+            psi_sgen = psi_sgen[: self.index.p, :]
 
-        gamma_c = C.T @ gamma @ C
+        return psi_sgen * np.tile(self.sgen_weight, 2)
 
-        # obtain power to voltage sensitivity
-        psi = np.linalg.inv(gamma_c)
+    def h(self, u: np.ndarray) -> np.ndarray:
+        if validate():
+            assert np.shape(u) == (self.m, 1)
 
-        # select bus_sgen in bus_pq
-        sgen_in_pq_idx = np.array([np.where(self.bus_pq == val)[0][0] for val in self.bus_sgen])
-        select_sgen_in_pq = np.zeros((len(self.bus_pq), len(self.bus_sgen)))
-        for col, row in enumerate(sgen_in_pq_idx):
-            select_sgen_in_pq[row, col] = 1
+        y = self._evaluate(u)["y"]
 
-        C = np.block(
-            [
-                [select_sgen_in_pq, np.zeros_like(select_sgen_in_pq)],
-                [np.zeros_like(select_sgen_in_pq), select_sgen_in_pq],
-            ]
-        )
+        if validate():
+            assert np.shape(y) == (self.p, 1)
+        return y
+
+    def du_h(self, u: np.ndarray) -> np.ndarray:
+        if validate():
+            assert np.shape(u) == (self.m, 1)
 
-        sensitivity = (psi @ C)[: len(self.bus_pq), :]
+        entry = self._evaluate(u)
+        if entry["sensitivity"] is None:
+            entry["sensitivity"] = self._sensitivity(entry["v_complex"])
+            entry["sensitivity"].setflags(write=False)
+        sensitivity = entry["sensitivity"]
 
-        assert np.shape(sensitivity) == (self.p, self.m)
+        if validate():
+            assert np.shape(sensitivity) == (self.p, self.m)
         return sensitivity
@@ -3,6 +3,7 @@ import types
 import numpy as np
 
 from feedback_opt.systems.system_base import SystemBase
+from feedback_opt.utils import validate
 
 
 class SystemNonLinear(SystemBase):
@@ -28,18 +29,58 @@ class SystemNonLinear(SystemBase):
         assert isinstance(params.du_h, types.LambdaType)
         self._du_h = params.du_h
 
+        # optional vectorized maps over a batch of inputs (B,m,1)
+        if hasattr(params, "h_batch"):
+            assert isinstance(params.h_batch, types.LambdaType)
+            self._h_batch = params.h_batch
+        else:
+            self._h_batch = None
+        if hasattr(params, "du_h_batch"):
+            assert isinstance(params.du_h_batch, types.LambdaType)
+            self._du_h_batch = params.du_h_batch
+        else:
+            self._du_h_batch = None
+
     def h(self, u: np.ndarray) -> np.ndarray:
-        assert np.shape(u) == (self.m, 1)
+        if validate():
+            assert np.shape(u) == (self.m, 1)
 
         y = self._h(u)
 
-        assert np.shape(y) == (self.p, 1)
+        if validate():
+            assert np.shape(y) == (self.p, 1)
         return y
 
     def du_h(self, u: np.ndarray) -> np.ndarray:
-        assert np.shape(u) == (self.m, 1)
+        if validate():
+            assert np.shape(u) == (self.m, 1)
 
         sensitivity = self._du_h(u)
 
-        assert np.shape(sensitivity) == (self.p, self.m)
+        if validate():
+            assert np.shape(sensitivity) == (self.p, self.m)
+        return sensitivity
+
+    def h_batch(self, u: np.ndarray) -> np.ndarray:
+        if self._h_batch is None:
+            return super().h_batch(u)
+        if validate():
+            assert np.shape(u)[1:] == (self.m, 1)
+
+        y = self._h_batch(u)
+
+        if validate():
+            assert np.shape(y) == (len(u), self.p, 1)
+        return y
+
+    def du_h_batch(self, u: np.ndarray) -> np.ndarray:
+        if self._du_h_batch is None:
+            return super().du_h_batch(u)
+        if validate():
+            assert np.shape(u)[1:] == (self.m, 1)
+
+        sensitivity = self._du_h_batch(u)
+
+        if validate():
+            assert np.shape(sensitivity) == (len(u), self.p, self.m)
         return sensitivity
@@ -0,0 +1,145 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# sensitivity management: policies deciding when the steady state map Jacobian du_h is
+# recomputed, and how it is approximated in between
+# every distinct input u the sensitivity is requested at counts as a step, repeated
+# requests at the same u (several calls within one optimizer step) return the same matrix
+
+
+class SensitivityPolicy(ABC):
+    """
+    SensitivityPolicy: base class of the sensitivity policies of SystemBase (params.sensitivity)
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        drop the current sensitivity, the next request is evaluated exactly
+        """
+        # sensitivity and the input it was requested at
+        self.J = None
+        self.u = None
+
+        # linearization point of the last exact evaluation
+        self.u_exact = None
+
+        # counters
+        self.n_steps = 0
+        self.n_exact = 0
+        self.age = 0
+        self.exact = False
+
+    def du_h(self, system, u: np.ndarray) -> np.ndarray:
+        """
+        :param SystemBase system: system to linearize
+        :param np.array u: input vector (m,1)
+        :return np.array: steady-state map sensitivity (p,m)
+        """
+        if self.u is not None and np.array_equal(u, self.u):
+            return self.J
+        self.n_steps += 1
+
+        if self.J is None or self._recompute(u):
+            J = system.du_h(u)
+            self.u_exact = u.copy()
+            self.n_exact += 1
+            self.age = 0
+            self.exact = True
+        else:
+            J = self._update(system, u)
+            self.age += 1
+            self.exact = False
+
+        self.J = J
+        self.u = u.copy()
+        return J
+
+    @abstractmethod
+    def _recompute(self, u: np.ndarray) -> bool:
+        """
+        :param np.array u: input vector (m,1) of the new step
+        :return bool: True if the sensitivity has to be evaluated exactly
+        """
+        raise NotImplementedError
+
+    def _update(self, system, u: np.ndarray) -> np.ndarray:
+        # reuse the last sensitivity
+        return self.J
+
+    def state(self) -> dict:
+        """
+        :return dict: policy state of the last step, logged by the simulation
+        """
+        return {
+            "du_h_exact": np.array([[float(self.exact)]]),
+            "du_h_age": np.array([[float(self.age)]]),
+            "du_h_count": np.array([[float(self.n_exact)]]),
+        }
+
+
+class SensitivityEveryK(SensitivityPolicy):
+    """
+    SensitivityEveryK: exact sensitivity every k steps, reused in between
+
+    :param int k: number of steps a sensitivity is used
+    """
+
+    def __init__(self, k: int):
+        assert isinstance(k, int) and k > 0
+        self.k = k
+        super().__init__()
+
+    def _recompute(self, u: np.ndarray) -> bool:
+        return self.age + 1 >= self.k
+
+
+class SensitivityThreshold(SensitivityPolicy):
+    """
+    SensitivityThreshold: exact sensitivity once the input moved further than tol (2-norm)
+    from the last linearization point, reused in between
+
+    :param float tol: admissible input deviation
+    """
+
+    def __init__(self, tol: float):
+        assert isinstance(tol, (int, float)) and tol >= 0
+        self.tol = float(tol)
+        super().__init__()
+
+    def _recompute(self, u: np.ndarray) -> bool:
+        return np.linalg.norm(u - self.u_exact) > self.tol
+
+
+class SensitivityBroyden(SensitivityPolicy):
+    """
+    SensitivityBroyden: rank-one (good Broyden) updates of the sensitivity from the measured
+    steps (du, dy) = (u - u_prev, h(u) - h(u_prev))
+
+    J <- J + (dy - J du) du^T / (du^T du)
+
+    :param int k: exact sensitivity every k steps, None to only evaluate it once
+    :param float min_step: steps shorter than min_step (2-norm) do not update the sensitivity
+    """
+
+    def __init__(self, k: int | None = None, min_step: float = 1e-9):
+        assert k is None or (isinstance(k, int) and k > 0)
+        self.k = k
+        self.min_step = float(min_step)
+        super().__init__()
+
+    def _recompute(self, u: np.ndarray) -> bool:
+        return self.k is not None and self.age + 1 >= self.k
+
+    def _update(self, system, u: np.ndarray) -> np.ndarray:
+        du = u - self.u
+        du_norm_2 = (du.T @ du).item()
+        if du_norm_2 <= self.min_step**2:
+            return self.J
+
+        # measured outputs, served from the evaluation cache of the system if available
+        dy = system.h(u) - system.h(self.u)
+        return self.J + (dy - self.J @ du) @ du.T / du_norm_2
@@ -1,10 +1,53 @@
-from .utils_constraints import Argmin, Polytope
-from .utils_electric import get_sens_powerInjections_to_voltage
-from .utils_pandas import UtilsPd
-from .utils_plotting import (
-    plot_carthesian,
-    plot_cost,
-    plot_cost_and_violation,
-    plot_dist_to_optimal,
-    plot_y_violation,
-)
+import importlib
+
+# the submodules are imported on first attribute access (PEP 562), such that importing a
+# light utility does not pull in cvxpy, numba, pandapower or matplotlib
+_EXPORTS = {
+    "utils_cache": ["ResultCache", "fingerprint"],
+    "utils_constraints": [
+        "Argmin",
+        "ArgminRegistry",
+        "ArgminSeparable",
+        "ArgminStats",
+        "LinearizedProjection",
+        "Polytope",
+        "argmin_registry",
+    ],
+    "utils_electric": ["get_sens_powerInjections_to_voltage"],
+    "utils_errors": ["SolverError"],
+    "utils_feeder": ["synthetic_feeder"],
+    "utils_pandas": ["UtilsPd"],
+    "utils_plotting": [
+        "plot_carthesian",
+        "plot_cost",
+        "plot_cost_and_violation",
+        "plot_dist_to_optimal",
+        "plot_y_violation",
+    ],
+    "utils_powerflow": ["PowerFlow"],
+    "utils_profiling": ["Profiler"],
+    "utils_sinks": ["ArrowIPCSink", "NumpySink", "ParquetSink", "SinkBase"],
+    "utils_statistics": ["P2Quantile", "StreamingStats"],
+    "utils_validation": [
+        "get_validation_level",
+        "set_validation_level",
+        "validate",
+        "validation_level",
+    ],
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name: str):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_MODULES[name]}", __name__), name)
+    # cache, later lookups do not go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,231 @@
+import hashlib
+import inspect
+import os
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+# content-addressed on-disk cache of simulation histories
+# the key hashes everything a run depends on: the scenario parameters, the system inputs
+# (the files a system reads, system_factory.input_files, e.g. the network json, are hashed by
+# content), the optimizer class and parameters and the package version. A changed parameter addresses a new
+# entry, stale entries are never read again and can be removed with clear().
+
+# bump if the hashed content, the file layout or the simulation results (e.g. the noise draws)
+# change
+CACHE_FORMAT = 4
+
+
+def _package_version() -> str:
+    try:
+        return metadata.version("feedback-opt")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _public(items: dict) -> dict:
+    # private attributes hold runtime state, e.g. the time series PVProfile reads on first use
+    return {key: item for key, item in items.items() if not str(key).startswith("_")}
+
+
+def _attributes(value) -> dict:
+    """
+    :return dict: public attributes of a parameter class including the inherited ones, or of an
+        object
+    """
+    if not inspect.isclass(value):
+        return _public(vars(value))
+    items = {}
+    for klass in reversed(value.__mro__[:-1]):
+        items.update(vars(klass))
+    return _public(items)
+
+
+def _update(hasher, value, seen: set):
+    """
+    feeds a canonical byte representation of value into hasher
+
+    parameter classes are hashed by their (inherited) attributes and not by their name, such
+    that type("sim", (params.sim,), {}) and params.sim address the same entry. Objects are
+    hashed by their public attributes (dict subclasses, e.g. a pandapowerNet, by their public
+    keys), such that the key of a run is the same before and after the run
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, np.generic)):
+        hasher.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, str):
+        hasher.update(f"str:{value!r};".encode())
+    elif isinstance(value, bytes):
+        hasher.update(b"bytes:" + value)
+    elif isinstance(value, np.ndarray):
+        hasher.update(f"ndarray:{value.dtype.str}{value.shape};".encode())
+        if value.dtype.hasobject:
+            _update(hasher, value.tolist(), seen)
+        else:
+            hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        hasher.update(f"{type(value).__name__}:{list(np.atleast_1d(value.axes[-1]))!r};".encode())
+        hasher.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"{type(value).__name__}:{len(value)};".encode())
+        for item in value:
+            _update(hasher, item, seen)
+    elif inspect.isroutine(value):
+        # functions, e.g. params.sys.h, by source
+        hasher.update(f"routine:{getattr(value, '__qualname__', repr(value))};".encode())
+        try:
+            hasher.update(inspect.getsource(value).encode())
+        except (OSError, TypeError):
+            code = getattr(value, "__code__", None)
+            hasher.update(code.co_code if code is not None else repr(value).encode())
+    elif isinstance(value, (dict, set, frozenset)) or hasattr(value, "__dict__"):
+        # containers, parameter classes and plain objects, e.g. a pandapowerNet
+        if id(value) in seen:
+            hasher.update(b"cycle;")
+            return
+        seen.add(id(value))
+
+        if isinstance(value, (set, frozenset)):
+            items = {repr(item): item for item in value}
+        elif type(value) is dict:
+            items = value
+        elif isinstance(value, dict):
+            # e.g. the _ppc a pandapowerNet holds after a power flow
+            items = _public(value)
+        else:
+            if not inspect.isclass(value):
+                hasher.update(
+                    f"object:{type(value).__module__}.{type(value).__qualname__};".encode()
+                )
+            items = _attributes(value)
+
+        hasher.update(f"{type(items).__name__}:{len(items)};".encode())
+        for key in sorted(items, key=repr):
+            if isinstance(key, str) and key.startswith("__"):
+                continue
+            item = items[key]
+            if isinstance(item, (staticmethod, classmethod)):
+                item = item.__func__
+            hasher.update(f"{key!r}=".encode())
+            _update(hasher, item, seen)
+    else:
+        hasher.update(f"{type(value).__qualname__}:{value!r};".encode())
+
+
+def fingerprint(*values) -> str:
+    """
+    :param values: parameters, classes, arrays, ... to hash
+    :return str: hex digest of the values, the package version and the cache format
+    """
+    hasher = hashlib.sha256()
+    _update(hasher, (CACHE_FORMAT, _package_version(), *values), set())
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    ResultCache: simulation histories (pd.DataFrame) on disk, addressed by a fingerprint of
+    their inputs. Every entry is a compressed .npz file with one array per column.
+
+    :param str path: cache directory, created on first write
+    :param bool enabled: False bypasses the cache, every get is a miss and put does nothing
+    """
+
+    def __init__(self, path: str, enabled: bool = True):
+        assert isinstance(path, str)
+        self.path = path
+        self.enabled = enabled
+
+        # telemetry
+        self.n_hits = 0
+        self.n_misses = 0
+
+    def key(
+        self,
+        system_factory,
+        params_sys,
+        params_sim,
+        optimizer_class: type,
+        params_opt,
+        noise_seed: int | None = None,
+    ) -> str:
+        """
+        :param noise_seed: override of params_sim.noise_seed
+        :return str: key of the run of optimizer_class(params_opt) on
+            system_factory(params_sys) with params_sim
+        """
+        # content of the files the system reads, e.g. SystemElectrical.input_files
+        files = []
+        if hasattr(system_factory, "input_files"):
+            for path in system_factory.input_files(params_sys):
+                if not os.path.isfile(path):
+                    raise FileNotFoundError(f"input file {path} of the system not found")
+                with open(path, "rb") as file:
+                    files.append(hashlib.sha1(file.read()).digest())
+
+        # attributes the system writes into its params, e.g. SystemElectrical.DERIVED_PARAMS
+        derived = getattr(system_factory, "DERIVED_PARAMS", ())
+        params_sys = {
+            key: value for key, value in _attributes(params_sys).items() if key not in derived
+        }
+
+        return fingerprint(
+            f"{system_factory.__module__}.{system_factory.__qualname__}",
+            params_sys,
+            files,
+            params_sim,
+            f"{optimizer_class.__module__}.{optimizer_class.__qualname__}",
+            params_opt,
+            noise_seed,
+        )
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.npz")
+
+    def __contains__(self, key: str) -> bool:
+        return self.enabled and os.path.isfile(self._file(key))
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """
+        :param str key: fingerprint of the run
+        :return pd.DataFrame: stored history or None
+        """
+        if key not in self:
+            self.n_misses += 1
+            return None
+        self.n_hits += 1
+
+        with np.load(self._file(key), allow_pickle=False) as data:
+            columns = data["columns"].tolist()
+            return pd.DataFrame({name: data[f"c{i}"] for i, name in enumerate(columns)})
+
+    def put(self, key: str, frame: pd.DataFrame):
+        """
+        :param str key: fingerprint of the run
+        :param pd.DataFrame frame: history with a default index and numeric or str columns
+        """
+        if not self.enabled:
+            return
+        assert isinstance(frame, pd.DataFrame)
+        assert isinstance(frame.index, pd.RangeIndex), "reset the index"
+        os.makedirs(self.path, exist_ok=True)
+
+        arrays = {"columns": np.array([str(name) for name in frame.columns])}
+        for i, name in enumerate(frame.columns):
+            column = frame[name].to_numpy()
+            arrays[f"c{i}"] = column.astype(str) if column.dtype == object else column
+
+        # atomic, concurrent workers and killed runs never leave a partial entry
+        tmp = f"{self._file(key)}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, self._file(key))
+
+    def clear(self):
+        """
+        removes all entries
+        """
+        if not os.path.isdir(self.path):
+            return
+        for name in os.listdir(self.path):
+            if name.endswith(".npz"):
+                os.remove(os.path.join(self.path, name))
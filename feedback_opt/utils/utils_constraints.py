@@ -1,9 +1,23 @@
+import hashlib
+import threading
+import time
 import warnings
+import weakref
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Self
 
-import cvxpy as cp
 import numpy as np
 
+from feedback_opt.utils.utils_qp import (
+    DenseQP,
+    active_set_enumeration,
+    box_qp_blocks,
+    least_distance,
+)
+from feedback_opt.utils.utils_validation import validate
+
 
 class Polytope:
     """
@@ -12,6 +26,9 @@ class Polytope:
     x is a vector of n coordinates in E^n (Euclidean n-space).
     """
 
+    # methods timed by the Profiler
+    PROFILE_METHODS = MappingProxyType({"proj_2": "projection"})
+
     def __init__(self, A: np.ndarray, b: np.ndarray, n: int):
         assert isinstance(A, np.ndarray)
         assert isinstance(b, np.ndarray)
@@ -26,12 +43,58 @@ class Polytope:
         # Number of constraints
         self.num_constr = A.shape[0]
 
-        # H-representation A x <= b
-        self.A = A
-        self.b = b
+        # H-representation A x <= b, float such that set_b does not truncate, b is owned as
+        # set_b writes it in place
+        self.A = np.asarray(A, dtype=float)
+        self.b = np.array(b, dtype=float)
+
+        # detect structure for fast projections
+        self._detect_structure()
+
+        # projection problem (last resort of proj_2), compiled on first use
+        self.project = Argmin(self, solver="SCS")
+
+    def _detect_structure(self):
+        """
+        classify the polytope as
+        - "box": every row bounds a single coordinate, lower <= x <= upper
+        - "halfspace": a single non-zero row a^T x <= b
+        - "general": anything else
+        """
+        self.structure = "general"
+        self.lower = None
+        self.upper = None
+
+        nnz = np.count_nonzero(self.A, axis=1)
+        if np.all(nnz <= 1) and np.all(self.b[nnz == 0] >= 0):
+            rows, cols = np.nonzero(self.A)
+            bound = self.b[rows, 0] / self.A[rows, cols]
+            is_upper = self.A[rows, cols] > 0
+
+            lower = np.full(self.n, -np.inf)
+            upper = np.full(self.n, np.inf)
+            np.maximum.at(lower, cols[~is_upper], bound[~is_upper])
+            np.minimum.at(upper, cols[is_upper], bound[is_upper])
+
+            # empty boxes are left to the general solver
+            if np.all(lower <= upper):
+                self.structure = "box"
+                self.lower = lower.reshape(-1, 1)
+                self.upper = upper.reshape(-1, 1)
+        elif self.num_constr == 1 and np.any(self.A):
+            self.structure = "halfspace"
+
+    def set_b(self, b: np.ndarray):
+        """
+        update the constraint vector in place, e.g. for time-varying bounds
+        solvers built on this polytope read b at solve time and are not recompiled
 
-        # cache projection problem
-        self.project = Argmin(self)
+        :param np.array b: constraint vector (k,1)
+        """
+        if validate():
+            assert np.shape(b) == (self.num_constr, 1)
+        self.b[...] = b
+        self._detect_structure()
 
     @classmethod
     def full_space(cls, n: int) -> Self:
@@ -50,7 +113,8 @@ class Polytope:
         :param np.array x: input vector (n,1)
         :return float: c_x(x)
         """
-        assert np.shape(x) == (self.n, 1)
+        if validate():
+            assert np.shape(x) == (self.n, 1)
         return self.A @ x - self.b
 
     def dx_c_x(self) -> np.ndarray:
@@ -67,59 +131,614 @@ class Polytope:
         return closest interior point of constraint set with respect to 2-norm
 
         :param np.array z: input vector (n,1)
-        :return np.array: projection x (n,1)
+        :return np.array: projection x (n,1), None if no solution was found
         """
-        assert np.shape(z) == (self.n, 1)
+        if validate():
+            assert np.shape(z) == (self.n, 1)
+
+        # closed form projections
+        if self.structure == "box":
+            return np.clip(z, self.lower, self.upper)
 
+        if self.structure == "halfspace":
+            violation = (self.A @ z - self.b).item()
+            if violation <= 0:
+                return z.copy()
+            return z - violation / np.sum(self.A**2) * self.A.T
+
+        # dense active-set solver
+        x, _, _, _ = least_distance(self.A, self.b, z)
+        if x is not None:
+            return x
+
+        # fall back to generic solver
         quad = np.eye(self.n)
         lin = -2 * z
 
         return self.project.solve(quad, lin, verify_psd=False)
 
+    def proj_2_batch(self, z: np.ndarray) -> np.ndarray:
+        """
+        proj_2 for a batch of input vectors
+
+        :param np.array z: input vectors (B,n,1)
+        :return np.array: projections x (B,n,1), nan where no solution was found
+        """
+        if validate():
+            assert np.shape(z)[1:] == (self.n, 1)
+
+        # closed form projections
+        if self.structure == "box":
+            return np.clip(z, self.lower, self.upper)
+
+        if self.structure == "halfspace":
+            violation = np.maximum(self.A @ z - self.b, 0)
+            return z - violation / np.sum(self.A**2) * self.A.T
+
+        # active set enumeration, remaining programs one by one
+        x, found = active_set_enumeration(np.eye(self.n), -2 * z, self.A, self.b)
+        for i in np.flatnonzero(~found):
+            x_i = self.proj_2(z[i])
+            x[i] = np.nan if x_i is None else x_i
+        return x
+
+
+@dataclass
+class ArgminStats:
+    """
+    telemetry record of a single Argmin solve
+    """
+
+    backend: str
+    status: str
+    iterations: int
+    primal_residual: float
+    dual_residual: float
+    solve_time: float
+    # time spent in the numerical solver, excluding e.g. the cvxpy canonicalization
+    solver_time: float = np.nan
+
+
+class ArgminBackend(ABC):
+    """
+    solver backend for the quadratic program
+
+    min     x^T quad x + lin^T x
+    s.t.    A x <= b
+    """
+
+    name = None
+
+    def __init__(self, A: np.ndarray):
+        assert isinstance(A, np.ndarray)
+        self.A = A
+        self.n = A.shape[1]
+        self.warm_start = {}
+
+    @abstractmethod
+    def _solve(self, quad: np.ndarray, lin: np.ndarray, b: np.ndarray, warm_start: dict):
+        """
+        :return tuple: minimizer x (n,1), multipliers (k,1), number of iterations and status,
+            x is None if no solution was found
+        """
+        raise NotImplementedError
+
+    def solve(
+        self, quad: np.ndarray, lin: np.ndarray, b: np.ndarray, warm_start: dict | None = None
+    ):
+        """
+        solve QP and assemble telemetry record
+
+        :param np.array quad: positive semi-definite matrix (n,n)
+        :param np.array lin: vector (n,1)
+        :param np.array b: constraint vector (k,1)
+        :param dict warm_start: solver state of the previous call of the caller, updated in
+            place. Backends are shared between programs over equal A, the warm start is not,
+            such that a result does not depend on the other programs solved before.
+            Defaults to a state owned by the backend.
+        :return tuple: minimizer x (n,1) or None and ArgminStats
+        """
+        quad = np.asarray(quad)
+        lin = np.asarray(lin)
+        if warm_start is None:
+            warm_start = self.warm_start
+
+        start = time.perf_counter()
+        x, lamb, iterations, status = self._solve(quad, lin, b, warm_start)
+        solve_time = time.perf_counter() - start
+        solver_time = self._solver_time(solve_time, warm_start)
+
+        if x is None:
+            stats = ArgminStats(
+                self.name, status, iterations, np.nan, np.nan, solve_time, solver_time
+            )
+            return None, stats
+
+        primal_residual = np.max(self.A @ x - b, initial=0)
+        dual_residual = np.nan
+        if lamb is not None:
+            dual_residual = np.max(np.abs(2 * quad @ x + lin + self.A.T @ lamb))
+
+        stats = ArgminStats(
+            self.name, status, iterations, primal_residual, dual_residual, solve_time, solver_time
+        )
+        return x, stats
+
+    def _solver_time(self, solve_time: float, warm_start: dict) -> float:
+        """
+        :param float solve_time: wall time of _solve
+        :param dict warm_start: solver state of the caller after _solve
+        :return float: part of it spent in the numerical solver
+        """
+        return solve_time
+
+
+class ArgminDense(ArgminBackend):
+    """
+    in-process dense active-set backend, requires quad to be positive definite
+    """
+
+    name = "dense"
+
+    def __init__(self, A: np.ndarray):
+        super().__init__(A)
+        self.qp = DenseQP(A)
+
+    def _solve(self, quad: np.ndarray, lin: np.ndarray, b: np.ndarray, warm_start: dict):
+        x, lamb, iterations = self.qp.solve(quad, lin, b, warm_start=warm_start)
+        return x, lamb, iterations, "optimal" if x is not None else "failed"
+
+
+class ArgminCvxpy(ArgminBackend):
+    """
+    cvxpy backend, every caller (warm start) owns a problem, compiled once on its first solve
+    and warm started by cvxpy on all later ones
+    """
+
+    SOLVER_OPTIONS = MappingProxyType(
+        {
+            "SCS": MappingProxyType({"eps": 1e-8}),
+            "OSQP": MappingProxyType({"eps_abs": 1e-9, "eps_rel": 1e-9, "polish": True}),
+            "CLARABEL": MappingProxyType({}),
+        }
+    )
+
+    def __init__(self, A: np.ndarray, solver: str = "SCS"):
+        # deferred, cvxpy dominates the import time of the package
+        import cvxpy as cp
+
+        super().__init__(A)
+        assert solver in self.SOLVER_OPTIONS, f"unknown cvxpy solver {solver}"
+        assert solver in cp.installed_solvers(), f"cvxpy solver {solver} is not installed"
+        self.name = solver
+        self._cp = cp
+
+    def _problem(self, warm_start: dict) -> dict:
+        """
+        :param dict warm_start: solver state of the caller
+        :return dict: problem of the caller, its variable, parameters and constraint
+        """
+        if "cvxpy" in warm_start:
+            return warm_start["cvxpy"]
+        cp = self._cp
+
+        # variables
+        x = cp.Variable(shape=(self.n, 1), name="x")
+
+        # parameters, quad = L^T L enters by a factor, x^T quad x = ||L x||^2 is DPP
+        L = cp.Parameter(shape=(self.n, self.n), name="L")
+        lin = cp.Parameter(shape=(self.n, 1), name="lin")
+        b = cp.Parameter(shape=(self.A.shape[0], 1), name="b")
+
+        # objective
+        objective = cp.Minimize(cp.sum_squares(L @ x) + lin.T @ x)
+
+        # constraints
+        constraint = self.A @ x <= b
+
+        # problem
+        warm_start["cvxpy"] = {
+            "problem": cp.Problem(objective, [constraint]),
+            "x": x,
+            "L": L,
+            "lin": lin,
+            "b": b,
+            "constraint": constraint,
+        }
+        return warm_start["cvxpy"]
+
+    def _solve(self, quad: np.ndarray, lin: np.ndarray, b: np.ndarray, warm_start: dict):
+        program = self._problem(warm_start)
+        problem = program["problem"]
+
+        # factor L = sqrt(w) V^T of quad = V diag(w) V^T
+        w, V = np.linalg.eigh((quad + quad.T) / 2)
+        program["L"].value = np.sqrt(np.clip(w, 0, None))[:, None] * V.T
+        program["lin"].value = lin
+        program["b"].value = b
+
+        with warnings.catch_warnings(action="ignore"):
+            problem.solve(solver=self.name, warm_start=True, **self.SOLVER_OPTIONS[self.name])
+
+        iterations = problem.solver_stats.num_iters or 0
+        if problem.status != "optimal":
+            return None, None, iterations, problem.status
+
+        return program["x"].value, program["constraint"].dual_value, iterations, problem.status
+
+    def _solver_time(self, solve_time: float, warm_start: dict) -> float:
+        # solve time reported by the solver, the remainder is spent in cvxpy
+        solver_time = warm_start["cvxpy"]["problem"].solver_stats.solve_time
+        return solve_time if solver_time is None else solver_time
+
+
+class ArgminRegistry:
+    """
+    ArgminRegistry: process-wide cache of the Argmin solver backends
+
+    a backend only depends on the constraint matrix A and the solver, quad, lin and b are
+    passed per solve. All Argmin over polytopes with equal A (content hash) share one backend,
+    e.g. one dense factorization. The warm start, including the compiled cvxpy problem, is kept
+    per Argmin.
+    Backends are held weakly and released with the last Argmin using them.
+    """
+
+    def __init__(self):
+        self._backends = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+        # counters
+        self.n_created = 0
+        self.n_shared = 0
+
+    @staticmethod
+    def key(A: np.ndarray, solver: str) -> tuple:
+        A = np.ascontiguousarray(A, dtype=float)
+        return solver, A.shape, hashlib.sha1(A.tobytes()).hexdigest()
+
+    def get(self, A: np.ndarray, solver: str) -> ArgminBackend:
+        """
+        :param np.array A: constraint matrix (k,n)
+        :param str solver: see Argmin.SOLVERS
+        :return ArgminBackend: shared backend
+        """
+        key = self.key(A, solver)
+        with self._lock:
+            backend = self._backends.get(key)
+            if backend is not None:
+                self.n_shared += 1
+                return backend
+
+            # private read-only copy, the backend outlives the polytope it was created for
+            A = np.array(A, dtype=float)
+            A.setflags(write=False)
+            backend = ArgminDense(A) if solver == "dense" else ArgminCvxpy(A, solver)
+            self._backends[key] = backend
+            self.n_created += 1
+            return backend
+
+    def clear(self):
+        """
+        drop all backends, Argmin instances keep the backend they already use
+        """
+        with self._lock:
+            self._backends.clear()
+
+    def __len__(self) -> int:
+        return len(self._backends)
+
+
+argmin_registry = ArgminRegistry()
+
 
 class Argmin:
-    def __init__(self, constraints: Polytope):
+    """
+    Argmin: quadratic program over a polytope
+
+    min     x^T quad x + lin^T x
+    s.t.    x in constraints
+
+    solver "dense" uses the in-process active-set backend and falls back to cvxpy SCS
+    whenever quad is not positive definite or no solution was found,
+    "SCS", "OSQP" and "CLARABEL" use the corresponding cvxpy solver.
+    """
+
+    SOLVERS = ("dense", *ArgminCvxpy.SOLVER_OPTIONS)
+
+    # methods timed by the Profiler
+    PROFILE_METHODS = MappingProxyType({"solve": "qp"})
+
+    def __init__(self, constraints: Polytope, solver: str = "dense"):
+        assert isinstance(constraints, Polytope)
+        assert solver in self.SOLVERS, f"solver must be one of {self.SOLVERS}"
+        self.n = constraints.n
+        self.constraints = constraints
+        self.solver = solver
+
+        # backends are taken from the registry on first use
+        self._backend = None
+        self.fallback = None
+
+        # warm start of this program, the backends are shared
+        self.warm_start = {}
+
+        # telemetry of last call
+        self.stats = None
+
+    @property
+    def backend(self) -> ArgminBackend:
+        if self._backend is None:
+            self._backend = argmin_registry.get(self.constraints.A, self.solver)
+        return self._backend
+
+    def solve(
+        self, quad: np.ndarray, lin: np.ndarray, verify_psd: bool = False
+    ) -> np.ndarray | None:
+        if validate():
+            assert np.shape(quad) == (self.n, self.n)
+            assert np.shape(lin) == (self.n, 1)
+
+        if verify_psd:
+            assert np.allclose(quad, quad.T)
+            assert np.all(np.linalg.eigvals(quad) >= 0)
+
+        x, self.stats = self.backend.solve(quad, lin, self.constraints.b, self.warm_start)
+
+        if x is None and isinstance(self.backend, ArgminDense):
+            if self.fallback is None:
+                self.fallback = argmin_registry.get(self.constraints.A, "SCS")
+            x, self.stats = self.fallback.solve(quad, lin, self.constraints.b, self.warm_start)
+
+        if x is None:
+            warnings.warn("no qp solution found!")
+            return None
+
+        return x
+
+    def solve_batch(self, quad: np.ndarray, lin: np.ndarray) -> np.ndarray:
+        """
+        solve for a batch of objectives by active set enumeration,
+        programs not solved that way are passed to solve one by one
+
+        :param np.array quad: positive semi-definite matrices (B,n,n) or (n,n)
+        :param np.array lin: vectors (B,n,1)
+        :return np.array: minimizers x (B,n,1), nan where no solution was found
+        """
+        if validate():
+            assert np.shape(quad)[-2:] == (self.n, self.n)
+            assert np.shape(lin)[1:] == (self.n, 1)
+
+        x, found = active_set_enumeration(quad, lin, self.constraints.A, self.constraints.b)
+        for i in np.flatnonzero(~found):
+            x_i = self.solve(quad if np.ndim(quad) == 2 else quad[i], lin[i])
+            x[i] = np.nan if x_i is None else x_i
+        return x
+
+
+class ArgminSeparable:
+    """
+    ArgminSeparable: Argmin over a box that separates into independent blocks of coordinates
+    (e.g. the [p, q] setpoint of every sgen)
+
+    whenever quad is block diagonal, all blocks are solved at once by box_qp_blocks (closed form
+    for diagonal blocks), the per call cost grows linearly in the number of blocks.
+    Coupled programs, non box constraints and blocks not solved that way are passed to Argmin.
+    """
+
+    # methods timed by the Profiler
+    PROFILE_METHODS = MappingProxyType({"solve": "qp"})
+
+    def __init__(self, constraints: Polytope, blocks: list, solver: str = "dense"):
+        assert isinstance(constraints, Polytope)
+        self.n = constraints.n
+        self.constraints = constraints
+        self.argmin = Argmin(constraints, solver=solver)
+
+        blocks = [np.asarray(block) for block in blocks]
+        assert np.array_equal(np.sort(np.concatenate(blocks)), np.arange(self.n)), (
+            "blocks must partition the coordinates"
+        )
+
+        # blocks of equal size are solved in one batch, (N,k) indices per size k
+        self.groups = {}
+        for size in sorted({len(block) for block in blocks}):
+            self.groups[size] = np.array([block for block in blocks if len(block) == size])
+
+        # entries of quad within the blocks
+        rows = [np.repeat(block, len(block)) for block in blocks]
+        cols = [np.tile(block, len(block)) for block in blocks]
+        self._in_block = (np.concatenate(rows), np.concatenate(cols))
+
+        # telemetry of last call, None if it was passed to Argmin, whose own stats are
+        # recorded by the Profiler (counting them here too would count every solve twice)
+        self.stats = None
+
+    def is_separable(self, quad: np.ndarray) -> bool:
+        """
+        :param np.array quad: matrix (n,n) or (B,n,n)
+        :return bool: True if the program separates into the blocks
+        """
+        if self.constraints.structure != "box":
+            return False
+        in_block = np.count_nonzero(quad[..., self._in_block[0], self._in_block[1]])
+        return np.count_nonzero(quad) == in_block
+
+    def _solve_blocks(self, quad: np.ndarray, lin: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # quad (B,n,n), lin (B,n,1)
+        B = len(lin)
+        x = np.zeros((B, self.n, 1))
+        found = np.ones(B, dtype=bool)
+        for size, idx in self.groups.items():
+            N = len(idx)
+            quad_blocks = quad[:, idx[:, :, None], idx[:, None, :]].reshape(B * N, size, size)
+            lin_blocks = lin[:, idx, :].reshape(B * N, size, 1)
+            lower = np.broadcast_to(self.constraints.lower[idx], (B, N, size, 1))
+            upper = np.broadcast_to(self.constraints.upper[idx], (B, N, size, 1))
+
+            x_blocks, found_blocks = box_qp_blocks(
+                quad_blocks, lin_blocks, lower.reshape(-1, size, 1), upper.reshape(-1, size, 1)
+            )
+            x[:, idx, :] = x_blocks.reshape(B, N, size, 1)
+            found &= np.all(found_blocks.reshape(B, N), axis=1)
+        return x, found
+
+    def solve(
+        self, quad: np.ndarray, lin: np.ndarray, verify_psd: bool = False
+    ) -> np.ndarray | None:
+        if validate():
+            assert np.shape(quad) == (self.n, self.n)
+            assert np.shape(lin) == (self.n, 1)
+
+        self.stats = None
+        if not self.is_separable(quad):
+            return self.argmin.solve(quad, lin, verify_psd=verify_psd)
+
+        if verify_psd:
+            assert np.allclose(quad, quad.T)
+            assert np.all(np.linalg.eigvals(quad) >= 0)
+
+        start = time.perf_counter()
+        x, found = self._solve_blocks(quad[None], lin[None])
+        if not found[0]:
+            return self.argmin.solve(quad, lin)
+
+        solve_time = time.perf_counter() - start
+        primal_residual = np.max(self.constraints.A @ x[0] - self.constraints.b, initial=0)
+        self.stats = ArgminStats(
+            "blocks", "optimal", 0, primal_residual, np.nan, solve_time, solve_time
+        )
+        return x[0]
+
+    def solve_batch(self, quad: np.ndarray, lin: np.ndarray) -> np.ndarray:
+        """
+        solve for a batch of objectives, see Argmin.solve_batch
+
+        :param np.array quad: positive semi-definite matrices (B,n,n) or (n,n)
+        :param np.array lin: vectors (B,n,1)
+        :return np.array: minimizers x (B,n,1), nan where no solution was found
+        """
+        if validate():
+            assert np.shape(quad)[-2:] == (self.n, self.n)
+            assert np.shape(lin)[1:] == (self.n, 1)
+
+        if not self.is_separable(quad):
+            return self.argmin.solve_batch(quad, lin)
+
+        quad = np.broadcast_to(quad, (len(lin), self.n, self.n))
+        x, found = self._solve_blocks(quad, lin)
+        if not np.all(found):
+            x[~found] = self.argmin.solve_batch(quad[~found], lin[~found])
+        return x
+
+
+class LinearizedProjection:
+    """
+    LinearizedProjection: euclidean projection onto the intersection of a polytope
+    A x <= b and a linearized polytope A_lin x <= b_lin whose data changes between calls.
+    The problem is compiled once, b, A_lin and b_lin are cvxpy parameters.
+    """
+
+    # methods timed by the Profiler
+    PROFILE_METHODS = MappingProxyType({"proj_2": "qp"})
+
+    def __init__(self, constraints: Polytope, num_constr_lin: int):
+        import cvxpy as cp
+
         assert isinstance(constraints, Polytope)
+        assert isinstance(num_constr_lin, int)
         self.n = constraints.n
+        self.constraints = constraints
+        self.num_constr_lin = num_constr_lin
 
         # variables
         self.x = cp.Variable(shape=(self.n, 1), name="x")
 
         # parameters
-        self.quad = cp.Parameter(shape=(self.n, self.n), name="quad", symmetric=True)
-        self.lin = cp.Parameter(shape=(self.n, 1), name="lin")
+        self.z = cp.Parameter(shape=(self.n, 1), name="z")
+        self.b = cp.Parameter(shape=(constraints.num_constr, 1), name="b")
+        self.A_lin = cp.Parameter(shape=(num_constr_lin, self.n), name="A_lin")
+        self.b_lin = cp.Parameter(shape=(num_constr_lin, 1), name="b_lin")
 
         # objective
-        objective = cp.Minimize(
-            cp.quad_form(self.x, self.quad, assume_PSD=True) + self.lin.T @ self.x
-        )
+        objective = cp.Minimize(cp.sum_squares(self.x - self.z))
 
         # constraints
-        constraints = [constraints.A @ self.x <= constraints.b]
+        constraints = [
+            constraints.A @ self.x <= self.b,
+            self.A_lin @ self.x <= self.b_lin,
+        ]
 
         # problem
         self.problem = cp.Problem(objective, constraints)
 
-    def solve(
-        self, quad: np.ndarray, lin: np.ndarray, verify_psd: bool = False
-    ) -> np.ndarray | None:
-        assert np.shape(quad) == (self.n, self.n)
-        assert np.shape(lin) == (self.n, 1)
+        # telemetry of last call
+        self.stats = None
 
-        if verify_psd:
-            assert np.all(np.linalg.eigvals(quad) >= 0)
+    def proj_2(self, z: np.ndarray, A_lin: np.ndarray, b_lin: np.ndarray) -> np.ndarray | None:
+        """
+        return closest interior point of the intersected constraint set with respect to 2-norm
 
-        # verify symmetric
-        assert np.allclose(quad, quad.T)
+        :param np.array z: input vector (n,1)
+        :param np.array A_lin: linearized constraint matrix (num_constr_lin,n)
+        :param np.array b_lin: linearized constraint vector (num_constr_lin,1)
+        :return np.array: projection x (n,1)
+        """
+        if validate():
+            assert np.shape(z) == (self.n, 1)
+            assert np.shape(A_lin) == (self.num_constr_lin, self.n)
+            assert np.shape(b_lin) == (self.num_constr_lin, 1)
 
-        self.quad.value = quad
-        self.lin.value = lin
+        self.z.value = z
+        self.b.value = self.constraints.b
+        self.A_lin.value = A_lin
+        self.b_lin.value = b_lin
 
+        start = time.perf_counter()
         with warnings.catch_warnings(action="ignore"):
-            self.problem.solve(solver=cp.SCS, warm_start=True, ignore_dpp=True, eps=1e-8)
+            self.problem.solve(solver="SCS", warm_start=True, eps=1e-8)
+        solve_time = time.perf_counter() - start
+
+        solver_stats = self.problem.solver_stats
+        self.stats = ArgminStats(
+            "SCS",
+            self.problem.status,
+            solver_stats.num_iters or 0,
+            np.nan,
+            np.nan,
+            solve_time,
+            solve_time if solver_stats.solve_time is None else solver_stats.solve_time,
+        )
 
         if self.problem.status != "optimal":
             warnings.warn("no qp solution found!")
             return None
 
         return self.x.value
+
+    def proj_2_batch(self, z: np.ndarray, A_lin: np.ndarray, b_lin: np.ndarray) -> np.ndarray:
+        """
+        proj_2 for a batch of input vectors and linearizations
+
+        :param np.array z: input vectors (B,n,1)
+        :param np.array A_lin: linearized constraint matrices (B,num_constr_lin,n)
+        :param np.array b_lin: linearized constraint vectors (B,num_constr_lin,1)
+        :return np.array: projections x (B,n,1), nan where no solution was found
+        """
+        B = np.shape(z)[0]
+        if validate():
+            assert np.shape(z) == (B, self.n, 1)
+            assert np.shape(A_lin) == (B, self.num_constr_lin, self.n)
+            assert np.shape(b_lin) == (B, self.num_constr_lin, 1)
+
+        A = np.concatenate(
+            (np.broadcast_to(self.constraints.A, (B, *self.constraints.A.shape)), A_lin), axis=1
+        )
+        b = np.concatenate(
+            (np.broadcast_to(self.constraints.b, (B, *self.constraints.b.shape)), b_lin), axis=1
+        )
+
+        x, found = active_set_enumeration(np.eye(self.n), -2 * z, A, b)
+        for i in np.flatnonzero(~found):
+            x_i = self.proj_2(z[i], A_lin[i], b_lin[i])
+            x[i] = np.nan if x_i is None else x_i
+        return x
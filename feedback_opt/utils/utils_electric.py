@@ -1,4 +1,5 @@
 import numpy as np
+import scipy.sparse as sp
 
 # Code from Nullspace Power Balance and Nullspace Power Flow, Keith
 
@@ -86,26 +87,51 @@ def get_sens_powerInjections_to_voltage(Y, U):
     Returns the sensitivity of the power injection to changes in the network voltages for the network described by Y at voltage U.
 
     INPUTS
-    - Y: The dense bus admittance matrix. Complex valued.
+    - Y: The bus admittance matrix, dense or scipy.sparse. Complex valued.
     - U: 1-D array of complex voltages of all the nodes on the network in nodeorder. This could presumably be relaxed to some subset of all of the nodes.
 
     OUTPUTS
-    - Gamma_powerInjections_to_voltage: the sensitivity matrix for voltage mag and angle to power injections
+    - Gamma_powerInjections_to_voltage: the sparse (csc) sensitivity matrix for voltage mag and angle to power injections
 
     NOTES
     - for transformers, Y_ij != Y_ji. We assume that if one said of the transformer does not have flow constraint violation, then neither does the other side.
     - This code is an adapted version of GeminiCode's calculate_sensitivity()
     - It can handle power balancing (see Keith's dissertation) but that is not necessary for OPF
+    - Y is kept sparse, all block matrices are assembled from sparse diagonals
     """
 
     n_nodes = int(np.shape(Y)[0])
     assert n_nodes == len(np.ravel(U))
-    U = np.asmatrix(np.reshape(U, (n_nodes, 1)))
+    Y = sp.csr_matrix(Y)
+    U = np.ravel(U)
 
-    N = makeN(n_nodes * 2)
+    N = sp.diags(np.hstack((np.ones(n_nodes), -np.ones(n_nodes))))
 
     Gamma_allNodes = (
-        pointybracket(diag(np.conj(Y * U))) + pointybracket(diag(U)) * N * pointybracket(Y)
-    ) * R(U)
+        pointybracket_sparse(sp.diags(np.conj(Y @ U)))
+        + pointybracket_sparse(sp.diags(U)) @ N @ pointybracket_sparse(Y)
+    ) @ R_sparse(U)
 
-    return Gamma_allNodes
+    return Gamma_allNodes.tocsc()
+
+
+def pointybracket_sparse(M):
+    """
+    sparse version of pointybracket
+    """
+    return sp.bmat([[M.real, -M.imag], [M.imag, M.real]], format="csr")
+
+
+def R_sparse(ucomp):
+    """
+    sparse version of R
+    """
+    theta = np.angle(ucomp)
+    v = np.absolute(ucomp)
+    return sp.bmat(
+        [
+            [sp.diags(np.cos(theta)), sp.diags(-v * np.sin(theta))],
+            [sp.diags(np.sin(theta)), sp.diags(v * np.cos(theta))],
+        ],
+        format="csr",
+    )
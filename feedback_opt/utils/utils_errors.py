@@ -0,0 +1,5 @@
+class SolverError(Exception):
+    """
+    SolverError: a numerical solver of a simulation step (QP, power flow) found no solution,
+    e.g. for the diverging setpoints of an unstable step size
+    """
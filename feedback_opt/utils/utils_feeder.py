@@ -0,0 +1,108 @@
+import igraph as ig
+import numpy as np
+import pandapower as pp
+
+
+def synthetic_feeder(
+    n_bus: int = 200,
+    n_sgen: int = 10,
+    meshed: float = 0.0,
+    vn_kv: float = 20.0,
+    load_mw: float = 10.0,
+    sgen_mw: float | None = None,
+    seed: int = 0,
+) -> pp.pandapowerNet:
+    """
+    synthetic distribution feeder for scaling studies of SystemElectrical
+
+    the topology is a uniform random tree (igraph Pruefer) with the substation at bus 0
+    (ext_grid), meshed > 0 closes additional lines between buses at most three hops apart.
+    The depth of the tree grows with sqrt(n_bus), the line lengths shrink with it such that
+    the voltage profile does not depend on n_bus. Loads are spread over all other buses, the
+    sgens are placed on distinct random buses and carry the P/Q limits, the buses the voltage
+    limits of unicorn_56.
+
+    :param int n_bus: number of buses
+    :param int n_sgen: number of controllable sgens
+    :param float meshed: number of additional lines relative to n_bus
+    :param float vn_kv: nominal voltage in kV
+    :param float load_mw: total active power of the loads in MW (power factor 0.95)
+    :param float sgen_mw: rated active power of every sgen in MW, by default the sgens
+        together can supply twice the total load
+    :param int seed: random seed
+    :return pp.pandapowerNet: network
+    """
+    assert isinstance(n_bus, int) and n_bus >= 2
+    assert isinstance(n_sgen, int) and 0 < n_sgen < n_bus
+    assert meshed >= 0
+    if sgen_mw is None:
+        sgen_mw = 2 * load_mw / n_sgen
+    rng = np.random.default_rng(seed)
+
+    # radial topology, uniform random tree from a random Pruefer sequence
+    graph = ig.Graph.Prufer(rng.integers(n_bus, size=n_bus - 2).tolist())
+
+    # meshing: close lines between buses at most three hops apart
+    n_mesh = round(meshed * n_bus)
+    if n_mesh > 0:
+        neighbourhoods = graph.neighborhood(order=3, mindist=2)
+        candidates = [(i, j) for i, others in enumerate(neighbourhoods) for j in others if i < j]
+        choice = rng.choice(len(candidates), size=min(n_mesh, len(candidates)), replace=False)
+        graph.add_edges([candidates[c] for c in choice])
+    edges = np.array(graph.get_edgelist())
+
+    net = pp.create_empty_network(name=f"synthetic_feeder_{n_bus}")
+
+    # buses, bus 0 is the substation
+    buses = pp.create_buses(
+        net,
+        n_bus,
+        vn_kv=vn_kv,
+        name=[f"bus_{i}" for i in range(n_bus)],
+        max_vm_pu=1.05,
+        min_vm_pu=0.95,
+    )
+    pp.create_ext_grid(net, buses[0], vm_pu=1.0, name="substation")
+
+    # lines, parameters of a 240 mm^2 aluminium cable
+    pp.create_lines_from_parameters(
+        net,
+        from_buses=buses[edges[:, 0]],
+        to_buses=buses[edges[:, 1]],
+        length_km=rng.uniform(0.1, 0.5, size=len(edges)) * np.sqrt(1_000 / n_bus),
+        r_ohm_per_km=0.125,
+        x_ohm_per_km=0.112,
+        c_nf_per_km=0.0,
+        max_i_ka=0.4,
+        name=[f"line_{i}" for i in range(len(edges))],
+    )
+
+    # loads on every bus but the substation
+    p_mw = rng.uniform(0.5, 1.5, size=n_bus - 1)
+    p_mw *= load_mw / np.sum(p_mw)
+    pp.create_loads(
+        net,
+        buses[1:],
+        p_mw=p_mw,
+        q_mvar=p_mw * np.tan(np.arccos(0.95)),
+        name=[f"load_{i}" for i in range(n_bus - 1)],
+    )
+
+    # controllable sgens
+    sgen_buses = rng.choice(buses[1:], size=n_sgen, replace=False)
+    pp.create_sgens(
+        net,
+        sgen_buses,
+        p_mw=0.0,
+        q_mvar=0.0,
+        sn_mva=sgen_mw,
+        name=[f"pv_{i}" for i in range(n_sgen)],
+        type="PV",
+        controllable=True,
+        max_p_mw=sgen_mw,
+        min_p_mw=0.0,
+        max_q_mvar=0.3 * sgen_mw,
+        min_q_mvar=-0.3 * sgen_mw,
+    )
+
+    return net
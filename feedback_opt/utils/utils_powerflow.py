@@ -0,0 +1,177 @@
+import numpy as np
+import scipy.sparse as sp
+from numba import njit
+from scipy.sparse.linalg import splu
+
+# Newton-Raphson power flow in polar coordinates for repeated solves on a fixed network
+# Zimmerman, Murillo-Sanchez, Thomas: MATPOWER, newtonpf / dSbus_dV
+
+
+@njit(cache=True)
+def _mismatch(indptr, indices, data, V, Sbus, pq):
+    """
+    complex current injections Ibus = Ybus V and the power mismatch [dP; dQ] at the pq busses
+    """
+    n = len(V)
+    Ibus = np.zeros(n, dtype=np.complex128)
+    for i in range(n):
+        for t in range(indptr[i], indptr[i + 1]):
+            Ibus[i] += data[t] * V[indices[t]]
+
+    p = len(pq)
+    F = np.empty(2 * p)
+    for r in range(p):
+        i = pq[r]
+        mis = V[i] * np.conj(Ibus[i]) - Sbus[i]
+        F[r] = mis.real
+        F[p + r] = mis.imag
+    return F, Ibus
+
+
+@njit(cache=True)
+def _jacobian(indptr, indices, data, pq, V, Ibus, J_data):
+    """
+    values of the reduced Jacobian [[dP/dVa, dP/dVm], [dQ/dVa, dQ/dVm]] at the pq busses
+    written into the csr data array of the structure built by PowerFlow._jacobian_structure
+    """
+    p = len(pq)
+    nnz = indptr[p]
+    for r in range(p):
+        i = pq[r]
+        row_nnz = indptr[r + 1] - indptr[r]
+        top = 2 * indptr[r]
+        bottom = 2 * nnz + 2 * indptr[r]
+        Vnorm_i = V[i] / np.abs(V[i])
+        for t in range(indptr[r], indptr[r + 1]):
+            k = pq[indices[t]]
+            Vnorm_k = V[k] / np.abs(V[k])
+
+            # dS_dVa = j diag(V) conj(diag(Ibus) - Ybus diag(V))
+            dS_dVa = -1j * V[i] * np.conj(data[t] * V[k])
+            # dS_dVm = diag(V) conj(Ybus diag(V / |V|)) + conj(diag(Ibus)) diag(V / |V|)
+            dS_dVm = V[i] * np.conj(data[t] * Vnorm_k)
+            if k == i:
+                dS_dVa += 1j * V[i] * np.conj(Ibus[i])
+                dS_dVm += np.conj(Ibus[i]) * Vnorm_i
+
+            offset = t - indptr[r]
+            J_data[top + offset] = dS_dVa.real
+            J_data[top + row_nnz + offset] = dS_dVm.real
+            J_data[bottom + offset] = dS_dVa.imag
+            J_data[bottom + row_nnz + offset] = dS_dVm.imag
+
+
+class PowerFlow:
+    """
+    PowerFlow: Newton-Raphson power flow for a fixed admittance matrix and bus types.
+    Only the complex power injections change between solves, every solve is warm started
+    from the last solution. Supports a single slack bus and pq busses.
+    """
+
+    def __init__(
+        self,
+        Ybus: sp.spmatrix,
+        V0: np.ndarray,
+        pq: np.ndarray,
+        tol: float = 1e-11,
+        max_iter: int = 20,
+    ):
+        assert sp.issparse(Ybus)
+        assert Ybus.shape[0] == Ybus.shape[1] == len(V0)
+        self.n = Ybus.shape[0]
+        self.pq = np.asarray(pq, dtype=np.int64)
+        self.p = len(self.pq)
+        self.max_iter = max_iter
+
+        # full admittance matrix for current injections
+        Ybus = sp.csr_matrix(Ybus, dtype=np.complex128)
+        Ybus.sort_indices()
+
+        # the mismatch cannot be resolved below the rounding error of V conj(Ybus V),
+        # short lines (e.g. large synthetic feeders) have admittances of 1e5 pu and more
+        self.tol = max(tol, 16 * np.finfo(float).eps * np.max(np.abs(Ybus.diagonal())))
+        self._Y = (Ybus.indptr.astype(np.int64), Ybus.indices.astype(np.int64), Ybus.data)
+
+        # pq reduced admittance matrix with structural diagonal
+        self._Y_pq = self._reduced_admittance(Ybus)
+        self._J_indptr, self._J_indices = self._jacobian_structure()
+
+        # warm start
+        self.V = np.array(V0, dtype=np.complex128)
+
+    def _reduced_admittance(self, Ybus: sp.csr_matrix):
+        Y_pq = Ybus[self.pq][:, self.pq]
+        pattern = (abs(Y_pq) + sp.eye(self.p)).tocsr()
+        pattern.sort_indices()
+        rows = np.repeat(np.arange(self.p), np.diff(pattern.indptr))
+        data = np.asarray(Y_pq[rows, pattern.indices]).ravel().astype(np.complex128)
+        return pattern.indptr.astype(np.int64), pattern.indices.astype(np.int64), data
+
+    def _jacobian_structure(self):
+        indptr, indices, _ = self._Y_pq
+        row_nnz = np.diff(indptr)
+
+        # every row holds the pattern of Y_pq twice: [Va block, Vm block]
+        J_indptr = np.concatenate(([0], np.cumsum(np.tile(2 * row_nnz, 2))))
+        J_indices = np.empty(J_indptr[-1], dtype=np.int64)
+        for r in range(self.p):
+            cols = indices[indptr[r] : indptr[r + 1]]
+            for start in (J_indptr[r], J_indptr[self.p + r]):
+                J_indices[start : start + len(cols)] = cols
+                J_indices[start + len(cols) : start + 2 * len(cols)] = cols + self.p
+        return J_indptr, J_indices
+
+    def jacobian(self, V: np.ndarray, Ibus: np.ndarray | None = None) -> sp.csc_matrix:
+        """
+        reduced power flow Jacobian d[P; Q] / d[Va; Vm] at the pq busses
+
+        :param np.array V: complex bus voltages (n,)
+        :param np.array Ibus: complex current injections (n,)
+        :return sp.csc_matrix: Jacobian (2p,2p)
+        """
+        if Ibus is None:
+            _, Ibus = _mismatch(*self._Y, V, np.zeros(self.n, dtype=np.complex128), self.pq)
+
+        J_data = np.empty(len(self._J_indices))
+        _jacobian(*self._Y_pq, self.pq, V, Ibus, J_data)
+        J = sp.csr_matrix((J_data, self._J_indices, self._J_indptr), shape=(2 * self.p, 2 * self.p))
+        return J.tocsc()
+
+    def jacobian_lu(self, V: np.ndarray):
+        """
+        sparse LU factorization of the reduced Jacobian, e.g. for sensitivities
+
+        :param np.array V: complex bus voltages (n,)
+        :return SuperLU: factorization
+        """
+        return splu(self.jacobian(V))
+
+    def solve(self, Sbus: np.ndarray) -> tuple[np.ndarray | None, int]:
+        """
+        solve the power flow equations V conj(Ybus V) = Sbus at the pq busses
+
+        :param np.array Sbus: complex bus power injections in pu (n,)
+        :return tuple: complex bus voltages (n,) or None if not converged, number of iterations
+        """
+        assert np.shape(Sbus) == (self.n,)
+        Sbus = np.asarray(Sbus, dtype=np.complex128)
+
+        V = self.V.copy()
+        Va = np.angle(V)
+        Vm = np.abs(V)
+
+        for iteration in range(self.max_iter + 1):
+            F, Ibus = _mismatch(*self._Y, V, Sbus, self.pq)
+            if np.max(np.abs(F)) < self.tol:
+                self.V = V
+                return V.copy(), iteration
+
+            if iteration == self.max_iter:
+                break
+
+            dx = splu(self.jacobian(V, Ibus)).solve(-F)
+            Va[self.pq] += dx[: self.p]
+            Vm[self.pq] += dx[self.p :]
+            V = Vm * np.exp(1j * Va)
+
+        return None, self.max_iter
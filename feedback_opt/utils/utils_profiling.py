@@ -0,0 +1,176 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+# opt-in per step profiling of a simulation (params.profile = True)
+# classes declare their instrumented methods in PROFILE_METHODS (method name -> phase), the
+# profiler wraps them on the instance while attached. Phases nest, every phase is charged its
+# self time (wall time minus the time of nested phases), such that the phases of a step add up
+
+
+class Profiler:
+    """
+    Profiler: wall time per phase and solver iterations of every simulation step
+    """
+
+    def __init__(self):
+        self._patched = []
+        self.reset()
+
+    def reset(self):
+        """
+        drop all records
+        """
+        # stack of open phases [name, time of nested phases]
+        self._stack = []
+
+        # records of the current step
+        self._step_time = defaultdict(float)
+        self._step_iterations = defaultdict(int)
+        self._step_start = time.perf_counter()
+
+        # records of all steps
+        self._rows = []
+        self._total_time = defaultdict(float)
+        self._self_time = defaultdict(float)
+        self._calls = defaultdict(int)
+
+    ### recording
+    @contextmanager
+    def phase(self, name: str):
+        """
+        times the enclosed block as phase name
+        """
+        start = time.perf_counter()
+        self._stack.append([name, 0.0])
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _, nested = self._stack.pop()
+            self._add(name, elapsed, elapsed - nested)
+
+    def record(self, name: str, elapsed: float):
+        """
+        adds time measured elsewhere (e.g. reported by a solver) as nested phase name
+
+        :param str name: phase
+        :param float elapsed: wall time in s
+        """
+        self._add(name, elapsed, elapsed)
+
+    def count(self, name: str, n: int):
+        """
+        :param str name: counter, e.g. qp_iterations
+        :param int n: increment
+        """
+        self._step_iterations[name] += n
+
+    def _add(self, name: str, elapsed: float, self_time: float):
+        self._step_time[name] += self_time
+        self._total_time[name] += elapsed
+        self._self_time[name] += self_time
+        self._calls[name] += 1
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+    def step(self, t: int):
+        """
+        closes the records of timestep t
+        """
+        now = time.perf_counter()
+        row = {"t": t, "wall": now - self._step_start}
+        row.update(self._step_time)
+        row.update(self._step_iterations)
+        self._rows.append(row)
+
+        self._step_time.clear()
+        self._step_iterations.clear()
+        self._step_start = now
+
+    ### instrumentation
+    def attach(self, obj, _visited: set | None = None):
+        """
+        wraps the PROFILE_METHODS of obj and, recursively, of its attributes
+
+        :param obj: e.g. system or optimizer
+        """
+        if _visited is None:
+            _visited = set()
+        methods = getattr(type(obj), "PROFILE_METHODS", None)
+        if methods is None or id(obj) in _visited:
+            return
+        _visited.add(id(obj))
+
+        attributes = list(vars(obj).values())
+        for method, phase in methods.items():
+            if method not in vars(obj):
+                setattr(obj, method, self._wrap(obj, getattr(obj, method), phase))
+                self._patched.append((obj, method))
+
+        for attribute in attributes:
+            self.attach(attribute, _visited)
+
+    def detach(self):
+        """
+        restores all wrapped methods
+        """
+        for obj, method in self._patched:
+            delattr(obj, method)
+        self._patched = []
+
+    def _wrap(self, obj, func, phase: str):
+        @wraps(func)
+        def wrapped(*args, **kwargs):
+            # a call within its own phase (e.g. ArgminSeparable passing a program to its Argmin)
+            # is part of the open phase and not a call of its own
+            reentrant = bool(self._stack) and self._stack[-1][0] == phase
+            with nullcontext() if reentrant else self.phase(phase):
+                result = func(*args, **kwargs)
+
+                # solver telemetry (ArgminStats) of the call
+                stats = getattr(obj, "stats", None)
+                if stats is not None:
+                    self.count(f"{phase}_iterations", stats.iterations)
+                    if np.isfinite(stats.solver_time):
+                        self.record("solver", stats.solver_time)
+            return result
+
+        return wrapped
+
+    ### results
+    def frame(self) -> pd.DataFrame:
+        """
+        :return pd.DataFrame: per timestep wall time of the step and self time of every phase
+            in s, and the solver iterations, indexed by t
+        """
+        frame = pd.DataFrame(self._rows).set_index("t").fillna(0)
+        phases = [c for c in frame.columns if c != "wall" and not c.endswith("_iterations")]
+        frame["other"] = frame["wall"] - frame[phases].sum(axis=1)
+        return frame
+
+    def report(self) -> pd.DataFrame:
+        """
+        :return pd.DataFrame: phases ranked by self time, with total (including nested phases)
+            and self time in s, share of the self time in the wall time, calls and mean self
+            time per step in ms
+        """
+        n_steps = len(self._rows)
+        wall = sum(row["wall"] for row in self._rows)
+
+        report = pd.DataFrame(
+            {
+                "self_time": pd.Series(self._self_time),
+                "total_time": pd.Series(self._total_time),
+                "calls": pd.Series(self._calls),
+            }
+        )
+        report.loc["other"] = [wall - report["self_time"].sum(), np.nan, np.nan]
+        report["share"] = report["self_time"] / wall
+        report["ms_per_step"] = 1e3 * report["self_time"] / max(n_steps, 1)
+        report.index.name = "phase"
+        return report.sort_values("self_time", ascending=False)
@@ -0,0 +1,338 @@
+import itertools
+import math
+
+import numpy as np
+
+# dense active-set solvers for small quadratic programs
+# Lawson, Hanson: Solving Least Squares Problems, Chapter 23
+
+# largest number of candidate active sets enumerated by active_set_enumeration, larger programs
+# are left to the per program solvers of the callers
+MAX_ACTIVE_SETS = 10_000
+
+
+def nnls(
+    E: np.ndarray,
+    f: np.ndarray,
+    passive: np.ndarray | None = None,
+    max_iter: int | None = None,
+    tol: float = 1e-12,
+):
+    """
+    non-negative least squares min ||E u - f||_2 s.t. u >= 0
+    Lawson-Hanson active-set method
+
+    :param np.array E: matrix (r,k)
+    :param np.array f: vector (r,)
+    :param np.array passive: initial guess of the passive set (k,) used as warm start
+    :param int max_iter: maximum number of outer iterations, defaults to 3k
+    :param float tol: dual feasibility tolerance
+    :return tuple: solution u (k,), passive set (k,) and number of iterations,
+        u is None if the iteration limit was reached
+    """
+    assert E.ndim == 2
+    assert np.shape(f) == (E.shape[0],)
+
+    k = E.shape[1]
+    if max_iter is None:
+        max_iter = 3 * k + 3
+
+    u = np.zeros(k)
+    if passive is None:
+        passive = np.zeros(k, dtype=bool)
+    else:
+        assert np.shape(passive) == (k,)
+        passive = passive.copy()
+
+        # warm start: shrink the guessed passive set until its solution is positive
+        while np.any(passive):
+            s = np.linalg.lstsq(E[:, passive], f, rcond=None)[0]
+            if np.all(s > 0):
+                u[passive] = s
+                break
+            passive[np.flatnonzero(passive)[s <= 0]] = False
+
+    w = E.T @ (f - E @ u)
+
+    for iteration in range(max_iter):
+        # optimality: all active variables have non-positive dual
+        if np.all(passive) or np.max(w[~passive]) <= tol:
+            return u, passive, iteration
+
+        # free the most violating active variable
+        passive[np.argmax(np.where(passive, -np.inf, w))] = True
+
+        while True:
+            # unconstrained least squares on the passive set
+            s = np.zeros(k)
+            s[passive] = np.linalg.lstsq(E[:, passive], f, rcond=None)[0]
+            if np.all(s[passive] > 0):
+                break
+
+            # step back to the boundary and drop variables that hit zero
+            blocking = passive & (s <= 0)
+            alpha = np.min(u[blocking] / (u[blocking] - s[blocking]))
+            u = u + alpha * (s - u)
+            passive &= u > tol
+            u[~passive] = 0
+        u = s
+
+        w = E.T @ (f - E @ u)
+
+    return None, passive, max_iter
+
+
+def least_distance(
+    A: np.ndarray,
+    b: np.ndarray,
+    z: np.ndarray,
+    active: np.ndarray | None = None,
+    tol: float = 1e-9,
+):
+    """
+    euclidean projection of z onto the polytope A x <= b
+    solved as least distance program via nnls
+
+    min     1/2 ||x - z||^2
+    s.t.    A x <= b
+
+    :param np.array A: constraint matrix (k,n)
+    :param np.array b: constraint vector (k,1)
+    :param np.array z: input vector (n,1)
+    :param np.array active: active set guess (k,) used as warm start
+    :param float tol: infeasibility tolerance
+    :return tuple: projection x (n,1), multipliers (k,1), active set (k,) and number of
+        iterations, x is None if no solution was found
+    """
+    n = A.shape[1]
+
+    # min ||w|| s.t. G w >= h with w = x - z
+    G = -A
+    h = (A @ z - b).ravel()
+
+    E = np.vstack((G.T, h))
+    f = np.zeros(n + 1)
+    f[n] = 1
+
+    u, active, iterations = nnls(E, f, passive=active)
+    if u is None:
+        return None, None, active, iterations
+
+    r = E @ u - f
+    if np.linalg.norm(r) <= tol:
+        # empty polytope
+        return None, None, active, iterations
+
+    w = -r[:n] / r[n]
+    x = z + w.reshape(-1, 1)
+    lamb = -u.reshape(-1, 1) / r[n]
+
+    # guard against numerical breakdown
+    if np.any(A @ x - b > tol * (1 + np.abs(b))):
+        return None, None, active, iterations
+
+    return x, lamb, active, iterations
+
+
+class DenseQP:
+    """
+    in-process solver for small strictly convex quadratic programs
+
+    min     x^T quad x + lin^T x
+    s.t.    A x <= b
+
+    The objective is transformed into a least distance program using the Cholesky factor of
+    quad, which is solved by the active-set method above.
+    The factorization and the active set are kept as warm start for the next call, the active
+    set per caller if a warm_start dict is passed (e.g. by Argmin over a shared backend).
+    """
+
+    def __init__(self, A: np.ndarray):
+        assert isinstance(A, np.ndarray)
+        self.A = A
+
+        # factorization cache
+        self._quad = None
+        self._L = None
+        self._A_L = None
+
+        # warm start
+        self.warm_start = {}
+
+    def _factorize(self, quad: np.ndarray) -> bool:
+        if self._quad is not None and np.array_equal(quad, self._quad):
+            return True
+
+        try:
+            L = np.linalg.cholesky(quad)
+        except np.linalg.LinAlgError:
+            return False
+
+        self._quad = quad.copy()
+        self._L = L
+        # A L^-T
+        self._A_L = np.linalg.solve(L, self.A.T).T
+        return True
+
+    def solve(
+        self, quad: np.ndarray, lin: np.ndarray, b: np.ndarray, warm_start: dict | None = None
+    ):
+        """
+        :param np.array quad: positive definite matrix (n,n)
+        :param np.array lin: vector (n,1)
+        :param np.array b: constraint vector (k,1)
+        :param dict warm_start: active set of the previous call of the caller, updated in place
+        :return tuple: minimizer x (n,1), multipliers (k,1) and number of iterations,
+            x is None if quad is not positive definite or no solution was found
+        """
+        if not self._factorize(quad):
+            return None, None, 0
+
+        # x^T quad x + lin^T x = ||L^T x + c||^2 - ||c||^2 with c = 1/2 L^-1 lin
+        c = np.linalg.solve(self._L, lin) / 2
+        b_w = b + self._A_L @ c
+
+        if warm_start is None:
+            warm_start = self.warm_start
+        w, lamb, active, iterations = least_distance(
+            self._A_L, b_w, np.zeros_like(c), active=warm_start.get("active")
+        )
+        if w is None:
+            warm_start["active"] = None
+            return None, None, iterations
+
+        warm_start["active"] = active
+        x = np.linalg.solve(self._L.T, w - c)
+
+        # multipliers of the least distance program are scaled by the objective
+        return x, 2 * lamb, iterations
+
+
+def active_set_enumeration(
+    quad: np.ndarray,
+    lin: np.ndarray,
+    A: np.ndarray,
+    b: np.ndarray,
+    tol: float = 1e-9,
+    max_active_sets: int = MAX_ACTIVE_SETS,
+):
+    """
+    batched solver for many small convex quadratic programs
+
+    min     x^T quad x + lin^T x
+    s.t.    A x <= b
+
+    every candidate active set of at most n constraints is solved via its KKT system for the
+    whole batch at once, the minimizer is the feasible candidate with non-negative multipliers.
+    Intended for n and k small, the number of candidates is sum_{s <= n} (k choose s).
+
+    :param np.array quad: positive semi-definite matrices (B,n,n) or (n,n)
+    :param np.array lin: vectors (B,n,1)
+    :param np.array A: constraint matrices (B,k,n) or (k,n)
+    :param np.array b: constraint vectors (B,k,1) or (k,1)
+    :param int max_active_sets: programs with more candidates are not solved
+    :return tuple: minimizers x (B,n,1) and mask (B,) of the programs solved
+    """
+    B, n, _ = np.shape(lin)
+    k = np.shape(A)[-2]
+
+    x = np.zeros((B, n, 1))
+    found = np.zeros(B, dtype=bool)
+    if num_active_sets(n, k, limit=max_active_sets) > max_active_sets:
+        return x, found
+
+    quad = np.broadcast_to(quad, (B, n, n))
+    A = np.broadcast_to(A, (B, k, n))
+    b = np.broadcast_to(b, (B, k, 1))
+
+    for s in range(min(n, k) + 1):
+        for active in itertools.combinations(range(k), s):
+            todo = ~found
+            if not np.any(todo):
+                return x, found
+
+            # KKT system [[2 quad, A_S^T], [A_S, 0]] [x; lamb_S] = [-lin; b_S]
+            A_S = A[todo][:, active, :]
+            K = np.zeros((np.count_nonzero(todo), n + s, n + s))
+            K[:, :n, :n] = 2 * quad[todo]
+            K[:, :n, n:] = A_S.mT
+            K[:, n:, :n] = A_S
+            rhs = np.concatenate((-lin[todo], b[todo][:, active, :]), axis=1)
+
+            # skip singular systems
+            scale = np.prod(np.linalg.norm(K, axis=2) + 1, axis=1)
+            regular = np.abs(np.linalg.det(K)) > 1e-12 * scale
+            K[~regular] = np.eye(n + s)
+            sol = np.linalg.solve(K, rhs)
+
+            x_S = sol[:, :n, :]
+            lamb_S = sol[:, n:, :]
+            primal = np.all(A[todo] @ x_S - b[todo] <= tol * (1 + np.abs(b[todo])), axis=(1, 2))
+            dual = np.all(lamb_S >= -tol, axis=(1, 2))
+            valid = regular & primal & dual
+
+            idx = np.flatnonzero(todo)[valid]
+            x[idx] = x_S[valid]
+            found[idx] = True
+
+    return x, found
+
+
+def num_active_sets(n: int, k: int, limit: int | None = None) -> int:
+    """
+    :param int n: number of variables
+    :param int k: number of constraints
+    :param int limit: counting stops once the count exceeds limit
+    :return int: number of candidate active sets of active_set_enumeration
+    """
+    total = 0
+    for s in range(min(n, k) + 1):
+        total += math.comb(k, s)
+        if limit is not None and total > limit:
+            break
+    return total
+
+
+def box_qp_blocks(
+    quad: np.ndarray,
+    lin: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+):
+    """
+    batched solver for many independent box constrained quadratic programs of a small size k
+
+    min     x^T quad x + lin^T x
+    s.t.    lower <= x <= upper
+
+    programs with a diagonal quad are solved in closed form by clipping the unconstrained
+    minimizer, all others by active set enumeration over the 2k bounds.
+
+    :param np.array quad: positive definite matrices (N,k,k)
+    :param np.array lin: vectors (N,k,1)
+    :param np.array lower: lower bounds (N,k,1), may be -inf
+    :param np.array upper: upper bounds (N,k,1), may be inf
+    :return tuple: minimizers x (N,k,1) and mask (N,) of the programs solved
+    """
+    N, k, _ = np.shape(lin)
+    x = np.zeros((N, k, 1))
+    found = np.zeros(N, dtype=bool)
+
+    # closed form: clip -lin / (2 quad_ii)
+    diag = np.diagonal(quad, axis1=1, axis2=2)[..., None]
+    is_diagonal = np.count_nonzero(quad, axis=(1, 2)) == np.count_nonzero(diag, axis=(1, 2))
+    is_diagonal &= np.all(diag > 0, axis=(1, 2))
+    x[is_diagonal] = np.clip(
+        -lin[is_diagonal] / (2 * diag[is_diagonal]), lower[is_diagonal], upper[is_diagonal]
+    )
+    found[is_diagonal] = True
+
+    # general blocks: A = [I; -I], b = [upper; -lower]
+    general = np.flatnonzero(~is_diagonal)
+    if len(general) > 0:
+        A = np.vstack((np.eye(k), -np.eye(k)))
+        b = np.concatenate((upper[general], -lower[general]), axis=1)
+        with np.errstate(invalid="ignore"):
+            x[general], found[general] = active_set_enumeration(quad[general], lin[general], A, b)
+
+    return x, found
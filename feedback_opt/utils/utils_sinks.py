@@ -0,0 +1,205 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+# chunked on-disk sinks for streamed simulation histories
+# every sink receives one row of floats per logged timestep and flushes every chunk_size rows,
+# so a run uses constant memory. The numpy and arrow IPC files stay readable up to the last
+# flush if the process is killed, a parquet file is only readable once closed (footer).
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("the parquet and arrow sinks require pyarrow to be installed") from error
+    return pyarrow
+
+
+class SinkBase(ABC):
+    """
+    SinkBase: buffers rows (t, values) and writes them to disk chunk by chunk
+    """
+
+    def __init__(self, path: str, chunk_size: int = 1024):
+        assert isinstance(path, str)
+        assert isinstance(chunk_size, int) and chunk_size > 0
+        self.path = path
+        self.chunk_size = chunk_size
+
+        self.columns = None
+        self.n_rows = 0
+        self._t = None
+        self._buffer = None
+        self._n_buffered = 0
+        self.is_open = False
+
+    def open(self, columns: list[str], max_rows: int):
+        """
+        :param list columns: column names of the rows
+        :param int max_rows: upper bound of the number of rows written
+        """
+        self.columns = list(columns)
+        self.n_rows = 0
+        self._t = np.empty(self.chunk_size, dtype=np.int64)
+        self._buffer = np.empty((self.chunk_size, len(self.columns)))
+        self._n_buffered = 0
+        self._open(max_rows)
+        self.is_open = True
+
+    def write(self, t: int, row: np.ndarray):
+        """
+        :param int t: timestep
+        :param np.array row: values (len(columns),)
+        """
+        self._t[self._n_buffered] = t
+        self._buffer[self._n_buffered] = row
+        self._n_buffered += 1
+        if self._n_buffered == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._n_buffered == 0:
+            return
+        self._write_chunk(self._t[: self._n_buffered], self._buffer[: self._n_buffered])
+        self.n_rows += self._n_buffered
+        self._n_buffered = 0
+
+    def close(self):
+        if not self.is_open:
+            return
+        self.flush()
+        self._close()
+        self.is_open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @abstractmethod
+    def _open(self, max_rows: int):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _write_chunk(self, t: np.ndarray, rows: np.ndarray):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _close(self):
+        raise NotImplementedError
+
+    @classmethod
+    @abstractmethod
+    def read(cls, path: str) -> pd.DataFrame:
+        """
+        :param str path: file written by the sink
+        :return pd.DataFrame: history indexed by timestep t
+        """
+        raise NotImplementedError
+
+
+class NumpySink(SinkBase):
+    """
+    memory-mapped .npy file of a structured array with fields t and the columns
+    rows not (yet) written hold t = -1
+    """
+
+    def _open(self, max_rows: int):
+        dtype = np.dtype([("t", np.int64)] + [(name, np.float64) for name in self.columns])
+        self._memmap = np.lib.format.open_memmap(
+            self.path, mode="w+", dtype=dtype, shape=(max_rows,)
+        )
+        self._memmap["t"] = -1
+        self._memmap.flush()
+
+    def _write_chunk(self, t: np.ndarray, rows: np.ndarray):
+        chunk = self._memmap[self.n_rows : self.n_rows + len(t)]
+        for i, name in enumerate(self.columns):
+            chunk[name] = rows[:, i]
+        chunk["t"] = t
+        self._memmap.flush()
+
+    def _close(self):
+        del self._memmap
+
+    @classmethod
+    def read(cls, path: str) -> pd.DataFrame:
+        data = np.load(path, mmap_mode="r")
+        data = np.asarray(data[data["t"] >= 0])
+        columns = [name for name in data.dtype.names if name != "t"]
+        return pd.DataFrame(
+            {name: data[name] for name in columns}, index=pd.Index(data["t"], name="t")
+        )
+
+
+class ParquetSink(SinkBase):
+    """
+    parquet file with one row group per chunk
+    not readable if the run is killed before close, use NumpySink or ArrowIPCSink for long runs
+    """
+
+    def _schema(self):
+        pa = _import_pyarrow()
+        return pa.schema([("t", pa.int64())] + [(name, pa.float64()) for name in self.columns])
+
+    def _batch(self, t: np.ndarray, rows: np.ndarray):
+        pa = _import_pyarrow()
+        arrays = [pa.array(t)] + [pa.array(rows[:, i]) for i in range(len(self.columns))]
+        return pa.record_batch(arrays, schema=self._arrow_schema)
+
+    def _open(self, max_rows: int):
+        pa = _import_pyarrow()
+        self._arrow_schema = self._schema()
+        self._writer = pa.parquet.ParquetWriter(self.path, self._arrow_schema)
+
+    def _write_chunk(self, t: np.ndarray, rows: np.ndarray):
+        self._writer.write_batch(self._batch(t, rows))
+
+    def _close(self):
+        self._writer.close()
+
+    @classmethod
+    def read(cls, path: str) -> pd.DataFrame:
+        pa = _import_pyarrow()
+        return pa.parquet.read_table(path).to_pandas().set_index("t")
+
+
+class ArrowIPCSink(ParquetSink):
+    """
+    arrow IPC stream with one record batch per chunk
+    the stream format stays readable up to the last complete batch if the run is killed
+    """
+
+    def _open(self, max_rows: int):
+        pa = _import_pyarrow()
+        self._arrow_schema = self._schema()
+        self._file = pa.OSFile(self.path, "wb")
+        self._writer = pa.ipc.new_stream(self._file, self._arrow_schema)
+
+    def _write_chunk(self, t: np.ndarray, rows: np.ndarray):
+        super()._write_chunk(t, rows)
+        self._file.flush()
+
+    def _close(self):
+        self._writer.close()
+        self._file.close()
+
+    @classmethod
+    def read(cls, path: str) -> pd.DataFrame:
+        pa = _import_pyarrow()
+        with pa.OSFile(path, "rb") as file:
+            batches = []
+            reader = pa.ipc.open_stream(file)
+            try:
+                # extend keeps the batches read before an error
+                batches.extend(reader)
+            except pa.ArrowInvalid:
+                # truncated stream of a killed run
+                pass
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+        return table.to_pandas().set_index("t")
@@ -0,0 +1,138 @@
+import numpy as np
+
+# streaming statistics over a sequence of equally shaped arrays, every cell is tracked independently
+# Welford: Note on a method for calculating corrected sums of squares and products, 1962
+# Jain, Chlamtac: The P^2 algorithm for dynamic calculation of quantiles and histograms
+#   without storing observations, 1985
+
+
+class P2Quantile:
+    """
+    P2Quantile: streaming estimate of the p-quantile of every cell with five markers per cell
+    """
+
+    def __init__(self, shape: tuple, p: float):
+        assert 0 < p < 1
+        self.p = p
+        self.count = 0
+
+        # marker heights and positions (1-based as in the original paper)
+        self.q = np.zeros((5, *shape))
+        self.n = np.broadcast_to(np.arange(1.0, 6.0).reshape(5, *[1] * len(shape)), self.q.shape)
+        self.n = self.n.copy()
+
+        # desired marker positions and their increments
+        increments = np.array([0, p / 2, p, (1 + p) / 2, 1])
+        self.dn = increments.reshape(5, *[1] * len(shape))
+        self.n_desired = np.broadcast_to(1 + 4 * self.dn, self.q.shape).copy()
+
+    def update(self, x: np.ndarray):
+        """
+        :param np.array x: observation of every cell (shape)
+        """
+        q, n = self.q, self.n
+
+        # initialization with the first five observations
+        if self.count < 5:
+            q[self.count] = x
+            self.count += 1
+            if self.count == 5:
+                q.sort(axis=0)
+            return
+        self.count += 1
+
+        # cell k with q[k] <= x < q[k+1], extreme markers follow the extrema
+        k = np.clip(np.sum(x >= q[1:4], axis=0), 0, 3)
+        q[0] = np.minimum(q[0], x)
+        q[4] = np.maximum(q[4], x)
+
+        # increment positions of markers k+1, ..., 4
+        n += np.arange(5).reshape(5, *[1] * np.ndim(x)) > k
+        self.n_desired += self.dn
+
+        # adjust heights of the inner markers
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for i in range(1, 4):
+                d = self.n_desired[i] - n[i]
+                move = ((d >= 1) & (n[i + 1] - n[i] > 1)) | ((d <= -1) & (n[i - 1] - n[i] < -1))
+                if not np.any(move):
+                    continue
+                s = np.sign(d)
+
+                # piecewise parabolic prediction
+                q_parabolic = q[i] + s / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+
+                # linear prediction towards the neighbour in direction s
+                q_neighbour = np.where(s > 0, q[i + 1], q[i - 1])
+                n_neighbour = np.where(s > 0, n[i + 1], n[i - 1])
+                q_linear = q[i] + s * (q_neighbour - q[i]) / (n_neighbour - n[i])
+
+                parabolic_ok = (q[i - 1] < q_parabolic) & (q_parabolic < q[i + 1])
+                q_new = np.where(parabolic_ok, q_parabolic, q_linear)
+
+                q[i] = np.where(move, q_new, q[i])
+                n[i] = np.where(move, n[i] + s, n[i])
+
+    @property
+    def value(self) -> np.ndarray:
+        """
+        :return np.array: quantile estimate of every cell (shape)
+        """
+        if self.count < 5:
+            return np.quantile(self.q[: self.count], self.p, axis=0)
+        return self.q[2].copy()
+
+
+class StreamingStats:
+    """
+    StreamingStats: count, mean, standard deviation, extrema and quantiles of every cell
+    of a stream of equally shaped arrays, without storing the observations
+    """
+
+    def __init__(self, shape: tuple, quantiles: tuple[float, ...] = (0.05, 0.5, 0.95)):
+        self.shape = shape
+        self.count = 0
+
+        # Welford accumulators
+        self.mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+        self.quantiles = {p: P2Quantile(shape, p) for p in quantiles}
+
+    def update(self, x: np.ndarray):
+        """
+        :param np.array x: observation of every cell (shape)
+        """
+        assert np.shape(x) == self.shape
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        np.minimum(self.min, x, out=self.min)
+        np.maximum(self.max, x, out=self.max)
+        for quantile in self.quantiles.values():
+            quantile.update(x)
+
+    @property
+    def std(self) -> np.ndarray:
+        """
+        :return np.array: sample standard deviation of every cell (shape)
+        """
+        if self.count < 2:
+            return np.full(self.shape, np.nan)
+        return np.sqrt(self._m2 / (self.count - 1))
+
+    def summary(self) -> dict:
+        """
+        :return dict: statistic name -> values of every cell, quantiles are named like q05
+        """
+        summary = {"mean": self.mean.copy(), "std": self.std, "min": self.min.copy()}
+        summary["max"] = self.max.copy()
+        for p, quantile in self.quantiles.items():
+            summary[f"q{100 * p:02g}"] = quantile.value
+        return summary
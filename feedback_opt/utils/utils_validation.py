@@ -0,0 +1,69 @@
+import os
+from contextlib import contextmanager
+
+# global validation level of the shape and content assertions
+# - "full": every call is validated (default)
+# - "boundary": only the initial data (data_initial) is validated, per step calls are not
+# - "off": no per call validation, for production runs
+# parameter validation at construction of systems, optimizers and simulations is always active
+# as are the checks for failed solves (None or NaN solutions), they are error handling
+# the level is read from the environment variable FEEDBACK_OPT_VALIDATION on import and
+# exported to it when set, such that worker processes inherit it
+
+LEVELS = ["off", "boundary", "full"]
+ENV_VARIABLE = "FEEDBACK_OPT_VALIDATION"
+
+_level = os.environ.get(ENV_VARIABLE, "full")
+assert _level in LEVELS, f"{ENV_VARIABLE} must be one of {LEVELS}"
+
+# checks enabled at the current level, looked up on every call of a hot path
+_enabled = {}
+
+
+def _update():
+    for level in LEVELS:
+        _enabled[level] = LEVELS.index(_level) >= LEVELS.index(level)
+
+
+_update()
+
+
+def validate(level: str = "full") -> bool:
+    """
+    :param str level: level of the check, "full" for per step calls, "boundary" for initial data
+    :return bool: True if checks of this level are enabled
+    """
+    return _enabled[level]
+
+
+def get_validation_level() -> str:
+    """
+    :return str: current validation level
+    """
+    return _level
+
+
+def set_validation_level(level: str):
+    """
+    :param str level: one of "full", "boundary" or "off"
+    """
+    global _level
+    assert level in LEVELS, f"validation level must be one of {LEVELS}"
+    _level = level
+    os.environ[ENV_VARIABLE] = level
+    _update()
+
+
+@contextmanager
+def validation_level(level: str):
+    """
+    temporarily sets the validation level
+
+    :param str level: one of "full", "boundary" or "off"
+    """
+    previous = _level
+    set_validation_level(level)
+    try:
+        yield
+    finally:
+        set_validation_level(previous)
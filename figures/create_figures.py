@@ -2,6 +2,7 @@ import os
 
 import matplotlib.pyplot as plt
 
+from feedback_opt.utils import ResultCache
 from figures.fig_feasibility import fig_feasibility
 from figures.fig_meas_noise import fig_meas_noise
 from figures.fig_nonconvex_toy import fig_nonconvex_toy
@@ -11,8 +12,12 @@ from figures.fig_unicorn_noise import fig_unicorn_noise
 FIGURES = [fig_feasibility, fig_meas_noise, fig_unicorn, fig_unicorn_noise, fig_nonconvex_toy]
 SAVE_PATH = "./figures/output"
 
+# simulation results of these figures are cached, re-plotting only reruns stale simulations
+SIMULATED = [fig_unicorn, fig_unicorn_noise, fig_nonconvex_toy]
+CACHE_PATH = "./figures/cache"
 
-def create_figures(overwrite=True):
+
+def create_figures(overwrite=True, cache=True):
     print("creating figures ...")
 
     # create save folder
@@ -23,6 +28,8 @@ def create_figures(overwrite=True):
             print(f"An error occurred during directory creation: {e}")
             return
 
+    result_cache = ResultCache(CACHE_PATH, enabled=cache)
+
     # iteratively create figures
     for figure in FIGURES:
         path = f"{SAVE_PATH}/{figure.__name__}.pdf"
@@ -39,9 +46,15 @@ def create_figures(overwrite=True):
 
         if overwrite or not os.path.exists(path):
             print(path)
-            figure()
+            if figure in SIMULATED:
+                figure(cache=result_cache)
+            else:
+                figure()
             plt.savefig(path, transparent=True)
 
+    if cache:
+        print(f"cached simulations: {result_cache.n_hits} reused, {result_cache.n_misses} run")
+
 
 if __name__ == "__main__":
     create_figures(overwrite=False)
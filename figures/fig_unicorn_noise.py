@@ -1,19 +1,18 @@
 import matplotlib.pyplot as plt
-from tqdm import tqdm
 
+from feedback_opt.experiment import run_experiment, split_results
 from feedback_opt.optimizers import (
     OptimizerDualHProximal,
     OptimizerDualY,
     OptimizerDualYProximal,
     OptimizerPrimal,
 )
-from feedback_opt.simulation import Simulation
 from feedback_opt.systems import SystemElectrical
-from feedback_opt.utils import plot_cost_and_violation
+from feedback_opt.utils import ResultCache, plot_cost_and_violation
 from scenarios.scenario_unicorn_noise import UnicornNoise
 
 
-def fig_unicorn_noise():
+def fig_unicorn_noise(cache: ResultCache | None = None):
     # make data
     # fetch parameters for scenario
     params = UnicornNoise()
@@ -21,19 +20,21 @@ def fig_unicorn_noise():
     # override
     plt.rcParams.update({"figure.figsize": (6, 4)})
 
-    # instatiate objects
-    system = SystemElectrical(params.sys)
-    optimizer = [
-        OptimizerPrimal(params.opt_prim, system),
-        OptimizerDualY(params.opt_dualy, system),
-        OptimizerDualYProximal(params.opt_dualyprox_dist, system),
-        OptimizerDualHProximal(params.opt_dualhprox_dist, system),
-    ]
-    simulation = [Simulation(params.sim, system, opt) for opt in optimizer]
-    results = [(sim.optimizer.name, sim.run()) for sim in tqdm(simulation)]
+    # run simulations
+    results = run_experiment(
+        [params],
+        SystemElectrical,
+        [
+            (OptimizerPrimal, params.opt_prim),
+            (OptimizerDualY, params.opt_dualy),
+            (OptimizerDualYProximal, params.opt_dualyprox_dist),
+            (OptimizerDualHProximal, params.opt_dualhprox_dist),
+        ],
+        cache=cache,
+    )
 
     # plot
-    plot_cost_and_violation(results, transition=15, max_violation=0.06)
+    plot_cost_and_violation(split_results(results), transition=15, max_violation=0.06)
 
 
 if __name__ == "__main__":
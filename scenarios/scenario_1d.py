@@ -50,6 +50,13 @@ class Toy1D:
         def du_h(u):
             return np.array([[4 * u[0, 0] + 3 * u[0, 0] ** 2]])
 
+        # vectorized dynamics over a batch of inputs (B,m,1)
+        def h_batch(u):
+            return 2 * u**2 + u**3
+
+        def du_h_batch(u):
+            return 4 * u + 3 * u**2
+
     class opt:
         # input objective cost function
         lin_u = np.array([[0.2]])
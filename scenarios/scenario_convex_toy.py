@@ -61,6 +61,13 @@ class ConvexToy:
             # u_2 = u[1, 0]
             return np.array([[-1, 2]])
 
+        # vectorized dynamics over a batch of inputs (B,m,1)
+        def h_batch(u):
+            return 2 * u[:, 1:2] - u[:, 0:1] + 1.5
+
+        def du_h_batch(u):
+            return np.tile(np.array([[-1, 2]]), (len(u), 1, 1))
+
     class opt:
         # input objective cost function
         quad_u = np.diag([20, 2])
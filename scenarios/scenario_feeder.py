@@ -0,0 +1,52 @@
+import numpy as np
+
+# synthetic feeder with 200 busses and 10 sgens, at full active power the sgens violate the
+# upper voltage limits, u = [p_pu ..., q_pu ...]
+N_SGEN = 10
+
+
+# pylint: skip-file
+class Feeder:
+    class sim:
+        # simulation length
+        n_steps = 300
+
+    class sys:
+        # Electrical Network, built by SystemElectrical such that importing the scenario does
+        # not build it (nor import pandapower)
+        def net():
+            from feedback_opt.utils import synthetic_feeder
+
+            return synthetic_feeder(n_bus=200, n_sgen=N_SGEN, sgen_mw=4.0)
+
+    class opt:
+        # input objective cost function, maximize the active power
+        quad_u = 0.1 * np.eye(2 * N_SGEN)
+        lin_u = np.vstack((-np.ones((N_SGEN, 1)), np.zeros((N_SGEN, 1))))
+
+    class opt_prim(opt):
+        name = r"Algo. 1, Projected Primal"
+        alpha = 0.1
+
+    class opt_dualy(opt):
+        name = r"Algo. 2, Primal-Dual"
+        alpha = 4
+        beta = 8
+
+    class opt_dualh(opt):
+        name = r"Algo. -, Primal-Dual"
+        alpha = 4
+        beta = 2
+
+    class opt_dualyprox_dist(opt):
+        name = r"Algo. 3, PRIME-Y"
+        rho = 1e3
+        gamma_u = 5
+        centralized = False
+
+    class opt_dualhprox_dist(opt):
+        name = r"Algo. 4, PRIME-H"
+        rho = 1e2
+        gamma_u = 5
+        gamma_z = 5
+        centralized = False
@@ -65,6 +65,16 @@ class NonConvexToy:
             u_2 = u[1, 0]
             return np.array([[1, 3 * u_2**2 - 1]])
 
+        # vectorized dynamics over a batch of inputs (B,m,1)
+        def h_batch(u):
+            u_1 = u[:, 0:1]
+            u_2 = u[:, 1:2]
+            return u_2**3 + u_1 - u_2 + 0.5
+
+        def du_h_batch(u):
+            u_2 = u[:, 1:2]
+            return np.concatenate((np.ones_like(u_2), 3 * u_2**2 - 1), axis=2)
+
     class opt:
         # input objective cost function
         quad_u = np.diag([1, 1])
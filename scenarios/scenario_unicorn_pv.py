@@ -0,0 +1,53 @@
+import numpy as np
+
+from feedback_opt.disturbance import PVProfile
+
+
+# pylint: skip-file
+class UnicornPV:
+    class sim:
+        # initial guess of the moving optimum
+        u_opt = np.array([6.63761286, 3.94908578, 2.0, 0.5]).reshape(-1, 1)
+
+        # simulation length
+        n_steps = 500
+
+        # available PV power, 5 s samples of the evening ramp down
+        disturbance = PVProfile(
+            "data/unicorn_56_import/gridtimeseries/pvproduction.csv",
+            scale=3,
+            start=7_900,
+            time_path="data/unicorn_56_import/gridtimeseries/t.csv",
+        )
+        track_optimum = True
+
+    class sys:
+        # Electrical Network
+        net_path = "data/unicorn_56.json"
+
+    class opt:
+        # input objective cost function
+        quad_u = 0.1 * np.eye(4)
+        lin_u = np.array([[0.1], [0.1], [0], [0]])
+
+    class opt_prim(opt):
+        name = r"Algo. 1, Projected Primal"
+        alpha = 0.1
+
+    class opt_dualy(opt):
+        name = r"Algo. 2, Primal-Dual"
+        alpha = 4
+        beta = 8
+
+    class opt_dualyprox_dist(opt):
+        name = r"Algo. 3, PRIME-Y"
+        rho = 1e3
+        gamma_u = 20
+        centralized = False
+
+    class opt_dualhprox_dist(opt):
+        name = r"Algo. 4, PRIME-H"
+        rho = 1e3
+        gamma_u = 20
+        gamma_z = 20
+        centralized = False